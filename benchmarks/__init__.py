@@ -0,0 +1,7 @@
+"""
+Benchmarks do theses_scraper executados sem acesso à rede.
+
+Os repositórios são simulados por uma "fazenda" de servidores locais
+(`benchmarks.farm`) e os cenários (`benchmarks.run`) medem os parsers, o
+`PDFDownloader` e o `DocumentDownloader` contra ela.
+"""
@@ -0,0 +1,366 @@
+"""
+Módulo com a fazenda de repositórios simulados usada nos benchmarks.
+
+Um servidor HTTP local, executado em um processo próprio para não consumir a
+CPU medida nos benchmarks, responde pelos hosts de cada tipo de repositório
+suportado pelo pacote:
+
+- DSpace (`repositorio.bench.br`): página do item com a tag meta
+  `citation_pdf_url` no cabeçalho;
+- TEDE (`tede.bench.br`): link `/bitstream/...pdf` no fim da página;
+- Sophia (`biblioteca.bench.br`): `/php/midia.php` entrega o próprio PDF;
+- Maxwell (`maxwell.vrac.puc-rio.br`): página com o documento dividido em
+  várias partes;
+- UFRR (`bdtd.ufrr.br`): frameset com o PDF no `mainFrame`;
+- CESPU (`repositorio.cespu.pt`): links `/bitstream/handle` das partes;
+- host lento (`lento.bench.br`) e instável (`instavel.bench.br`, que
+  responde 503 em uma fração das requisições), ambos no formato DSpace.
+
+As falhas do host instável dependem apenas da semente, da URL e de quantas
+vezes ela já foi pedida na mesma execução (cabeçalho `X-Farm-Run` do
+`FarmTransport`). Assim, execuções repetidas contra a mesma fazenda recebem
+as mesmas falhas, e as medidas podem ser comparadas entre si.
+
+O `FarmTransport` encaminha as requisições da `HttpSession` para a fazenda,
+de modo que os parsers são escolhidos pela `ParserFactory` a partir das URLs
+com os hosts acima.
+
+Exemplo:
+    >>> with Farm(FarmConfig(latency=0.02, redirects=1)) as farm:
+    ...     session = HttpSession(transport=farm.transport())
+    ...     urls = farm.urls("dspace", 100)
+"""
+
+import hashlib
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+# Host de cada tipo de repositório
+HOSTS = {
+    "dspace": "repositorio.bench.br",
+    "tede": "tede.bench.br",
+    "sophia": "biblioteca.bench.br",
+    "maxwell": "maxwell.vrac.puc-rio.br",
+    "ufrr": "bdtd.ufrr.br",
+    "cespu": "repositorio.cespu.pt",
+    "slow": "lento.bench.br",
+    "flaky": "instavel.bench.br",
+}
+
+# Tipo de repositório de cada host
+KINDS = {host: kind for kind, host in HOSTS.items()}
+
+# Tipos que seguem o formato DSpace
+_DSPACE_KINDS = ("dspace", "slow", "flaky")
+
+# Conteúdo usado para completar as páginas até o tamanho configurado
+_FILLER = (
+    "<p>Resumo: Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed "
+    'do eiusmod tempor. <a href="/browse?type=subject">Assunto</a></p>\n'
+)
+
+
+@dataclass
+class FarmConfig:
+    """
+    Parâmetros dos repositórios simulados.
+
+    Attributes:
+        latency (float): Atraso, em segundos, de cada resposta.
+        slow_latency (float): Atraso das respostas do host lento.
+        page_size (int): Tamanho, em bytes, das páginas HTML.
+        redirects (int): Redirecionamentos antes da página de cada item dos
+            repositórios DSpace e TEDE.
+        pdf_size (int): Tamanho, em bytes, de cada PDF.
+        parts (int): Número de partes dos documentos Maxwell e CESPU.
+        error_rate (float): Fração das respostas 503 do host instável.
+        seed (int): Semente das falhas do host instável.
+    """
+
+    latency: float = 0.01
+    slow_latency: float = 0.5
+    page_size: int = 64 * 1024
+    redirects: int = 1
+    pdf_size: int = 512 * 1024
+    parts: int = 3
+    error_rate: float = 0.2
+    seed: int = 0
+
+
+def item_url(kind: str, number: int) -> str:
+    """
+    Retorna a URL de um item do repositório simulado.
+
+    Examples:
+        >>> item_url("sophia", 7)
+        'https://biblioteca.bench.br/index.asp?codigo_sophia=7'
+    """
+    host = HOSTS[kind]
+    if kind in _DSPACE_KINDS:
+        return f"https://{host}/handle/123456789/{number}"
+    if kind == "tede":
+        return f"https://{host}/tede/handle/tede/{number}"
+    if kind == "sophia":
+        return f"https://{host}/index.asp?codigo_sophia={number}"
+    if kind == "maxwell":
+        return f"https://{host}/colecao.php?strSecao=resultado&nrSeq={number}"
+    if kind == "ufrr":
+        return f"https://{host}/tde_busca/arquivo.php?codArquivo={number}"
+    if kind == "cespu":
+        return f"https://{host}/handle/20.500.11816/{number}"
+    raise ValueError(f"Tipo de repositório desconhecido: {kind}")
+
+
+def document_url(kind: str, number: int, parts: int = 3) -> str | list[str]:
+    """Retorna a URL do documento (ou das suas `parts` partes) de um item."""
+    host = HOSTS[kind]
+    if kind == "maxwell":
+        return [f"https://{host}/{number}/{number}_{i}.pdf" for i in range(parts)]
+    if kind == "cespu":
+        return [
+            f"https://{host}/bitstream/handle/20.500.11816/{number}/parte{i}.pdf"
+            for i in range(parts)
+        ]
+    if kind == "sophia":
+        return f"https://{host}/php/midia.php?tipo=1&codigo={number}"
+    if kind == "ufrr":
+        return f"https://{host}/tde_arquivos/{number}/tese.pdf"
+    return f"https://{host}/bitstream/handle/123456789/{number}/tese.pdf"
+
+
+def _page(title: str, head: str, body: str, size: int) -> bytes:
+    """Monta uma página HTML com aproximadamente `size` bytes."""
+    start = f"<html><head><title>{title}</title>{head}</head><body>\n"
+    end = f"{body}</body></html>\n"
+    # Apenas blocos inteiros, para não deixar uma tag aberta
+    filler = _FILLER * max(0, (size - len(start) - len(end)) // len(_FILLER))
+    return (start + filler + end).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Responde às requisições conforme o host e o caminho."""
+
+    protocol_version = "HTTP/1.1"
+    server: "_FarmServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        self._respond(send_body=False)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self._respond(send_body=True)
+
+    def _respond(self, send_body: bool):
+        config = self.server.config
+        host = (self.headers.get("Host") or "").partition(":")[0]
+        kind = KINDS.get(host)
+        time.sleep(config.slow_latency if kind == "slow" else config.latency)
+        if kind is None:
+            return self._send(404, b"", "text/plain", send_body)
+        if kind == "flaky" and self.server.fails(
+            self.headers.get("X-Farm-Run", ""), self.path
+        ):
+            return self._send(503, b"", "text/plain", send_body)
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        hop = int(query.get("hop", ["0"])[0])
+        path = parts.path
+        if path.endswith(".pdf") or path == "/php/midia.php":
+            return self._send(200, self.server.pdf, "application/pdf", send_body)
+        if hop < config.redirects and (kind in _DSPACE_KINDS or kind == "tede"):
+            query["hop"] = [str(hop + 1)]
+            location = path + "?" + "&".join(f"{k}={v[0]}" for k, v in query.items())
+            return self._send(302, b"", "text/plain", send_body, location)
+        page = self._item_page(kind, path, query, config)
+        if page is None:
+            return self._send(404, b"", "text/plain", send_body)
+        return self._send(200, page, "text/html; charset=utf-8", send_body)
+
+    def _item_page(self, kind: str, path: str, query: dict, config: FarmConfig):
+        """Monta a página do item no formato do repositório."""
+        size = config.page_size
+        if kind in _DSPACE_KINDS and path.startswith("/handle/"):
+            number = path.rsplit("/", 1)[-1]
+            meta = (
+                '<meta name="citation_pdf_url" content="https://'
+                f'{HOSTS[kind]}/bitstream/handle/123456789/{number}/tese.pdf">'
+            )
+            return _page(f"Item {number}", meta, "", size)
+        if kind == "tede" and path.startswith("/tede/handle/"):
+            number = path.rsplit("/", 1)[-1]
+            link = f'<a href="/bitstream/tede/{number}/2/tese.pdf">Texto completo</a>'
+            return _page(f"Item {number}", "", link, size)
+        if kind == "maxwell" and "nrSeq" in query:
+            number = query["nrSeq"][0]
+            options = "".join(
+                f'<option value="{i}">Parte {i}</option>' for i in range(config.parts)
+            )
+            links = "".join(
+                f'<a href="/{number}/{number}_{i}.pdf">Parte {i}</a>'
+                for i in range(config.parts)
+            )
+            body = f'<select id="file">{options}</select>{links}'
+            return _page(f"Maxwell {number}", "", body, size)
+        if kind == "ufrr" and "codArquivo" in query:
+            number = query["codArquivo"][0]
+            return (
+                "<html><frameset rows='0,*'>"
+                "<frame name='topFrame' src='/tde_busca/topo.php'>"
+                f"<frame name='mainFrame' src='/tde_arquivos/{number}/tese.pdf'>"
+                "</frameset></html>"
+            ).encode()
+        if kind == "cespu" and path.startswith("/handle/"):
+            number = path.rsplit("/", 1)[-1]
+            links = "".join(
+                f'<a href="/bitstream/handle/20.500.11816/{number}/parte{i}.pdf">'
+                f"Parte {i}</a>"
+                for i in range(config.parts)
+            )
+            return _page(f"CESPU {number}", "", links, size)
+        return None
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        send_body: bool,
+        location: str | None = None,
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if location is not None:
+            self.send_header("Location", location)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class _FarmServer(ThreadingHTTPServer):
+    """Servidor com a configuração e o PDF compartilhados pelas respostas."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, config: FarmConfig):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.config = config
+        self.pdf = b"%PDF-1.4\n" + b"0" * max(0, config.pdf_size - 9)
+        self._requests = Counter()
+        self._lock = threading.Lock()
+
+    def fails(self, run: str, path: str) -> bool:
+        """Indica se o host instável deve responder 503 a esta requisição."""
+        with self._lock:
+            self._requests[run, path] += 1
+            attempt = self._requests[run, path]
+        digest = hashlib.blake2b(
+            f"{self.config.seed}:{path}:{attempt}".encode(), digest_size=8
+        ).digest()
+        return int.from_bytes(digest) / 2**64 < self.config.error_rate
+
+
+def _serve(config: FarmConfig, connection):
+    """Ponto de entrada do processo da fazenda."""
+    server = _FarmServer(config)
+    connection.send(server.server_address[1])
+    server.serve_forever()
+
+
+class FarmTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte que envia todas as requisições para a fazenda.
+
+    O esquema, o host e a porta da URL são substituídos pelos da fazenda, e o
+    host original segue no cabeçalho `Host`. A resposta continua associada à
+    requisição original, então as URLs finais mantêm os hosts simulados.
+    """
+
+    def __init__(self, port: int, **kwargs):
+        """
+        Args:
+            port (int): Porta da fazenda.
+            **kwargs: Args adicionais para `httpx.AsyncHTTPTransport` (ex.:
+                `limits`).
+        """
+        self.port = port
+        # Identifica a execução, para que cada transporte receba as mesmas falhas
+        self.run = uuid.uuid4().hex
+        self._transport = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        target = request.url.copy_with(scheme="http", host="127.0.0.1", port=self.port)
+        headers = request.headers.copy()
+        headers["X-Farm-Run"] = self.run
+        forwarded = httpx.Request(
+            request.method,
+            target,
+            headers=headers,
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+        return await self._transport.handle_async_request(forwarded)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class Farm:
+    """Fazenda de repositórios simulados em um processo próprio."""
+
+    def __init__(self, config: FarmConfig | None = None):
+        self.config = config or FarmConfig()
+        self.port: int | None = None
+        self._process = None
+
+    def __enter__(self) -> "Farm":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """Inicia o servidor e aguarda a porta em que ele atende."""
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_serve, args=(self.config, sender), name="bench-farm", daemon=True
+        )
+        self._process.start()
+        if not receiver.poll(30):
+            self.stop()
+            raise RuntimeError("A fazenda de repositórios não iniciou")
+        self.port = receiver.recv()
+
+    def stop(self):
+        """Encerra o servidor."""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def transport(self, max_connections: int = 100) -> FarmTransport:
+        """Cria um transporte para a `HttpSession` que acessa a fazenda."""
+        return FarmTransport(
+            self.port, limits=httpx.Limits(max_connections=max_connections)
+        )
+
+    def urls(self, kind: str, count: int, start: int = 0) -> list[str]:
+        """Retorna as URLs de `count` itens de um tipo de repositório."""
+        return [item_url(kind, number) for number in range(start, start + count)]
+
+    def describe(self) -> dict:
+        """Retorna a configuração da fazenda."""
+        return asdict(self.config)
@@ -0,0 +1,139 @@
+"""
+Verifica o tempo de importação dos pontos de entrada do theses_scraper.
+
+Cada módulo é importado em um processo novo com `python -X importtime`, e o
+tempo acumulado dos módulos carregados por ele (sem contar os da inicialização
+do interpretador) é comparado com o orçamento do módulo. A linha de comando e
+a triagem não carregam o httpx nem o asyncio; `batch` e `pdf_downloader`, que
+dependem deles, têm um orçamento maior. Os backends pesados
+(Playwright, Selenium e BeautifulSoup) só devem ser carregados quando um parser
+que os usa é escolhido, por isso a sua presença após a importação também é uma
+violação.
+
+Uso:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 150 --top 5
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Orçamento padrão, em milissegundos, por ponto de entrada
+DEFAULT_BUDGET = 150.0
+
+# Orçamento dos módulos que importam o httpx e o asyncio
+HTTP_BUDGET = 300.0
+
+# Pontos de entrada verificados e o orçamento de cada um
+ENTRY_POINTS = {
+    "theses_scraper": DEFAULT_BUDGET,
+    "theses_scraper.__main__": DEFAULT_BUDGET,
+    "theses_scraper.triage": DEFAULT_BUDGET,
+    "theses_scraper.workers": DEFAULT_BUDGET,
+    "theses_scraper.batch": HTTP_BUDGET,
+    "theses_scraper.pdf_downloader": HTTP_BUDGET,
+}
+
+# Pacotes que só devem ser importados no primeiro uso
+HEAVY = ("playwright", "selenium", "bs4")
+
+
+def import_times(statement: str) -> list[tuple[str, int, int]]:
+    """
+    Executa `statement` com `-X importtime` e retorna os módulos importados.
+
+    Returns:
+        list[tuple[str, int, int]]: Nome, profundidade e tempo acumulado em
+        microssegundos de cada módulo, na ordem informada pelo interpretador.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), depth, int(cumulative)))
+    return modules
+
+
+def measure(module: str, startup: set[str]) -> tuple[float, list, list[str]]:
+    """
+    Mede a importação de um módulo.
+
+    Args:
+        module (str): Módulo a importar.
+        startup (set[str]): Módulos carregados na inicialização do interpretador.
+
+    Returns:
+        tuple: Tempo total em milissegundos, os módulos importados diretamente
+        (dos mais lentos aos mais rápidos) e os pacotes pesados carregados.
+    """
+    modules = import_times(f"import {module}")
+    top_level = [
+        (name, cumulative)
+        for name, depth, cumulative in modules
+        if depth == 0 and name not in startup
+    ]
+    heavy = sorted(
+        {
+            name.partition(".")[0]
+            for name, _, _ in modules
+            if name.partition(".")[0] in HEAVY
+        }
+    )
+    total = sum(cumulative for _, cumulative in top_level) / 1000
+    nested = [
+        (name, cumulative)
+        for name, depth, cumulative in modules
+        if depth == 1 and name not in startup
+    ]
+    slowest = sorted(nested, key=lambda item: item[1], reverse=True)
+    return total, slowest, heavy
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.import_time")
+    parser.add_argument(
+        "modules", nargs="*", default=list(ENTRY_POINTS), help="módulos a verificar"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="tempo máximo de importação por módulo, em ms (padrão: o de "
+        "ENTRY_POINTS, ou DEFAULT_BUDGET para outros módulos)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=3, help="módulos mais lentos exibidos"
+    )
+    args = parser.parse_args(argv)
+
+    startup = {name for name, _, _ in import_times("pass")}
+    violations = 0
+    for module in args.modules:
+        budget = args.budget or ENTRY_POINTS.get(module, DEFAULT_BUDGET)
+        total, slowest, heavy = measure(module, startup)
+        over = total > budget
+        violations += over + bool(heavy)
+        status = "ACIMA" if over else "ok"
+        print(f"{module:<32} {total:>8.1f} ms  {status} (orçamento {budget:.0f} ms)")
+        for name, cumulative in slowest[: args.top]:
+            print(f"    {name:<36} {cumulative / 1000:>8.1f} ms")
+        if heavy:
+            print(f"    carregados na importação: {', '.join(heavy)}")
+    if violations:
+        print(f"\n{violations} violação(ões) do orçamento", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
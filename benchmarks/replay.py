@@ -0,0 +1,130 @@
+"""
+Reproduz páginas gravadas para testar e medir os parsers sem acesso à rede.
+
+As respostas de um ou mais arquivos de fixtures (gravados com
+`python -m theses_scraper record`) são servidas pelo `ReplayTransport`, e
+cada URL gravada é resolvida novamente, uma de cada vez, para que o tempo
+medido seja apenas o de CPU do parser. O resultado de cada URL é comparado
+com o gravado; com `--check`, o comando termina com código 1 se algum
+resultado mudou.
+
+Uso:
+    python -m theses_scraper record handles.txt -o fixtures.warc.gz --sample 2000
+    python -m benchmarks.replay fixtures.warc.gz --repeat 3 --check
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import defaultdict
+
+from theses_scraper.batch import resolve_url
+from theses_scraper.utils.fixtures import FixtureArchive, ReplayTransport
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+from .run import percentile
+
+# Parsers cujas páginas são renderizadas pelo navegador e não são gravadas
+SKIPPED_PARSERS = {"DynamicContentParser"}
+
+
+def replay_session(archive: FixtureArchive) -> HttpSession:
+    """
+    Cria uma sessão que responde com as páginas gravadas.
+
+    Os limites por host e as retentativas são desativados, já que não há
+    repositório a proteger nem falhas transitórias.
+    """
+    unlimited = HostPolicy(rate=1e9, burst=10**9, max_in_flight=10**9)
+    return HttpSession(
+        transport=ReplayTransport(archive),
+        scheduler=HostScheduler(unlimited, latency_factor=float("inf")),
+        retry=RetryPolicy(attempts=1),
+    )
+
+
+async def replay(
+    archive: FixtureArchive, repeat: int = 1
+) -> tuple[dict[str, list[float]], list[tuple[str, dict, dict]]]:
+    """
+    Resolve novamente as URLs gravadas.
+
+    Args:
+        archive (FixtureArchive): Páginas e resultados gravados.
+        repeat (int): Número de vezes que cada URL é resolvida.
+
+    Returns:
+        tuple: Tempos, em segundos, por parser e a lista das URLs cujo
+        resultado mudou, com o resultado gravado e o atual.
+    """
+    timings: dict[str, list[float]] = defaultdict(list)
+    changed = []
+    expected = {
+        url: data
+        for url, data in archive.metadata().items()
+        if data.get("parser") not in SKIPPED_PARSERS
+    }
+    async with replay_session(archive) as session:
+        for round_number in range(repeat):
+            for url, recorded in expected.items():
+                started = time.perf_counter()
+                result = await resolve_url(url, session)
+                timings[result.parser or "-"].append(time.perf_counter() - started)
+                current = {
+                    "parser": result.parser,
+                    "status": result.status,
+                    "pdf_link": result.pdf_link,
+                }
+                if round_number == 0 and any(
+                    recorded.get(key) != value for key, value in current.items()
+                ):
+                    changed.append((url, recorded, current))
+    return timings, changed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.replay")
+    parser.add_argument("fixtures", nargs="+", help="arquivos .warc.gz gravados")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--check", action="store_true", help="falha se algum resultado mudou"
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    archive = FixtureArchive(*args.fixtures)
+    print(
+        f"{len(archive)} respostas carregadas em {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    cpu_started = time.process_time()
+    timings, changed = asyncio.run(replay(archive, args.repeat))
+    cpu = time.process_time() - cpu_started
+
+    print(
+        f"{'parser':<24} {'itens':>7} {'itens/s':>9} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'total s':>8}"
+    )
+    for name, seconds in sorted(timings.items()):
+        total = sum(seconds)
+        print(
+            f"{name:<24} {len(seconds):>7} {len(seconds) / total:>9.1f} "
+            f"{percentile(seconds, 0.5) * 1000:>8.2f} "
+            f"{percentile(seconds, 0.99) * 1000:>8.2f} {total:>8.2f}"
+        )
+    print(f"CPU: {cpu:.2f}s")
+
+    for url, recorded, current in changed:
+        print(f"\nResultado diferente: {url}", file=sys.stderr)
+        print(f"  gravado: {recorded}", file=sys.stderr)
+        print(f"  atual:   {current}", file=sys.stderr)
+    if changed:
+        print(f"\n{len(changed)} resultado(s) diferente(s)", file=sys.stderr)
+    return 1 if args.check and changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
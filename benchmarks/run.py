@@ -0,0 +1,495 @@
+"""
+Executa os benchmarks contra a fazenda de repositórios simulados.
+
+Cada cenário roda em um processo novo, para que o pico de memória e o tempo
+de CPU medidos sejam apenas os dele:
+
+- `parsers`: `ParserFactory.get_parser` e `get_pdf_link` de cada item;
+- `pdf_downloader`: a interface síncrona `PDFDownloader.get_pdf_link`,
+  chamada por várias threads;
+- `downloader`: `DocumentDownloader.download` dos documentos (ou das suas
+  partes);
+- `end_to_end`: resolução do link e download de cada item.
+
+Para cada cenário, e para cada tipo de repositório, são informados a vazão,
+a latência por item (p50 e p99), o tempo de CPU por item e o pico de memória
+(RSS). Cada cenário roda `--repeat` vezes e cada medida é a mediana das
+execuções. Os resultados podem ser salvos como referência (`--save`) e
+comparados com uma referência anterior (`--compare`), que termina com código
+1 se alguma medida de um cenário piorar mais que a tolerância. A latência
+(p50 e p99), que varia mais entre execuções, usa uma tolerância própria, e as
+linhas de cada tipo de repositório, com poucos itens, só entram na comparação
+com `--per-kind`. As tolerâncias padrão cobrem a variação observada entre
+execuções sem mudanças em uma máquina de um núcleo (até 22% na vazão e no
+tempo de CPU e até 36% na latência).
+
+Uso:
+    python -m benchmarks.run --items 50 --save main
+    python -m benchmarks.run --items 50 --compare main --tolerance 0.3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from pathlib import Path
+
+from theses_scraper.downloader import DocumentDownloader
+from theses_scraper.parsers import ParserFactory
+from theses_scraper.pdf_downloader import PDFDownloader
+from theses_scraper.utils.metrics import metrics
+from theses_scraper.utils.session import HttpSession
+
+from .farm import HOSTS, Farm, FarmConfig, FarmTransport, document_url, item_url
+
+# Diretório padrão das referências salvas
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Medidas comparadas com a referência e se valores maiores são melhores
+MEASURES = {
+    "throughput": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "cpu_ms_per_item": False,
+    "peak_rss_mb": False,
+}
+
+# Medidas de latência, comparadas com a tolerância `latency_tolerance`
+LATENCY_MEASURES = {"p50_ms", "p99_ms"}
+
+
+@dataclass
+class Sample:
+    """Medida de um item."""
+
+    kind: str
+    seconds: float
+    ok: bool
+
+
+@dataclass
+class Stats:
+    """Resumo das medidas de um cenário ou de um tipo de repositório."""
+
+    items: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    throughput: float | None = None
+    cpu_ms_per_item: float | None = None
+    peak_rss_mb: float | None = None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Percentil pelo método do posto mais próximo."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _stats(samples: list[Sample]) -> Stats:
+    seconds = [sample.seconds for sample in samples]
+    return Stats(
+        items=len(samples),
+        errors=sum(not sample.ok for sample in samples),
+        p50_ms=percentile(seconds, 0.50) * 1000,
+        p99_ms=percentile(seconds, 0.99) * 1000,
+    )
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Em KiB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _session(port: int, concurrency: int) -> HttpSession:
+    return HttpSession(
+        transport=FarmTransport(port), max_connections_per_host=concurrency
+    )
+
+
+async def _measure(
+    items: list[tuple[str, int]],
+    work: Callable[[str, int], Awaitable[bool]],
+    concurrency: int,
+) -> list[Sample]:
+    """Executa `work(kind, number)` para cada item, medindo cada execução."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def measure(kind: str, number: int) -> Sample:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await work(kind, number)
+            except Exception:  # pylint: disable=broad-except
+                ok = False
+            return Sample(kind, time.perf_counter() - started, ok)
+
+    return await asyncio.gather(*(measure(kind, number) for kind, number in items))
+
+
+def _downloaded(result) -> bool:
+    if isinstance(result, list):
+        return bool(result) and all(path is not None for path in result)
+    return result is not None
+
+
+async def _parsers(port, config, items, concurrency, workdir) -> list[Sample]:
+    async with _session(port, concurrency) as session:
+
+        async def work(kind: str, number: int) -> bool:
+            url = item_url(kind, number)
+            parser = ParserFactory.get_parser(url, session=session)
+            return await parser.get_pdf_link(url) is not None
+
+        return await _measure(items, work, concurrency)
+
+
+async def _downloader(port, config, items, concurrency, workdir) -> list[Sample]:
+    async with _session(port, concurrency) as session:
+        downloader = DocumentDownloader(workdir, session=session)
+
+        async def work(kind: str, number: int) -> bool:
+            document = document_url(kind, number, config.parts)
+            return _downloaded(await downloader.download(document))
+
+        return await _measure(items, work, concurrency)
+
+
+async def _end_to_end(port, config, items, concurrency, workdir) -> list[Sample]:
+    async with _session(port, concurrency) as session:
+        downloader = DocumentDownloader(workdir, session=session)
+
+        async def work(kind: str, number: int) -> bool:
+            url = item_url(kind, number)
+            parser = ParserFactory.get_parser(url, session=session)
+            link = await parser.get_pdf_link(url)
+            return link is not None and _downloaded(await downloader.download(link))
+
+        return await _measure(items, work, concurrency)
+
+
+def _pdf_downloader(port, config, items, concurrency, workdir) -> list[Sample]:
+    PDFDownloader.set_session(_session(port, concurrency))
+
+    def measure(item: tuple[str, int]) -> Sample:
+        kind, number = item
+        started = time.perf_counter()
+        try:
+            ok = PDFDownloader.get_pdf_link(item_url(kind, number)) is not None
+        except Exception:  # pylint: disable=broad-except
+            ok = False
+        return Sample(kind, time.perf_counter() - started, ok)
+
+    try:
+        with ThreadPoolExecutor(concurrency) as executor:
+            return list(executor.map(measure, items))
+    finally:
+        PDFDownloader.close()
+
+
+SCENARIOS = {
+    "parsers": _parsers,
+    "pdf_downloader": _pdf_downloader,
+    "downloader": _downloader,
+    "end_to_end": _end_to_end,
+}
+
+
+def _run_scenario(
+    name: str,
+    port: int,
+    config: FarmConfig,
+    items: list[tuple[str, int]],
+    concurrency: int,
+    with_metrics: bool,
+) -> dict:
+    """Ponto de entrada do processo de cada cenário."""
+    if with_metrics:
+        metrics.enable()
+    scenario = SCENARIOS[name]
+    with (
+        tempfile.TemporaryDirectory(prefix="bench-") as workdir,
+        open(os.devnull, "w", encoding="utf-8") as devnull,
+        contextlib.redirect_stdout(devnull),
+    ):
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        if asyncio.iscoroutinefunction(scenario):
+            samples = asyncio.run(scenario(port, config, items, concurrency, workdir))
+        else:
+            samples = scenario(port, config, items, concurrency, workdir)
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+    total = _stats(samples)
+    total.throughput = len(samples) / wall
+    total.cpu_ms_per_item = cpu / len(samples) * 1000
+    total.peak_rss_mb = _peak_rss_mb()
+    rows = {name: asdict(total)}
+    for kind in dict.fromkeys(sample.kind for sample in samples):
+        rows[f"{name}/{kind}"] = asdict(
+            _stats([sample for sample in samples if sample.kind == kind])
+        )
+    return {"rows": rows, "metrics": metrics.summary() if with_metrics else None}
+
+
+def _median_rows(runs: list[dict[str, dict]]) -> dict[str, dict]:
+    """Combina as execuções de um cenário pela mediana de cada medida."""
+    rows = {}
+    for name in runs[0]:
+        row = {}
+        for field in fields(Stats):
+            values = [run[name][field.name] for run in runs]
+            if any(value is None for value in values):
+                row[field.name] = None
+            elif field.name in ("items", "errors"):
+                row[field.name] = statistics.median_low(values)
+            else:
+                row[field.name] = statistics.median(values)
+        rows[name] = row
+    return rows
+
+
+def run(
+    config: FarmConfig,
+    scenarios: list[str],
+    kinds: list[str],
+    items: int,
+    concurrency: int = 32,
+    with_metrics: bool = False,
+    repeat: int = 1,
+) -> dict[str, dict]:
+    """
+    Executa os cenários contra uma fazenda com a configuração informada.
+
+    Args:
+        config (FarmConfig): Configuração dos repositórios simulados.
+        scenarios (list[str]): Nomes dos cenários (ver `SCENARIOS`).
+        kinds (list[str]): Tipos de repositório (ver `farm.HOSTS`).
+        items (int): Número de itens de cada tipo.
+        concurrency (int): Itens processados simultaneamente.
+        with_metrics (bool): Imprime o resumo de `theses_scraper.utils.metrics`
+            de cada cenário.
+        repeat (int): Execuções de cada cenário. Cada medida é a mediana das
+            execuções.
+
+    Returns:
+        dict[str, dict]: Medidas de cada cenário e de cada `cenário/tipo`.
+    """
+    # Tipos intercalados, como em uma coleta real
+    work = [(kind, number) for number in range(items) for kind in kinds]
+    runs = {name: [] for name in scenarios}
+    with Farm(config) as farm:
+        # Cenários intercalados, para que variações da máquina durante a
+        # execução não afetem um único cenário
+        for _ in range(repeat):
+            for name in scenarios:
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(1, mp_context=context) as executor:
+                    output = executor.submit(
+                        _run_scenario,
+                        name,
+                        farm.port,
+                        config,
+                        work,
+                        concurrency,
+                        with_metrics,
+                    ).result()
+                runs[name].append(output["rows"])
+                if output["metrics"]:
+                    print(f"\n[{name}]\n{output['metrics']}\n", file=sys.stderr)
+    results = {}
+    for name in scenarios:
+        results.update(_median_rows(runs[name]))
+    return results
+
+
+def _format(value: float | None, digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_results(results: dict[str, dict], baseline: dict[str, dict] | None = None):
+    """Imprime as medidas e, se houver referência, a variação de cada uma."""
+    header = (
+        f"{'cenário':<28} {'itens':>6} {'erros':>6} {'itens/s':>9} "
+        f"{'p50 ms':>9} {'p99 ms':>9} {'cpu ms':>8} {'rss MB':>8}"
+    )
+    print(header)
+    for name, row in results.items():
+        print(
+            f"{name:<28} {row['items']:>6} {row['errors']:>6} "
+            f"{_format(row['throughput']):>9} {_format(row['p50_ms']):>9} "
+            f"{_format(row['p99_ms']):>9} {_format(row['cpu_ms_per_item'], 2):>8} "
+            f"{_format(row['peak_rss_mb']):>8}"
+        )
+        reference = (baseline or {}).get(name)
+        if reference is None:
+            continue
+        changes = []
+        for measure in MEASURES:
+            if row[measure] is None or not reference.get(measure):
+                changes.append("")
+                continue
+            changes.append(f"{row[measure] / reference[measure] - 1:+.0%}")
+        print(
+            f"{'  vs. referência':<42} {changes[0]:>9} {changes[1]:>9} "
+            f"{changes[2]:>9} {changes[3]:>8} {changes[4]:>8}"
+        )
+
+
+def regressions(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    tolerance: float,
+    latency_tolerance: float | None = None,
+    per_kind: bool = False,
+) -> list[str]:
+    """
+    Lista as medidas que pioraram mais que a tolerância em relação à referência.
+
+    Args:
+        results (dict[str, dict]): Medidas atuais.
+        baseline (dict[str, dict]): Medidas de referência.
+        tolerance (float): Piora relativa tolerada (ex.: 0.2 para 20%).
+        latency_tolerance (float | None): Piora relativa tolerada nas medidas
+            de `LATENCY_MEASURES`. Se None, a mesma de `tolerance`.
+        per_kind (bool): Compara também as linhas de cada tipo de repositório.
+    """
+    if latency_tolerance is None:
+        latency_tolerance = tolerance
+    found = []
+    for name, row in results.items():
+        reference = baseline.get(name)
+        if reference is None or ("/" in name and not per_kind):
+            continue
+        for measure, higher_is_better in MEASURES.items():
+            current, previous = row.get(measure), reference.get(measure)
+            if current is None or not previous:
+                continue
+            change = current / previous - 1
+            limit = latency_tolerance if measure in LATENCY_MEASURES else tolerance
+            if (-change if higher_is_better else change) > limit:
+                found.append(f"{name}: {measure} {previous:.2f} -> {current:.2f}")
+    return found
+
+
+def save_baseline(path: Path, results: dict[str, dict], settings: dict):
+    """Salva as medidas como referência, junto com a configuração usada."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "settings": settings,
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    defaults = FarmConfig()
+    parser = argparse.ArgumentParser(prog="benchmarks.run")
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"cenários separados por vírgula ({', '.join(SCENARIOS)})",
+    )
+    parser.add_argument(
+        "--kinds",
+        default=",".join(HOSTS),
+        help=f"tipos de repositório separados por vírgula ({', '.join(HOSTS)})",
+    )
+    parser.add_argument("--items", type=int, default=20, help="itens de cada tipo")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="execuções de cada cenário (mediana)"
+    )
+    for config_field in fields(FarmConfig):
+        parser.add_argument(
+            "--" + config_field.name.replace("_", "-"),
+            type=type(getattr(defaults, config_field.name)),
+            default=getattr(defaults, config_field.name),
+        )
+    parser.add_argument("--save", metavar="NOME", help="salva como referência")
+    parser.add_argument("--compare", metavar="NOME", help="compara com a referência")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument(
+        "--latency-tolerance",
+        type=float,
+        default=0.5,
+        help="tolerância das medidas de latência (p50 e p99)",
+    )
+    parser.add_argument(
+        "--per-kind",
+        action="store_true",
+        help="compara também as linhas de cada tipo de repositório",
+    )
+    parser.add_argument("--baseline-dir", type=Path, default=BASELINE_DIR)
+    parser.add_argument(
+        "--metrics", action="store_true", help="imprime o tempo por etapa"
+    )
+    args = parser.parse_args(argv)
+
+    config = FarmConfig(
+        **{field.name: getattr(args, field.name) for field in fields(FarmConfig)}
+    )
+    scenarios = args.scenarios.split(",")
+    kinds = args.kinds.split(",")
+    settings = {
+        "scenarios": scenarios,
+        "kinds": kinds,
+        "items": args.items,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "farm": asdict(config),
+    }
+    baseline = None
+    if args.compare:
+        document = json.loads((args.baseline_dir / f"{args.compare}.json").read_text())
+        if document["settings"] != settings:
+            print(
+                "Aviso: a referência foi medida com outra configuração",
+                file=sys.stderr,
+            )
+        baseline = document["results"]
+
+    results = run(
+        config,
+        scenarios,
+        kinds,
+        args.items,
+        args.concurrency,
+        args.metrics,
+        args.repeat,
+    )
+    print_results(results, baseline)
+    if args.save:
+        save_baseline(args.baseline_dir / f"{args.save}.json", results, settings)
+    if baseline is not None:
+        found = regressions(
+            results, baseline, args.tolerance, args.latency_tolerance, args.per_kind
+        )
+        if found:
+            print("\nRegressões:", *found, sep="\n  ", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
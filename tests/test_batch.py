@@ -0,0 +1,103 @@
+"""Testes do `scrape_many` com handles que resolvem para o mesmo documento."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from theses_scraper.batch import scrape_many
+from theses_scraper.downloader import DocumentDownloader
+from theses_scraper.store import ContentStore
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+HOST = "https://repositorio.exemplo.br"
+BITSTREAM = f"{HOST}/bitstream/handle/1/2/tese.pdf"
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 2000
+
+
+async def slow_body(body: bytes, chunk: int = 16 * 1024):
+    for start in range(0, len(body), chunk):
+        await asyncio.sleep(0.002)
+        yield body[start : start + chunk]
+
+
+def make_handler(requests: list, redirect: bool):
+    """
+    Dois handles do mesmo bitstream: `/handle/1/2` com a tag meta e
+    `/handle/9/9`, que aponta para ele ou redireciona direto ao PDF.
+    """
+    page = (
+        f'<html><head><meta name="citation_pdf_url" content="{BITSTREAM}">'
+        "</head><body></body></html>"
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, request.headers.get("Range")))
+        if request.url.path.startswith("/bitstream/"):
+            headers = {
+                "Content-Type": "application/pdf",
+                "Content-Length": str(len(PDF)),
+            }
+            return httpx.Response(200, headers=headers, content=slow_body(PDF))
+        if request.url.path == "/handle/9/9" and redirect:
+            return httpx.Response(302, headers={"Location": BITSTREAM})
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, text=page)
+
+    return handler
+
+
+@pytest.mark.parametrize("redirect", [False, True], ids=["meta", "redirect"])
+def test_mirrored_handles_share_one_download(tmp_path, redirect, monkeypatch):
+    requests = []
+    added = []
+    add = ContentStore.add
+
+    def counting_add(self, *args, **kwargs):
+        added.append(args)
+        return add(self, *args, **kwargs)
+
+    monkeypatch.setattr(ContentStore, "add", counting_add)
+    calls = []
+    for name in ("download_parts", "save_response"):
+        method = getattr(DocumentDownloader, name)
+
+        async def counting(self, *args, _method=method, _name=name, **kwargs):
+            calls.append(_name)
+            return await _method(self, *args, **kwargs)
+
+        monkeypatch.setattr(DocumentDownloader, name, counting)
+
+    async def main():
+        session = HttpSession(
+            transport=httpx.MockTransport(make_handler(requests, redirect)),
+            scheduler=HostScheduler(
+                HostPolicy(rate=1e9, burst=10**9, max_in_flight=100)
+            ),
+            retry=RetryPolicy(attempts=1),
+        )
+        with ContentStore(tmp_path / "store") as store:
+            async with session:
+                return [
+                    result
+                    async for result in scrape_many(
+                        [f"{HOST}/handle/1/2", f"{HOST}/handle/9/9"],
+                        tmp_path / "docs",
+                        session,
+                        store=store,
+                    )
+                ]
+
+    results = asyncio.run(main())
+    assert [result.status for result in results] == ["downloaded", "downloaded"]
+    (path,) = {result.files[0] for result in results}
+    assert path.read_bytes() == PDF
+    assert len(added) == 1
+    assert len(calls) == 1
+    downloads = [entry for entry in requests if entry[0].startswith("/bitstream/")]
+    # No redirecionamento, a própria resolução já pede o bitstream; a resposta
+    # duplicada é descartada sem chegar ao downloader
+    assert len(downloads) == (2 if redirect else 1)
+    assert all(range_header is None for _, range_header in downloads)
+    assert list((tmp_path / "store" / "tmp").iterdir()) == []
@@ -0,0 +1,198 @@
+"""Testes do `BrowserPool` com um Playwright simulado."""
+
+import asyncio
+
+import pytest
+
+from theses_scraper.parsers.browser_pool import BrowserPool
+
+CHROME_WINDOWS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36"
+)
+CHROME_WINDOWS_OLD = CHROME_WINDOWS.replace("Windows NT 10.0", "Windows NT 6.1")
+CHROME_ANDROID = (
+    "Mozilla/5.0 (Linux; Android 10; CPH1819) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/113.0.0.0 Mobile Safari/537.36"
+)
+FIREFOX_ANDROID = "Mozilla/5.0 (Android 13; Mobile; rv:109.0) Gecko/113.0 Firefox/113.0"
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser, user_agent):
+        self.browser = browser
+        self.user_agent = user_agent
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        await asyncio.sleep(0)
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self, user_agent=None):
+        await asyncio.sleep(0)
+        context = FakeContext(self, user_agent)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browsers = []
+
+    async def launch(self, headless, proxy):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+def make_pool(**kwargs) -> tuple[BrowserPool, FakeChromium]:
+    pool = BrowserPool(**kwargs)
+    pool._playwright = FakePlaywright()
+    return pool, pool._playwright.chromium
+
+
+async def use(pool: BrowserPool, user_agent: str | None):
+    async with pool.page(user_agent) as page:
+        return page
+
+
+def test_context_is_created_with_the_user_agent():
+    async def main():
+        pool, chromium = make_pool()
+        page = await use(pool, CHROME_ANDROID)
+        default = await use(pool, None)
+        return page, default, chromium
+
+    page, default, chromium = asyncio.run(main())
+    assert page.context.user_agent == CHROME_ANDROID
+    assert default.context.user_agent is None
+    assert len(chromium.browsers[0].contexts) == 2
+
+
+def test_user_agents_of_one_family_share_the_context_and_pages():
+    async def main():
+        pool, _ = make_pool()
+        first = await use(pool, CHROME_WINDOWS)
+        second = await use(pool, CHROME_WINDOWS_OLD)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert second is first
+    assert first.context.user_agent == CHROME_WINDOWS
+
+
+def test_mobile_browsers_are_their_own_families():
+    async def main():
+        pool, chromium = make_pool()
+        for user_agent in (CHROME_WINDOWS, CHROME_ANDROID, FIREFOX_ANDROID):
+            await use(pool, user_agent)
+        return chromium.browsers[0].contexts
+
+    contexts = asyncio.run(main())
+    assert [context.user_agent for context in contexts] == [
+        CHROME_WINDOWS,
+        CHROME_ANDROID,
+        FIREFOX_ANDROID,
+    ]
+
+
+def test_concurrent_pages_of_one_family_share_one_context():
+    async def main():
+        pool, chromium = make_pool(max_pages=4)
+
+        async def hold():
+            async with pool.page(CHROME_ANDROID) as page:
+                await asyncio.sleep(0.01)
+                return page
+
+        pages = await asyncio.gather(*(hold() for _ in range(4)))
+        return pages, chromium.browsers[0].contexts
+
+    pages, contexts = asyncio.run(main())
+    assert len(set(map(id, pages))) == 4
+    assert len(contexts) == 1
+    assert len(contexts[0].pages) == 4
+
+
+def test_idle_pages_are_limited_to_max_pages():
+    async def main():
+        pool, _ = make_pool(max_pages=2)
+        pages = [
+            await use(pool, user_agent)
+            for user_agent in (CHROME_WINDOWS, CHROME_ANDROID, FIREFOX_ANDROID)
+        ]
+        return pages, pool._idle
+
+    pages, idle = asyncio.run(main())
+    assert [page.closed for page in pages] == [True, False, False]
+    assert [page for _, page in idle] == pages[1:]
+
+
+def test_failed_page_is_closed_but_the_context_is_kept():
+    async def main():
+        pool, chromium = make_pool()
+        with pytest.raises(RuntimeError):
+            async with pool.page(CHROME_ANDROID) as failed:
+                raise RuntimeError("falha na renderização")
+        page = await use(pool, CHROME_ANDROID)
+        return failed, page, chromium.browsers[0].contexts
+
+    failed, page, contexts = asyncio.run(main())
+    assert failed.closed
+    assert page is not failed
+    assert page.context is failed.context
+    assert len(contexts) == 1 and not contexts[0].closed
+
+
+def test_close_closes_contexts_and_browsers():
+    async def main():
+        pool, chromium = make_pool()
+        playwright = pool._playwright
+        await use(pool, CHROME_WINDOWS)
+        await use(pool, CHROME_ANDROID)
+        await pool.close()
+        return chromium.browsers[0], playwright, pool
+
+    browser, playwright, pool = asyncio.run(main())
+    assert all(context.closed for context in browser.contexts)
+    assert browser.closed and playwright.stopped
+    assert pool._idle == [] and pool._contexts == {}
@@ -0,0 +1,170 @@
+"""Testes do `ResolutionCache`: validade das entradas e remoção das antigas."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from theses_scraper import cache as cache_module
+from theses_scraper.batch import resolve_url
+from theses_scraper.cache import ResolutionCache
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+URL = "https://repositorio.exemplo.br/handle/1/2"
+PDF_URL = "https://repositorio.exemplo.br/bitstream/1/2/tese.pdf"
+DAY = 86400
+
+
+class Clock:
+    """Relógio controlado pelos testes no lugar de `time.time`."""
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_entries_round_trip(tmp_path, clock):
+    with ResolutionCache(tmp_path / "cache.db") as cache:
+        cache.put("https://a.br/1", PDF_URL, "https://a.br/final", "GenericParser")
+        cache.put("https://a.br/2", [PDF_URL, f"{PDF_URL}?parte=2"])
+        cache.put("https://a.br/3", None)
+        cache.put("https://a.br/4", [])
+    with ResolutionCache(tmp_path / "cache.db") as cache:
+        first = cache.get("https://a.br/1")
+        assert (first.pdf_link, first.final_url, first.parser) == (
+            PDF_URL,
+            "https://a.br/final",
+            "GenericParser",
+        )
+        assert first.resolved_at == clock.now
+        assert cache.get("https://a.br/2").pdf_link == [PDF_URL, f"{PDF_URL}?parte=2"]
+        assert cache.get("https://a.br/3").negative
+        assert cache.get("https://a.br/4").pdf_link is None
+        assert cache.get("https://a.br/5") is None
+        assert len(cache) == 4
+
+
+def test_positive_and_negative_entries_have_their_own_ttl(tmp_path, clock):
+    with ResolutionCache(tmp_path / "cache.db", ttl=30 * DAY, negative_ttl=DAY) as c:
+        c.put("https://a.br/link", PDF_URL)
+        c.put("https://a.br/nada", None)
+        link, nothing = c.get("https://a.br/link"), c.get("https://a.br/nada")
+        clock.now += DAY - 1
+        assert not c.is_stale(link) and not c.is_stale(nothing)
+        clock.now += 2
+        assert not c.is_stale(link) and c.is_stale(nothing)
+        assert list(c.stale_urls()) == ["https://a.br/nada"]
+        clock.now += 29 * DAY
+        assert c.is_stale(link)
+        assert list(c.stale_urls()) == ["https://a.br/link", "https://a.br/nada"]
+
+
+def test_touch_renews_an_entry(tmp_path, clock):
+    with ResolutionCache(tmp_path / "cache.db", ttl=DAY) as cache:
+        cache.put(URL, PDF_URL)
+        clock.now += 2 * DAY
+        assert cache.is_stale(cache.get(URL))
+        cache.touch(URL)
+        entry = cache.get(URL)
+        assert not cache.is_stale(entry)
+        assert entry.pdf_link == PDF_URL
+
+
+def test_purge_stale_removes_only_expired_entries(tmp_path, clock):
+    with ResolutionCache(tmp_path / "cache.db", ttl=10 * DAY, negative_ttl=DAY) as c:
+        c.put("https://a.br/antigo", PDF_URL)
+        c.put("https://a.br/nada", None)
+        clock.now += 2 * DAY
+        c.put("https://a.br/novo", None)
+        assert c.purge_stale() == 1
+        assert c.get("https://a.br/nada") is None
+        clock.now += 9 * DAY
+        assert c.purge_stale() == 2
+        assert len(c) == 0
+
+
+def test_stale_urls_are_read_in_pages(tmp_path, clock):
+    urls = sorted(f"https://a.br/{index:04d}" for index in range(1500))
+    with ResolutionCache(tmp_path / "cache.db", ttl=DAY) as cache:
+        for url in urls:
+            cache.put(url, PDF_URL)
+        clock.now += 2 * DAY
+        cache.put("https://a.br/recente", PDF_URL)
+        assert list(cache.stale_urls()) == urls
+
+
+def test_oldest_entries_are_evicted(tmp_path, clock):
+    with ResolutionCache(tmp_path / "cache.db", max_entries=20) as cache:
+        for index in range(50):
+            clock.now += 1
+            cache.put(f"https://a.br/{index}", PDF_URL)
+            # A remoção é periódica: o limite pode ser excedido por pouco
+            assert len(cache) <= 20 + cache._evict_interval
+        assert len(cache) == 20
+        kept = {f"https://a.br/{index}" for index in range(30, 50)}
+        assert {url for url in kept if cache.get(url)} == kept
+
+
+def test_touched_entries_survive_eviction(tmp_path, clock):
+    with ResolutionCache(tmp_path / "cache.db", max_entries=10) as cache:
+        cache.put("https://a.br/usado", PDF_URL)
+        for index in range(19):
+            clock.now += 1
+            cache.touch("https://a.br/usado")
+            cache.put(f"https://a.br/{index}", PDF_URL)
+        assert len(cache) == 10
+        assert cache.get("https://a.br/usado") is not None
+
+
+def resolve(cache: ResolutionCache, requests: list, revalidate: str = "stale"):
+    page = f'<html><head><meta name="citation_pdf_url" content="{PDF_URL}"></head>'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, text=page)
+
+    async def main():
+        session = HttpSession(
+            transport=httpx.MockTransport(handler),
+            scheduler=HostScheduler(HostPolicy(rate=1e9, burst=10**9)),
+            retry=RetryPolicy(attempts=1),
+        )
+        async with session:
+            return await resolve_url(URL, session, cache, revalidate)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "revalidate, age, requested",
+    [
+        ("stale", 0, False),
+        ("stale", 2 * DAY, True),
+        ("never", 2 * DAY, False),
+        ("always", 0, True),
+    ],
+)
+def test_resolve_url_consults_the_cache(tmp_path, clock, revalidate, age, requested):
+    requests = []
+    with ResolutionCache(tmp_path / "cache.db", ttl=DAY) as cache:
+        first = resolve(cache, requests)
+        assert (first.pdf_link, first.cached) == (PDF_URL, False)
+        clock.now += age
+        second = resolve(cache, requests, revalidate)
+        assert second.pdf_link == PDF_URL
+        assert second.cached is not requested
+        assert len(requests) == 1 + requested
+        # Só a nova consulta renova a entrada; "never" a entrega vencida
+        entry = cache.get(second.normalized_url)
+        assert cache.is_stale(entry) is (age > 0 and not requested)
@@ -0,0 +1,207 @@
+"""Testes do `DocumentDownloader`: downloads simultâneos e retomada com `Range`."""
+
+import asyncio
+
+import httpx
+
+from theses_scraper.downloader import DocumentDownloader
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+from theses_scraper.utils.validators import ValidatorStore
+
+URL = "https://repositorio.exemplo.br/bitstream/1/2/tese.pdf"
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 800
+
+
+def make_session(handler) -> HttpSession:
+    return HttpSession(
+        transport=httpx.MockTransport(handler),
+        scheduler=HostScheduler(HostPolicy(rate=1e9, burst=10**9, max_in_flight=100)),
+        retry=RetryPolicy(attempts=1),
+    )
+
+
+async def slow_body(body: bytes, chunk: int = 16 * 1024):
+    for start in range(0, len(body), chunk):
+        await asyncio.sleep(0.001)
+        yield body[start : start + chunk]
+
+
+def serve_pdf(requests: list):
+    """Responde com o PDF completo, ou com o trecho pedido em `Range`."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.headers.get("Range"))
+        headers = {"Content-Type": "application/pdf"}
+        if (range_header := request.headers.get("Range")) is not None:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(PDF) - 1}/{len(PDF)}"
+            headers["Content-Length"] = str(len(PDF) - start)
+            return httpx.Response(206, headers=headers, content=slow_body(PDF[start:]))
+        headers["Content-Length"] = str(len(PDF))
+        return httpx.Response(200, headers=headers, content=slow_body(PDF))
+
+    return handler
+
+
+def test_concurrent_downloads_of_one_url_share_the_file(tmp_path):
+    requests = []
+
+    async def main():
+        async with make_session(serve_pdf(requests)) as session:
+            downloader = DocumentDownloader(tmp_path, session=session)
+            return await asyncio.gather(
+                *(downloader.download(URL) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+    paths = asyncio.run(main())
+    assert paths == [tmp_path / "tese.pdf"] * 3
+    assert paths[0].read_bytes() == PDF
+    assert requests == [None]
+    assert not list(tmp_path.glob(".*.part"))
+
+
+def test_later_download_runs_again(tmp_path):
+    requests = []
+
+    async def main():
+        async with make_session(serve_pdf(requests)) as session:
+            downloader = DocumentDownloader(tmp_path, session=session)
+            first = await downloader.download(URL)
+            second = await downloader.download(URL)
+            return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == tmp_path / "tese.pdf"
+    assert requests == [None, None]
+
+
+def make_resumable_session(handler, tmp_path) -> HttpSession:
+    return HttpSession(
+        transport=httpx.MockTransport(handler),
+        scheduler=HostScheduler(HostPolicy(rate=1e9, burst=10**9, max_in_flight=100)),
+        retry=RetryPolicy(attempts=1),
+        validators=ValidatorStore(tmp_path / "validadores.db"),
+    )
+
+
+def run_downloads(handler, tmp_path, count: int = 2) -> list:
+    """Executa `count` downloads seguidos da mesma URL."""
+
+    async def main():
+        async with make_resumable_session(handler, tmp_path) as session:
+            downloader = DocumentDownloader(tmp_path / "docs", session=session)
+            return [(await downloader.download_parts([URL]))[0] for _ in range(count)]
+
+    return asyncio.run(main())
+
+
+def partial_files(tmp_path) -> list:
+    return list((tmp_path / "docs").glob(".*.part"))
+
+
+def test_interrupted_download_resumes_with_range_and_if_range(tmp_path):
+    requests = []
+    cut = 50_000
+
+    def handler(request):
+        requests.append((request.headers.get("Range"), request.headers.get("If-Range")))
+        headers = {"Content-Type": "application/pdf", "ETag": '"v1"'}
+        if len(requests) == 1:
+            # A conexão cai depois de `cut` bytes
+            headers["Content-Length"] = str(len(PDF))
+            return httpx.Response(200, headers=headers, content=PDF[:cut])
+        assert request.headers["Range"] == f"bytes={cut}-"
+        headers["Content-Range"] = f"bytes {cut}-{len(PDF) - 1}/{len(PDF)}"
+        headers["Content-Length"] = str(len(PDF) - cut)
+        return httpx.Response(206, headers=headers, content=PDF[cut:])
+
+    first, second = run_downloads(handler, tmp_path)
+    assert (first.status, first.reason) == ("failed", "incomplete")
+    assert second.status == "downloaded"
+    assert second.path.read_bytes() == PDF
+    assert requests == [(None, None), (f"bytes={cut}-", '"v1"')]
+    assert partial_files(tmp_path) == []
+
+
+def test_incomplete_download_is_not_renamed(tmp_path):
+    def handler(request):
+        headers = {"Content-Type": "application/pdf", "Content-Length": str(len(PDF))}
+        return httpx.Response(200, headers=headers, content=PDF[:1000])
+
+    (part,) = run_downloads(handler, tmp_path, count=1)
+    assert part.status == "failed"
+    assert list((tmp_path / "docs").glob("*.pdf")) == []
+    assert [path.stat().st_size for path in partial_files(tmp_path)] == [1000]
+
+
+def write_partial(tmp_path, size: int):
+    downloader = DocumentDownloader(tmp_path / "docs")
+    downloader._partial_path(URL).write_bytes(b"x" * size)
+
+
+def test_server_ignoring_range_sends_the_whole_file(tmp_path):
+    write_partial(tmp_path, 1000)
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("Range"))
+        headers = {"Content-Type": "application/pdf", "Content-Length": str(len(PDF))}
+        return httpx.Response(200, headers=headers, content=PDF)
+
+    (part,) = run_downloads(handler, tmp_path, count=1)
+    assert part.path.read_bytes() == PDF
+    assert requests == ["bytes=1000-"]
+
+
+def test_misaligned_partial_response_restarts_from_zero(tmp_path):
+    write_partial(tmp_path, 1000)
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("Range"))
+        headers = {"Content-Type": "application/pdf"}
+        if request.headers.get("Range"):
+            # Trecho diferente do pedido
+            headers["Content-Range"] = f"bytes 500-{len(PDF) - 1}/{len(PDF)}"
+            headers["Content-Length"] = str(len(PDF) - 500)
+            return httpx.Response(206, headers=headers, content=PDF[500:])
+        headers["Content-Length"] = str(len(PDF))
+        return httpx.Response(200, headers=headers, content=PDF)
+
+    (part,) = run_downloads(handler, tmp_path, count=1)
+    assert part.status == "downloaded"
+    assert part.path.read_bytes() == PDF
+    assert requests == ["bytes=1000-", None]
+
+
+def test_range_not_satisfiable_restarts_once(tmp_path):
+    write_partial(tmp_path, 1000)
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("Range"))
+        return httpx.Response(416)
+
+    (part,) = run_downloads(handler, tmp_path, count=1)
+    assert part.status == "error"
+    assert requests == ["bytes=1000-", None]
+    assert partial_files(tmp_path) == []
+
+
+def test_range_not_satisfiable_then_whole_file(tmp_path):
+    write_partial(tmp_path, len(PDF) + 10)
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("Range"))
+        if request.headers.get("Range"):
+            return httpx.Response(416)
+        headers = {"Content-Type": "application/pdf", "Content-Length": str(len(PDF))}
+        return httpx.Response(200, headers=headers, content=PDF)
+
+    (part,) = run_downloads(handler, tmp_path, count=1)
+    assert part.path.read_bytes() == PDF
+    assert requests == [f"bytes={len(PDF) + 10}-", None]
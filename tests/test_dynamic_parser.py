@@ -0,0 +1,131 @@
+"""Testes da renderização do `DynamicContentParser` com páginas simuladas."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from playwright.async_api import Error as PlaywrightError
+
+from theses_scraper.parsers.browser_pool import RenderPolicy
+from theses_scraper.parsers.dynamic_parser import DynamicContentParser
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+HOST = "repositorio.exemplo.br"
+URL = f"https://{HOST}/handle/1/2"
+HTML = '<a href="/bitstream/1/2/tese.pdf">PDF</a>'
+
+
+class FakeResponse:
+    status = 200
+
+    async def header_value(self, name):
+        return None
+
+
+class FakePage:
+    """Página do Playwright com a carga simulada por `on_goto`."""
+
+    def __init__(self, on_goto=None, selector_delay=0.0, selector_found=True):
+        self.url = "about:blank"
+        self.on_goto = on_goto
+        self.selector_delay = selector_delay
+        self.selector_found = selector_found
+        self.load_state_timeouts = []
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def unroute(self, pattern, handler):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+    def remove_listener(self, event, handler):
+        pass
+
+    async def goto(self, url, wait_until):
+        if self.on_goto is not None:
+            await self.on_goto()
+        self.url = url
+        return FakeResponse()
+
+    async def wait_for_selector(self, selector, state, timeout):
+        await asyncio.sleep(min(self.selector_delay, timeout / 1000))
+        if not self.selector_found or self.selector_delay >= timeout / 1000:
+            raise PlaywrightError("seletor não encontrado")
+
+    async def wait_for_load_state(self, state, timeout):
+        self.load_state_timeouts.append(timeout)
+
+    async def content(self):
+        return HTML
+
+
+class FakePool:
+    """Pool com `max_pages` páginas, entregues pela ordem de chegada."""
+
+    def __init__(self, page: FakePage, max_pages: int = 1):
+        self.render_policy = RenderPolicy()
+        self._page = page
+        self._semaphore = asyncio.Semaphore(max_pages)
+
+    @asynccontextmanager
+    async def page(self, user_agent=None):
+        async with self._semaphore:
+            yield self._page
+
+
+def test_host_slot_is_taken_after_the_page():
+    in_flight = []
+
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1e9, burst=10**9, max_in_flight=4))
+        session = HttpSession(scheduler=scheduler)
+
+        async def on_goto():
+            in_flight.append(scheduler.stats()[HOST]["in_flight"])
+            await asyncio.sleep(0.01)
+
+        pool = FakePool(FakePage(on_goto))
+        parser = DynamicContentParser(session, pool)
+        results = await asyncio.gather(
+            *(parser._render(pool, URL, 1, None) for _ in range(4))
+        )
+        await session.aclose()
+        return results
+
+    results = asyncio.run(main())
+    assert results == [(HTML, URL)] * 4
+    # Com uma única página, só a renderização em curso ocupa a vaga do host
+    assert in_flight == [1, 1, 1, 1]
+
+
+def wait_for_pdf_link(page: FakePage, timeout: float) -> float:
+    async def main():
+        started = asyncio.get_running_loop().time()
+        await DynamicContentParser._wait_for_pdf_link(page, timeout)
+        return asyncio.get_running_loop().time() - started
+
+    return asyncio.run(main())
+
+
+def test_network_idle_fallback_uses_the_remaining_time():
+    page = FakePage(selector_delay=0.06, selector_found=False)
+    elapsed = wait_for_pdf_link(page, 0.1)
+    (remaining,) = page.load_state_timeouts
+    assert 0 < remaining <= 45
+    assert elapsed < 0.1
+
+
+def test_selector_timeout_ends_the_wait():
+    page = FakePage(selector_delay=1)
+    elapsed = wait_for_pdf_link(page, 0.05)
+    assert page.load_state_timeouts == []
+    assert elapsed < 0.1
+
+
+def test_found_selector_skips_the_fallback():
+    page = FakePage(selector_delay=0.01)
+    wait_for_pdf_link(page, 1)
+    assert page.load_state_timeouts == []
@@ -0,0 +1,91 @@
+"""Testes de `http_utils.is_pdf` e da memória de confiabilidade do HEAD."""
+
+import asyncio
+
+import httpx
+
+from theses_scraper.utils import http_utils
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+PDF = b"%PDF-1.7\n" + b"0" * 2048
+
+
+def make_session(handler, requests: list) -> HttpSession:
+    def record(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.url.host, request.url.path))
+        return handler(request)
+
+    return HttpSession(
+        transport=httpx.MockTransport(record),
+        scheduler=HostScheduler(HostPolicy(rate=1e9, burst=10**9, max_in_flight=100)),
+        retry=RetryPolicy(attempts=1),
+    )
+
+
+def run(handler, urls: list[str]) -> tuple[list[bool], list, dict]:
+    requests = []
+
+    async def main():
+        async with make_session(handler, requests) as session:
+            results = [await http_utils.is_pdf(url, session) for url in urls]
+            return results, session.head_reliable
+
+    results, memo = asyncio.run(main())
+    return results, requests, memo
+
+
+def test_head_with_pdf_type():
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": "application/pdf"})
+
+    results, requests, memo = run(handler, ["https://a.br/tese.pdf"])
+    assert results == [True]
+    assert requests == [("HEAD", "a.br", "/tese.pdf")]
+    assert memo == {"a.br": True}
+
+
+def test_head_with_html_type():
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Type": "text/html"})
+
+    results, requests, _ = run(handler, ["https://a.br/handle/1"])
+    assert results == [False]
+    assert [method for method, _, _ in requests] == ["HEAD"]
+
+
+def test_generic_type_is_sniffed_and_head_skipped_afterwards():
+    def handler(request):
+        headers = {"Content-Type": "application/octet-stream"}
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+        return httpx.Response(200, headers=headers, content=PDF)
+
+    results, requests, memo = run(
+        handler, ["https://b.br/bitstream/1", "https://b.br/bitstream/2"]
+    )
+    assert results == [True, True]
+    assert memo == {"b.br": False}
+    # Depois que o HEAD se mostra pouco confiável, apenas o GET é usado
+    assert [method for method, _, _ in requests] == ["HEAD", "GET", "GET"]
+
+
+def test_head_error_falls_back_to_get():
+    def handler(request):
+        if request.method == "HEAD":
+            return httpx.Response(405)
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, text="<html>")
+
+    results, requests, memo = run(handler, ["https://c.br/x"])
+    assert results == [False]
+    assert [method for method, _, _ in requests] == ["HEAD", "GET"]
+    assert memo == {"c.br": False}
+
+
+def test_connection_error_is_not_pdf():
+    def handler(request):
+        raise httpx.ConnectError("recusada", request=request)
+
+    results, _, _ = run(handler, ["https://d.br/x"])
+    assert results == [False]
@@ -0,0 +1,68 @@
+"""Testes da contagem de tentativas do `CrawlJournal`."""
+
+import pytest
+
+from theses_scraper.batch import ResolveResult
+from theses_scraper.journal import CrawlJournal
+
+URL = "https://repositorio.exemplo.br/handle/1/2"
+
+
+@pytest.fixture
+def journal(tmp_path):
+    with CrawlJournal(tmp_path / "coleta.db", max_attempts=3) as journal:
+        yield journal
+
+
+def download_failed(reason: str = "timeout") -> ResolveResult:
+    return ResolveResult(
+        URL,
+        pdf_link="https://repositorio.exemplo.br/bitstream/1/2/tese.pdf",
+        status="download_failed",
+        reason=reason,
+    )
+
+
+def test_failed_downloads_count_attempts(journal):
+    for attempt in range(1, 4):
+        assert not journal.is_done(URL, "download")
+        journal.record_result(download_failed())
+        state = journal.get(URL)
+        assert (state.stage, state.status, state.attempts) == (
+            "download",
+            "download_failed",
+            attempt,
+        )
+    # Após `max_attempts` falhas transitórias, a URL não é tentada novamente
+    assert journal.is_done(URL, "download")
+
+
+def test_resolution_is_recorded_once(journal):
+    journal.record_result(download_failed())
+    journal.record_result(download_failed())
+    stages = [stage for stage, _, _, _ in journal.history(URL)]
+    assert stages == ["resolve", "download", "download"]
+
+
+def test_success_resets_attempts(journal):
+    journal.record_result(download_failed())
+    journal.record_result(download_failed())
+    journal.record_result(
+        ResolveResult(URL, pdf_link="https://x.br/a.pdf", status="downloaded")
+    )
+    assert journal.get(URL).attempts == 0
+    assert journal.is_done(URL, "download")
+
+
+def test_failures_in_a_new_stage_start_a_new_count(journal):
+    journal.record(URL, "resolve", "error", reason="timeout")
+    journal.record(URL, "resolve", "error", reason="timeout")
+    assert journal.get(URL).attempts == 2
+    journal.record_result(download_failed())
+    state = journal.get(URL)
+    assert (state.stage, state.attempts) == ("download", 1)
+
+
+def test_permanent_failure_is_done(journal):
+    journal.record_result(download_failed("http_404"))
+    assert journal.is_done(URL, "download")
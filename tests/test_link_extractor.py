@@ -0,0 +1,57 @@
+"""
+Equivalência entre o `PdfLinkExtractor` e a busca com o BeautifulSoup.
+
+Cada arquivo de `fixtures/pdf_links` é analisado pelos dois caminhos, que
+devem retornar o mesmo link.
+"""
+
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from theses_scraper.parsers.generic import GenericParser
+from theses_scraper.parsers.link_extractor import PdfLinkExtractor
+
+FIXTURES = Path(__file__).parent / "fixtures" / "pdf_links"
+
+CORPUS = sorted(FIXTURES.glob("*.html"))
+
+BASE_URL = "https://repositorio.exemplo.br/jspui/handle/123456789/1"
+
+
+def soup_pdf_url(html: bytes) -> str | None:
+    return GenericParser.extract_pdf_url_from_soup(
+        BeautifulSoup(html, "html.parser"), BASE_URL
+    )
+
+
+def test_corpus_is_not_empty():
+    assert len(CORPUS) >= 10
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=lambda path: path.name)
+def test_extract_pdf_url_matches_soup(path):
+    html = path.read_bytes()
+    assert GenericParser.extract_pdf_url(html, BASE_URL) == soup_pdf_url(html)
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=lambda path: path.name)
+def test_chunked_feed_matches_soup(path):
+    html = path.read_bytes()
+    extractor = PdfLinkExtractor()
+    for start in range(0, len(html), 7):
+        extractor.feed(html[start : start + 7])
+        if extractor.done:
+            break
+    else:
+        extractor.close()
+    result = GenericParser.pdf_url_from_extractor(extractor, html, BASE_URL)
+    assert result == soup_pdf_url(html)
+
+
+def test_non_ascii_link_falls_back_to_soup():
+    extractor = PdfLinkExtractor()
+    extractor.feed((FIXTURES / "latin1_accents.html").read_bytes())
+    extractor.close()
+    assert not extractor.reliable
@@ -0,0 +1,30 @@
+"""Testes da amostragem de URLs do comando `record`."""
+
+import random
+from collections import Counter
+
+from theses_scraper.__main__ import _reservoir_sample
+
+
+def test_small_input_is_kept_whole():
+    urls = (f"https://a.br/{number}" for number in range(5))
+    assert _reservoir_sample(urls, 10, random.Random(0)) == [
+        f"https://a.br/{number}" for number in range(5)
+    ]
+
+
+def test_same_seed_same_sample():
+    first = _reservoir_sample(iter(range(10_000)), 20, random.Random(7))
+    second = _reservoir_sample(iter(range(10_000)), 20, random.Random(7))
+    assert first == second
+    assert len(set(first)) == 20
+    assert _reservoir_sample(iter(range(10_000)), 20, random.Random(8)) != first
+
+
+def test_sample_is_uniform():
+    rng = random.Random(0)
+    counts = Counter()
+    for _ in range(4000):
+        counts.update(_reservoir_sample(iter(range(20)), 5, rng))
+    # Cada item deve ser sorteado em cerca de 1/4 das amostras
+    assert all(850 < counts[item] < 1150 for item in range(20))
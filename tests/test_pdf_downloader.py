@@ -0,0 +1,43 @@
+"""Testes dos métodos obsoletos do `PDFDownloader`."""
+
+import pytest
+
+from theses_scraper.parsers.dynamic_parser import DynamicContentParser
+from theses_scraper.pdf_downloader import PDFDownloader
+
+URL = "https://repositorio.unesp.br/handle/11449/1"
+PDF_URL = "https://repositorio.unesp.br/bitstream/11449/1/tese.pdf"
+
+
+@pytest.fixture
+def renders(monkeypatch) -> list:
+    """Substitui a renderização, registrando o pool e o tempo limite usados."""
+    calls = []
+
+    async def render(self, pool, url, timeout, user_agent):
+        calls.append((pool, timeout))
+        return f'<a href="{PDF_URL}">PDF</a>', url
+
+    monkeypatch.setattr(DynamicContentParser, "_render", render)
+    yield calls
+    PDFDownloader.close()
+
+
+@pytest.mark.parametrize(
+    "proxy", ["http://proxy.exemplo.br:3128", "proxy.exemplo.br:3128"]
+)
+def test_fetch_with_selenium_uses_its_own_browser_with_the_proxy(renders, proxy):
+    with pytest.warns(DeprecationWarning):
+        assert PDFDownloader.fetch_with_selenium(URL, proxy=proxy, timeout=5) == PDF_URL
+    ((pool, timeout),) = renders
+    assert pool.proxy == {"server": proxy}
+    assert timeout == 5
+
+
+def test_fetch_with_selenium_without_proxy_uses_the_shared_pool(renders):
+    with pytest.warns(DeprecationWarning):
+        PDFDownloader.fetch_with_selenium(URL)
+        PDFDownloader.fetch_with_selenium(URL)
+    (first, _), (second, _) = renders
+    assert first is second
+    assert first.proxy is None
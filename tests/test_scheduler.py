@@ -0,0 +1,209 @@
+"""Testes do `HostScheduler`: limites por host e taxa adaptativa."""
+
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import (
+    HostPolicy,
+    HostScheduler,
+    parse_retry_after,
+)
+from theses_scraper.utils.session import HttpSession
+
+HOST = "repositorio.exemplo.br"
+URL = f"https://{HOST}/handle/1/2"
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def respond(scheduler: HostScheduler, *responses):
+    """Registra respostas `(status, retry_after, latency)` do host."""
+    for status, retry_after, latency in responses:
+        await scheduler.acquire(HOST)
+        await scheduler.release(HOST, status, retry_after, latency)
+
+
+def test_in_flight_limit_per_host():
+    active = {HOST: 0, "outro.br": 0}
+    peak = {HOST: 0, "outro.br": 0}
+
+    async def request(scheduler, host):
+        async with scheduler.slot(host) as feedback:
+            active[host] += 1
+            peak[host] = max(peak[host], active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            feedback(200)
+
+    async def main():
+        scheduler = HostScheduler(
+            HostPolicy(rate=1e9, burst=10**9, max_in_flight=2),
+            policies={"outro.br": HostPolicy(rate=1e9, burst=10**9, max_in_flight=5)},
+        )
+        await asyncio.gather(
+            *(request(scheduler, HOST) for _ in range(8)),
+            *(request(scheduler, "outro.br") for _ in range(8)),
+        )
+        return scheduler.stats()
+
+    stats = run(main())
+    assert peak == {HOST: 2, "outro.br": 5}
+    assert stats[HOST]["in_flight"] == stats["outro.br"]["in_flight"] == 0
+
+
+def test_full_host_is_not_ready():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1e9, burst=10**9, max_in_flight=1))
+        await scheduler.acquire(HOST)
+        busy = (scheduler.is_ready(HOST), scheduler.wait_time(HOST))
+        await scheduler.release(HOST, 200)
+        return busy, scheduler.is_ready(HOST)
+
+    (ready, wait), ready_after = run(main())
+    assert (ready, wait) == (False, float("inf"))
+    assert ready_after
+
+
+def test_token_bucket_limits_the_rate():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=50, burst=2, max_in_flight=10))
+        started = time.monotonic()
+        for _ in range(7):
+            await scheduler.acquire(HOST)
+            await scheduler.release(HOST)
+        return time.monotonic() - started
+
+    # Duas requisições da rajada e cinco a 50/s
+    assert run(main()) >= 5 / 50 * 0.9
+
+
+def test_throttle_halves_the_rate_and_honours_retry_after():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=10, burst=10))
+        await respond(scheduler, (429, "2", 0.1))
+        return scheduler.stats()[HOST]
+
+    stats = run(main())
+    assert stats["rate"] == 5
+    assert stats["tokens"] <= 1
+    assert 1.9 < stats["blocked_for"] <= 2
+
+
+def test_throttle_without_retry_after_waits_one_interval():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=4, burst=10))
+        await respond(scheduler, (503, None, 0.1))
+        return scheduler.stats()[HOST], scheduler.wait_time(HOST)
+
+    stats, wait = run(main())
+    assert stats["rate"] == 2
+    assert 0.4 < stats["blocked_for"] <= 0.5
+    assert wait == pytest.approx(stats["blocked_for"], abs=0.05)
+
+
+def test_repeated_throttling_stops_at_min_rate():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1000, burst=10), min_rate=100)
+        await respond(scheduler, *[(429, "0", None)] * 10)
+        return scheduler.stats()[HOST]["rate"]
+
+    assert run(main()) == 100
+
+
+def test_successes_recover_the_rate_up_to_the_policy():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1000, burst=10**9), recovery_step=0.1)
+        await respond(scheduler, (429, "0", None))
+        rates = []
+        for _ in range(8):
+            await respond(scheduler, (200, None, None))
+            rates.append(scheduler.stats()[HOST]["rate"])
+        return rates
+
+    rates = run(main())
+    assert rates[:5] == pytest.approx([600, 700, 800, 900, 1000])
+    assert rates[5:] == [1000, 1000, 1000]
+
+
+def test_server_errors_do_not_recover_the_rate():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1000, burst=10**9))
+        await respond(scheduler, (429, "0", None), (500, None, None))
+        return scheduler.stats()[HOST]["rate"]
+
+    assert run(main()) == 500
+
+
+def test_latency_spike_reduces_the_rate_with_a_floor():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1000, burst=10**9))
+        await respond(scheduler, *[(200, None, 0.01)] * 10)
+        rates = []
+        for _ in range(40):
+            await respond(scheduler, (200, None, 5.0))
+            rates.append(scheduler.stats()[HOST]["rate"])
+        return rates
+
+    rates = run(main())
+    assert rates[0] == pytest.approx(800)
+    # A latência reduz a taxa, mas não abaixo de 25% da configurada...
+    assert min(rates) == pytest.approx(250)
+    # ...e a referência acompanha a nova latência, devolvendo a taxa
+    assert rates[-1] == 1000
+
+
+def test_latency_never_raises_a_throttled_rate():
+    async def main():
+        scheduler = HostScheduler(HostPolicy(rate=1000, burst=10**9))
+        await respond(scheduler, *[(200, None, 0.01)] * 10)
+        for _ in range(3):
+            await respond(scheduler, (429, "0", None))
+        throttled = scheduler.stats()[HOST]["rate"]
+        await respond(scheduler, *[(200, None, 5.0)] * 10)
+        return throttled, scheduler.stats()[HOST]["rate"]
+
+    throttled, after = run(main())
+    # 1000 → 500 → 250 → 125, abaixo do piso de 250 da latência
+    assert throttled == pytest.approx(125)
+    assert after == pytest.approx(throttled)
+
+
+def test_session_feeds_retry_after_to_the_scheduler():
+    requests = []
+
+    def handler(request):
+        requests.append(time.monotonic())
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.3"})
+        return httpx.Response(200, text="ok")
+
+    async def main():
+        session = HttpSession(
+            transport=httpx.MockTransport(handler),
+            scheduler=HostScheduler(HostPolicy(rate=1e9, burst=10**9)),
+            retry=RetryPolicy(attempts=1),
+        )
+        async with session:
+            first = await session.request("GET", URL)
+            second = await session.request("GET", URL)
+        return first.status_code, second.status_code
+
+    assert run(main()) == (429, 200)
+    assert requests[1] - requests[0] >= 0.25
+
+
+def test_parse_retry_after():
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after("-3") == 0
+    assert 25 < parse_retry_after(format_datetime(later, usegmt=True)) <= 30
+    assert parse_retry_after("amanhã") is None
+    assert parse_retry_after(None) is None
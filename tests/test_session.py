@@ -0,0 +1,90 @@
+"""Testes das tentativas da `HttpSession` sob o escalonador e os disjuntores."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from theses_scraper.utils.policy import RetryPolicy, TimeoutPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+URL = "https://repositorio.exemplo.br/handle/1/2"
+HOST = "repositorio.exemplo.br"
+
+
+def make_session(requests: list, total: float = 0.3) -> HttpSession:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        return httpx.Response(200, text="ok")
+
+    return HttpSession(
+        transport=httpx.MockTransport(handler),
+        scheduler=HostScheduler(HostPolicy(rate=1e9, burst=10**9, max_in_flight=1)),
+        timeout=TimeoutPolicy(total=total),
+        retry=RetryPolicy(attempts=1),
+    )
+
+
+async def block_host(session: HttpSession, seconds: int):
+    """Pausa o host como após um 503 com `Retry-After`."""
+    async with session.scheduler.slot(HOST) as feedback:
+        feedback(503, str(seconds))
+
+
+@pytest.mark.parametrize("method", ["request", "stream"])
+def test_waiting_for_the_slot_is_not_a_failure(method):
+    requests = []
+
+    async def main():
+        async with make_session(requests) as session:
+            await block_host(session, 1)
+            if method == "request":
+                response = await session.request("GET", URL)
+            else:
+                async with session.stream("GET", URL) as response:
+                    await response.aread()
+            return response.status_code, session.breakers.stats()[HOST]
+
+    status, breaker = asyncio.run(main())
+    assert status == 200
+    assert len(requests) == 1
+    assert breaker["state"] == "closed"
+    assert breaker["failures"] == 0
+
+
+def test_cancelled_wait_releases_the_breaker():
+    requests = []
+
+    async def main():
+        async with make_session(requests) as session:
+            await block_host(session, 5)
+            for _ in range(6):
+                with pytest.raises(TimeoutError):
+                    async with asyncio.timeout(0.05):
+                        await session.request("GET", URL)
+            return session.breakers.stats().get(HOST, {})
+
+    breaker = asyncio.run(main())
+    assert requests == []
+    assert breaker.get("failures", 0) == 0
+    assert breaker.get("state", "closed") == "closed"
+
+
+def test_slow_response_still_times_out():
+    async def main():
+        async def slow(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200)
+
+        session = HttpSession(
+            transport=httpx.MockTransport(slow),
+            timeout=TimeoutPolicy(total=0.1),
+            retry=RetryPolicy(attempts=1),
+        )
+        async with session:
+            with pytest.raises(httpx.TimeoutException):
+                await session.request("GET", URL)
+            return session.breakers.stats()[HOST]
+
+    assert asyncio.run(main())["failures"] == 1
@@ -0,0 +1,62 @@
+"""Testes da `SingleFlight`."""
+
+import asyncio
+
+import pytest
+
+from theses_scraper.utils.single_flight import SingleFlight
+
+
+def test_simultaneous_calls_share_the_result():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.run("a", operation) for _ in range(5)))
+        return results, "a" in flight
+
+    assert asyncio.run(main()) == ([1] * 5, False)
+    assert len(calls) == 1
+
+
+def test_exception_reaches_every_caller():
+    async def operation():
+        await asyncio.sleep(0.01)
+        raise ValueError("falhou")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            *(flight.run("a", operation) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [ValueError] * 3
+
+
+def test_cancelled_owner_hands_over_to_a_waiting_caller():
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        flight = SingleFlight()
+        owner = asyncio.create_task(flight.run("a", operation))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.run("a", operation))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter
+
+    assert asyncio.run(main()) == "ok"
+    assert len(calls) == 2
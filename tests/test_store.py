@@ -0,0 +1,123 @@
+"""Testes do `ContentStore`: layout dos objetos e descarte de duplicatas."""
+
+import asyncio
+import hashlib
+
+import httpx
+
+from theses_scraper.downloader import DocumentDownloader
+from theses_scraper.store import PREFIX_SIZE, ContentStore
+from theses_scraper.utils.policy import RetryPolicy
+from theses_scraper.utils.scheduler import HostPolicy, HostScheduler
+from theses_scraper.utils.session import HttpSession
+
+HOST = "https://repositorio.exemplo.br"
+PDF = b"%PDF-1.7\n" + bytes(range(256)) * 1000
+DIGEST = hashlib.sha256(PDF).hexdigest()
+
+
+def serve(bodies: dict, sent: dict, content_length: bool = True):
+    """Serve `bodies` por caminho, registrando quantos bytes foram lidos."""
+
+    async def stream(path: str):
+        body = bodies[path]
+        for start in range(0, len(body), 16 * 1024):
+            chunk = body[start : start + 16 * 1024]
+            sent[path] = sent.get(path, 0) + len(chunk)
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {"Content-Type": "application/pdf"}
+        if content_length:
+            headers["Content-Length"] = str(len(bodies[request.url.path]))
+        return httpx.Response(200, headers=headers, content=stream(request.url.path))
+
+    return handler
+
+
+def download(store: ContentStore, handler, paths: list[str]) -> list:
+    """Baixa as URLs em sequência para o armazenamento."""
+
+    async def main():
+        session = HttpSession(
+            transport=httpx.MockTransport(handler),
+            scheduler=HostScheduler(
+                HostPolicy(rate=1e9, burst=10**9, max_in_flight=100)
+            ),
+            retry=RetryPolicy(attempts=1),
+        )
+        async with session:
+            downloader = DocumentDownloader(store.root, session=session, store=store)
+            return [await downloader.download(f"{HOST}{path}") for path in paths]
+
+    return asyncio.run(main())
+
+
+def test_objects_are_named_by_hash(tmp_path):
+    with ContentStore(tmp_path) as store:
+        (path,) = download(store, serve({"/a.pdf": PDF}, {}), ["/a.pdf"])
+        assert path == tmp_path / "objects" / DIGEST[:2] / DIGEST[2:4] / (
+            f"{DIGEST}.pdf"
+        )
+        assert path.read_bytes() == PDF
+        assert store.get(f"{HOST}/a.pdf").hash == DIGEST
+        assert list(store.tmp_dir.iterdir()) == []
+
+
+def test_same_content_is_stored_once(tmp_path):
+    # Sem `Content-Length` não há descarte antecipado: o hash decide
+    bodies = {"/a.pdf": PDF, "/b.pdf": PDF}
+    sent = {}
+    with ContentStore(tmp_path) as store:
+        first, second = download(
+            store, serve(bodies, sent, content_length=False), list(bodies)
+        )
+        assert first == second
+        assert sent == {"/a.pdf": len(PDF), "/b.pdf": len(PDF)}
+        assert store.urls(DIGEST) == [f"{HOST}/a.pdf", f"{HOST}/b.pdf"]
+        assert list(store.tmp_dir.iterdir()) == []
+    assert len(list((tmp_path / "objects").rglob("*.pdf"))) == 1
+
+
+def test_matching_prefix_and_size_stop_the_download(tmp_path):
+    bodies = {"/a.pdf": PDF, "/b.pdf": PDF}
+    sent = {}
+    with ContentStore(tmp_path) as store:
+        first, second = download(store, serve(bodies, sent), list(bodies))
+        assert first == second
+        assert sent["/b.pdf"] < len(PDF)
+        assert sent["/b.pdf"] >= PREFIX_SIZE
+        assert store.urls(DIGEST) == [f"{HOST}/a.pdf", f"{HOST}/b.pdf"]
+
+
+def test_different_size_is_downloaded_in_full(tmp_path):
+    other = PDF + b"%%EOF\n"
+    bodies = {"/a.pdf": PDF, "/b.pdf": other}
+    sent = {}
+    with ContentStore(tmp_path) as store:
+        first, second = download(store, serve(bodies, sent), list(bodies))
+        assert first != second
+        assert second.read_bytes() == other
+        assert sent["/b.pdf"] == len(other)
+
+
+def test_early_dedup_can_be_disabled(tmp_path):
+    bodies = {"/a.pdf": PDF, "/b.pdf": PDF}
+    sent = {}
+    with ContentStore(tmp_path, early_dedup=False) as store:
+        first, second = download(store, serve(bodies, sent), list(bodies))
+        assert first == second
+        assert sent["/b.pdf"] == len(PDF)
+
+
+def test_removed_object_is_not_reused(tmp_path):
+    bodies = {"/a.pdf": PDF, "/b.pdf": PDF}
+    sent = {}
+    with ContentStore(tmp_path) as store:
+        (first,) = download(store, serve(bodies, sent), ["/a.pdf"])
+        first.unlink()
+        assert store.get(f"{HOST}/a.pdf") is None
+        (second,) = download(store, serve(bodies, sent), ["/b.pdf"])
+        assert second == first
+        assert second.read_bytes() == PDF
+        assert sent["/b.pdf"] == len(PDF)
@@ -0,0 +1,153 @@
+"""Testes da triagem: deduplicação das URLs e divisão em arquivos por host."""
+
+import csv
+
+import pytest
+
+from theses_scraper.journal import CrawlJournal
+from theses_scraper.triage import (
+    SeenSet,
+    canonicalize,
+    read_urls,
+    triage,
+    triage_to_shards,
+)
+
+UFSC = "https://repositorio.ufsc.br/handle/123456789/1"
+UNESP = "https://repositorio.unesp.br/handle/11449/1"
+UFRR = "https://bdtd.ufrr.br/tde_busca/arquivo.php?codArquivo=1"
+
+URLS = [
+    UFSC,
+    "  HTTPS://Repositorio.UFSC.br/handle/123456789/1\n",
+    UNESP,
+    "https://repositorio.unifesp.br/xmlui/handle/11600/1",
+    "https://repositorio.unifesp.br/handle/11600/1",
+    "https://link.springer.com/article/1",
+    "repositorio.ufsc.br/handle/2",
+    "https://repositorio com espaço.br/x",
+    UFRR,
+    "https://repositorio.ufsc.br/handle/123456789/2",
+]
+
+
+def test_triage_classifies_and_dedupes_after_fixing():
+    items = list(triage(URLS))
+    assert [item.status for item in items] == [
+        "ok",
+        "duplicate",
+        "ok",
+        "ok",
+        # Igual à anterior depois de `update_url`
+        "duplicate",
+        "denied",
+        "invalid",
+        "invalid",
+        "ok",
+        "ok",
+    ]
+    assert items[1].url == UFSC
+    assert items[4].normalized_url == items[3].normalized_url
+    ok = [(item.parser, item.host) for item in items if item.ok]
+    assert ok == [
+        ("GenericParser", "repositorio.ufsc.br"),
+        ("DynamicContentParser", "repositorio.unesp.br"),
+        ("DynamicContentParser", "repositorio.unifesp.br"),
+        ("UFRRParser", "bdtd.ufrr.br"),
+        ("GenericParser", "repositorio.ufsc.br"),
+    ]
+
+
+def test_canonicalize_keeps_userinfo_path_and_query():
+    assert canonicalize(" HTTP://User@Exemplo.BR:8080/A?B=C#D ") == (
+        "http://User@exemplo.br:8080/A?B=C#D"
+    )
+    assert canonicalize("sem esquema") == "sem esquema"
+
+
+def test_seen_set_persists_between_runs(tmp_path):
+    path = tmp_path / "vistas.db"
+    with SeenSet(path, commit_every=2) as seen:
+        assert [seen.add(url) for url in (UFSC, UNESP, UFSC)] == [True, True, False]
+    with SeenSet(path) as seen:
+        assert [item.status for item in triage([UFSC, UFRR], seen)] == [
+            "duplicate",
+            "ok",
+        ]
+
+
+def test_temporary_seen_set_is_removed():
+    seen = SeenSet()
+    path = seen.path
+    seen.add(UFSC)
+    seen.close()
+    assert not path.exists()
+
+
+def read_shard(path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+@pytest.mark.parametrize("max_buffered", [1, 3, 100_000])
+def test_shards_group_urls_by_parser_and_host(tmp_path, max_buffered):
+    report = triage_to_shards(URLS, tmp_path, max_buffered=max_buffered)
+    assert report.total == len(URLS)
+    assert report.statuses == {"ok": 5, "duplicate": 2, "invalid": 2, "denied": 1}
+    assert read_shard(tmp_path / "GenericParser" / "repositorio.ufsc.br.txt") == [
+        UFSC,
+        "https://repositorio.ufsc.br/handle/123456789/2",
+    ]
+    assert read_shard(tmp_path / "UFRRParser" / "bdtd.ufrr.br.txt") == [UFRR]
+    assert read_shard(
+        tmp_path / "DynamicContentParser" / "repositorio.unesp.br.txt"
+    ) == [UNESP]
+    with open(tmp_path / "counts.csv", encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert rows[0] == {
+        "parser": "GenericParser",
+        "host": "repositorio.ufsc.br",
+        "count": "2",
+        "path": "GenericParser/repositorio.ufsc.br.txt",
+    }
+    assert sum(int(row["count"]) for row in rows) == 5
+
+
+def test_shard_names_are_safe(tmp_path):
+    triage_to_shards(["https://user@exemplo.br:8080/x"], tmp_path)
+    assert read_shard(tmp_path / "GenericParser" / "user_exemplo.br_8080.txt") == [
+        "https://user@exemplo.br:8080/x"
+    ]
+
+
+def test_shards_are_appended_across_runs_with_a_shared_seen_set(tmp_path):
+    with SeenSet(tmp_path / "vistas.db") as seen:
+        first = triage_to_shards([UFSC, UFRR], tmp_path / "shards", seen)
+        second = triage_to_shards([UFRR, UNESP], tmp_path / "shards", seen)
+    assert first.statuses == {"ok": 2}
+    assert second.statuses == {"duplicate": 1, "ok": 1}
+    assert read_shard(tmp_path / "shards" / "UFRRParser" / "bdtd.ufrr.br.txt") == [UFRR]
+
+
+def test_shards_record_the_triage_in_the_journal(tmp_path):
+    with CrawlJournal(tmp_path / "coleta.db") as journal:
+        journal.record(UNESP, "resolve", "resolved")
+        triage_to_shards([UFSC, UFSC, UNESP], tmp_path / "shards", journal=journal)
+        assert (journal.get(UFSC).stage, journal.get(UFSC).status) == (
+            "triage",
+            "ok",
+        )
+        # URLs já registradas mantêm o estado das etapas seguintes
+        assert journal.get(UNESP).stage == "resolve"
+
+
+def test_read_urls_formats(tmp_path):
+    (tmp_path / "urls.csv").write_text(f"id,link\n1,{UFSC}\n2,\n3,{UFRR}\n")
+    (tmp_path / "urls.jsonl").write_text(
+        f'{{"url": "{UFSC}"}}\n\n"{UFRR}"\n{{"outro": 1}}\n'
+    )
+    (tmp_path / "urls.txt").write_text(f"{UFSC}\n\n{UFRR}\n")
+    assert list(read_urls(tmp_path / "urls.csv", column="link")) == [UFSC, UFRR]
+    assert list(read_urls(tmp_path / "urls.jsonl")) == [UFSC, UFRR]
+    assert [url.strip() for url in read_urls(tmp_path / "urls.txt")] == [UFSC, UFRR]
+    with pytest.raises(ValueError):
+        list(read_urls(tmp_path / "urls.csv"))
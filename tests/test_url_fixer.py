@@ -0,0 +1,83 @@
+"""
+Equivalência entre o `_Rewriter` e a aplicação sequencial das regras.
+
+A referência é a implementação anterior de `update_url`, que aplicava todas
+as regras de `_REPLACEMENTS` em ordem com `reduce`.
+"""
+
+import random
+from functools import reduce
+
+import pytest
+
+from theses_scraper.url_fixer import _REPLACEMENTS, update_url, update_urls
+
+# Trechos comuns nas URLs de entrada, combinados com os alvos das regras
+_FRAGMENTS = [
+    "",
+    "/",
+    "/handle/123456789/1",
+    "/tede",
+    "/jspui",
+    "/bitstream/1/2/tese.pdf",
+    "?sequence=1",
+    "#topo",
+    ":8080",
+    "www.",
+    "http://",
+    "https://",
+    "-",
+    ".",
+    "_",
+    "x",
+]
+
+
+def reduce_rewrite(url: str) -> str:
+    return reduce(
+        lambda updated_url, target: updated_url.replace(target, _REPLACEMENTS[target]),
+        _REPLACEMENTS,
+        url,
+    )
+
+
+def generated_urls(count: int, seed: int = 2024):
+    """URLs que combinam alvos, substituições e trechos das regras."""
+    rng = random.Random(seed)
+    pieces = list(_REPLACEMENTS) + list(_REPLACEMENTS.values()) + _FRAGMENTS
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            piece = rng.choice(pieces)
+            if piece and rng.random() < 0.2:
+                # Corta o trecho para gerar alvos incompletos
+                cut = rng.randrange(len(piece))
+                piece = piece[:cut] if rng.random() < 0.5 else piece[cut:]
+            parts.append(piece)
+        yield "".join(parts)
+
+
+@pytest.mark.parametrize("target", list(_REPLACEMENTS))
+def test_each_rule_matches_reduce(target):
+    for url in (
+        target,
+        f"http://{target}/handle/1/2",
+        f"{target}{target}",
+        f"{target}/{_REPLACEMENTS[target]}",
+    ):
+        assert update_url(url) == reduce_rewrite(url)
+
+
+def test_chained_rules_match_reduce():
+    targets = list(_REPLACEMENTS)
+    for first in targets:
+        for second in targets:
+            url = f"{first}/{second}"
+            assert update_url(url) == reduce_rewrite(url)
+
+
+def test_generated_urls_match_reduce():
+    urls = list(generated_urls(50_000))
+    expected = [reduce_rewrite(url) for url in urls]
+    assert [update_url(url) for url in urls] == expected
+    assert list(update_urls(urls)) == expected
@@ -0,0 +1,70 @@
+"""Testes do sorteio de User Agents."""
+
+from collections import Counter
+
+import pytest
+
+from theses_scraper.utils.user_agent import (
+    UserAgent,
+    UserAgentManager,
+    user_agent_family,
+)
+
+EXTRA = [
+    # Safari e Edge em celulares, fora da lista do gerenciador
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/16.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 10; HD1913) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/113.0.5672.77 Mobile Safari/537.36 EdgA/113.0.1774.38",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/16.0 EdgiOS/113.1774.50 Mobile/15E148 "
+    "Safari/605.1.15",
+]
+
+
+@pytest.mark.parametrize("user_agent", UserAgentManager._uas + EXTRA)
+def test_family_matches_ua_parser(user_agent):
+    parsed = UserAgent(user_agent)
+    assert user_agent_family(user_agent) == f"{parsed.os}/{parsed.browser}"
+
+
+def test_unknown_user_agent_is_its_own_family():
+    assert user_agent_family("theses-scraper/1.0") == "theses-scraper/1.0"
+
+
+def test_weights_use_exact_family_names():
+    weights = UserAgentManager._weights
+    for user_agent in UserAgentManager().user_agents:
+        parsed = UserAgent(str(user_agent))
+        expected = weights.get(parsed.os, 0.1) + weights.get(parsed.browser, 0.1)
+        assert user_agent.weight == pytest.approx(expected), str(user_agent)
+    # As versões móveis não recebem o peso das versões de desktop
+    chrome_mobile = UserAgent(UserAgentManager._uas[-1])
+    assert chrome_mobile.weight == pytest.approx(weights["Android"] + 0.1)
+
+
+def test_sampling_follows_the_weights():
+    manager = UserAgentManager(seed=1)
+    draws = 200_000
+    counts = Counter(str(manager.get_user_agent()) for _ in range(draws))
+    total = sum(ua.weight for ua in manager.user_agents)
+    for user_agent in manager.user_agents:
+        expected = user_agent.weight / total
+        # Os User Agents repetidos na lista somam as probabilidades
+        share = manager._uas.count(str(user_agent)) * expected
+        assert counts[str(user_agent)] / draws == pytest.approx(share, abs=0.005)
+
+
+def test_recent_user_agents_are_avoided_per_host():
+    manager = UserAgentManager(recent=4, seed=2)
+    draws = [manager.get_user_agent("a.br") for _ in range(500)]
+    # Sem um sorteio novo, volta o menos recente dos quatro últimos
+    for index in range(3, len(draws)):
+        assert all(draws[index] is not ua for ua in draws[index - 3 : index])
+
+
+def test_host_table_is_bounded():
+    manager = UserAgentManager(max_hosts=3, seed=3)
+    for host in ("a.br", "b.br", "c.br", "d.br"):
+        manager.get_user_agent(host)
+    assert list(manager._hosts) == ["b.br", "c.br", "d.br"]
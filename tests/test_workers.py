@@ -0,0 +1,49 @@
+"""Testes do envio de lotes aos processos da coleta distribuída."""
+
+import queue
+
+import pytest
+
+from theses_scraper.workers import _Dispatcher
+
+
+class FakeProcess:
+    def __init__(self, alive: bool = True):
+        self.alive = alive
+        self.name = "theses-scraper-0"
+        self.exitcode = None if alive else 1
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+def test_full_inbox_does_not_block_other_shards():
+    inboxes = [queue.Queue(maxsize=1), queue.Queue(maxsize=1)]
+    dispatcher = _Dispatcher(inboxes, [FakeProcess(), FakeProcess()], max_pending=4)
+    for batch in range(4):
+        dispatcher.send(0, [f"lento-{batch}"])
+    # O processo 0 não consome a fila, mas o processo 1 continua recebendo
+    dispatcher.send(1, ["rapido-0"])
+    assert inboxes[1].get_nowait() == ["rapido-0"]
+    assert len(dispatcher.pending[0]) == 3
+
+
+def test_pending_batches_keep_their_order():
+    inboxes = [queue.Queue(maxsize=1)]
+    dispatcher = _Dispatcher(inboxes, [FakeProcess()], max_pending=8)
+    for batch in range(3):
+        dispatcher.send(0, [batch])
+    dispatcher.send(0, None)
+    received = []
+    while dispatcher.pending[0] or not inboxes[0].empty():
+        received.append(inboxes[0].get_nowait())
+        dispatcher.flush()
+    assert received == [[0], [1], [2], None]
+
+
+def test_dead_process_is_reported():
+    inboxes = [queue.Queue(maxsize=1)]
+    dispatcher = _Dispatcher(inboxes, [FakeProcess(alive=False)], max_pending=8)
+    dispatcher.send(0, ["a"])
+    with pytest.raises(RuntimeError, match="terminou com código 1"):
+        dispatcher.send(0, ["b"])
@@ -1,5 +1,211 @@
-def main():
-    print(f"Hello from {__package__}!")
+"""
+Interface de linha de comando do theses_scraper.
+
+Os módulos de cada comando (e o httpx e o asyncio que eles usam) são
+importados apenas quando o comando é executado.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+from collections import Counter
+from collections.abc import Iterable
+
+from .journal import CrawlJournal
+from .triage import SeenSet, read_urls, triage_to_shards
+
+
+def _triage(args: argparse.Namespace):
+    """Executa a triagem das URLs dos arquivos de entrada."""
+    urls = itertools.chain.from_iterable(
+        read_urls(path, column=args.column, fmt=args.format) for path in args.inputs
+    )
+    seen = SeenSet(args.seen) if args.seen else None
+    journal = CrawlJournal(args.journal) if args.journal else None
+    try:
+        report = triage_to_shards(
+            urls,
+            args.out,
+            seen=seen,
+            max_buffered=args.max_buffered,
+            journal=journal,
+        )
+    finally:
+        if seen is not None:
+            seen.close()
+        if journal is not None:
+            journal.close()
+    print(f"URLs lidas: {report.total}")
+    for status, count in report.statuses.most_common():
+        print(f"  {status}: {count}")
+    print(f"Hosts: {len(report.shards)} (contagens em {args.out}/counts.csv)")
+
+
+def _crawl(args: argparse.Namespace):
+    """Resolve e baixa as URLs dos arquivos de entrada em vários processos."""
+    from .workers import crawl  # pylint: disable=import-outside-toplevel
+
+    urls = itertools.chain.from_iterable(
+        read_urls(path, column=args.column, fmt=args.format) for path in args.inputs
+    )
+    if args.metrics:
+        # Herdada pelos processos, que imprimem o resumo das métricas ao terminar
+        os.environ["THESES_SCRAPER_METRICS"] = "1"
+    statuses = crawl(
+        (url.strip() for url in urls),
+        args.journal,
+        save_path=args.out,
+        processes=args.processes,
+        concurrency=args.concurrency,
+    )
+    print(f"URLs processadas: {sum(statuses.values())}")
+    for status, count in statuses.most_common():
+        print(f"  {status}: {count}")
+
+
+def _reservoir_sample(items: Iterable, size: int, rng: random.Random) -> list:
+    """
+    Sorteia `size` itens percorrendo a entrada uma única vez.
+
+    Amostragem por reservatório: apenas a amostra fica em memória, e cada
+    item da entrada tem a mesma chance de ser sorteado.
+    """
+    sample = []
+    for index, item in enumerate(items):
+        if index < size:
+            sample.append(item)
+        elif (slot := rng.randrange(index + 1)) < size:
+            sample[slot] = item
+    return sample
+
+
+def _record(args: argparse.Namespace):
+    """Grava as respostas HTTP de uma amostra das URLs para reprodução."""
+    import asyncio  # pylint: disable=import-outside-toplevel
+
+    from .batch import record_fixtures  # pylint: disable=import-outside-toplevel
+
+    urls = itertools.chain.from_iterable(
+        read_urls(path, column=args.column, fmt=args.format) for path in args.inputs
+    )
+    urls = (url.strip() for url in urls)
+    if args.sample:
+        urls = _reservoir_sample(urls, args.sample, random.Random(args.seed))
+
+    async def record() -> Counter:
+        statuses = Counter()
+        async for result in record_fixtures(
+            urls, args.out, concurrency=args.concurrency, max_body=args.max_body
+        ):
+            statuses[result.status] += 1
+        return statuses
+
+    statuses = asyncio.run(record())
+    print(f"URLs gravadas em {args.out}: {sum(statuses.values())}")
+    for status, count in statuses.most_common():
+        print(f"  {status}: {count}")
+
+
+def _report(args: argparse.Namespace):
+    """Imprime, em CSV, as contagens ou as falhas registradas no diário."""
+    writer = csv.writer(sys.stdout)
+    with CrawlJournal(args.journal) as journal:
+        if args.failures:
+            writer.writerow(["url", "host", "stage", "status", "reason", "attempts"])
+            for state in journal.failures(host=args.host, reason=args.reason):
+                writer.writerow(
+                    [
+                        state.url,
+                        state.host,
+                        state.stage,
+                        state.status,
+                        state.reason,
+                        state.attempts,
+                    ]
+                )
+        else:
+            writer.writerow(["host", "stage", "status", "reason", "count"])
+            writer.writerows(journal.report(host=args.host))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog=__package__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    triage = commands.add_parser(
+        "triage",
+        help="padroniza, filtra, deduplica e agrupa URLs por parser e host",
+    )
+    triage.add_argument("inputs", nargs="+", help="arquivos CSV, JSONL ou texto")
+    triage.add_argument("-o", "--out", required=True, help="diretório de saída")
+    triage.add_argument("--column", default="url", help="coluna ou campo da URL")
+    triage.add_argument("--format", choices=["csv", "jsonl", "txt"], default=None)
+    triage.add_argument(
+        "--seen", help="banco SQLite das URLs já vistas, mantido entre execuções"
+    )
+    triage.add_argument("--max-buffered", type=int, default=100_000)
+    triage.add_argument("--journal", help="diário da coleta (SQLite)")
+    triage.set_defaults(handler=_triage)
+
+    crawl_command = commands.add_parser(
+        "crawl", help="resolve e baixa as URLs em vários processos, por host"
+    )
+    crawl_command.add_argument("inputs", nargs="+", help="arquivos CSV, JSONL ou texto")
+    crawl_command.add_argument(
+        "--journal", required=True, help="diário da coleta (SQLite)"
+    )
+    crawl_command.add_argument(
+        "-o", "--out", help="diretório dos documentos; se omitido, apenas resolve"
+    )
+    crawl_command.add_argument("-p", "--processes", type=int, default=None)
+    crawl_command.add_argument("--concurrency", type=int, default=32)
+    crawl_command.add_argument("--column", default="url", help="coluna ou campo da URL")
+    crawl_command.add_argument(
+        "--format", choices=["csv", "jsonl", "txt"], default=None
+    )
+    crawl_command.add_argument(
+        "--metrics",
+        action="store_true",
+        help="imprime o tempo gasto por etapa, host e parser",
+    )
+    crawl_command.set_defaults(handler=_crawl)
+
+    record = commands.add_parser(
+        "record", help="grava as respostas HTTP das URLs em um arquivo WARC"
+    )
+    record.add_argument("inputs", nargs="+", help="arquivos CSV, JSONL ou texto")
+    record.add_argument(
+        "-o", "--out", required=True, help="arquivo de saída (.warc.gz)"
+    )
+    record.add_argument("--sample", type=int, help="grava apenas N URLs sorteadas")
+    record.add_argument("--seed", type=int, default=0, help="semente do sorteio")
+    record.add_argument("--concurrency", type=int, default=8)
+    record.add_argument(
+        "--max-body",
+        type=int,
+        default=1024 * 1024,
+        help="tamanho máximo, em bytes, do corpo gravado de cada resposta",
+    )
+    record.add_argument("--column", default="url", help="coluna ou campo da URL")
+    record.add_argument("--format", choices=["csv", "jsonl", "txt"], default=None)
+    record.set_defaults(handler=_record)
+
+    report = commands.add_parser(
+        "report", help="resume o diário da coleta por host, etapa e status"
+    )
+    report.add_argument("journal", help="diário da coleta (SQLite)")
+    report.add_argument("--host", help="apenas URLs deste host")
+    report.add_argument(
+        "--failures", action="store_true", help="lista as URLs com falha"
+    )
+    report.add_argument("--reason", help="com --failures, filtra pela causa")
+    report.set_defaults(handler=_report)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,449 @@
+"""
+Módulo com a resolução e o download em lote de trabalhos.
+
+As URLs são consumidas sob demanda por um número fixo de workers, de modo que
+o uso de memória não depende do tamanho da entrada e os resultados são
+retornados assim que ficam prontos.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import httpx
+
+from .cache import CacheEntry, ResolutionCache
+from .downloader import DocumentDownloader, PartResult
+from .journal import CrawlJournal
+from .parsers import ParserFactory
+from .parsers.browser_pool import BrowserPool
+from .parsers.generic import current_final_url, pdf_handoff
+from .store import ContentStore
+from .url_fixer import is_denied, is_valid_url, update_url
+from .utils import http_utils
+from .utils.fixtures import MAX_BODY, FixtureWriter, RecordingTransport
+from .utils.metrics import metrics
+from .utils.scheduler import HostQueue, HostScheduler
+from .utils.session import HttpSession
+from .utils.single_flight import SingleFlight
+
+_DONE = object()
+
+
+@dataclass
+class ResolveResult:
+    """Resultado da resolução de uma URL."""
+
+    url: str
+    normalized_url: str | None = None
+    parser: str | None = None
+    pdf_link: str | list[str] | None = None
+    final_url: str | None = None
+    status: str = "pending"
+    error: str | None = None
+    reason: str | None = None
+    cached: bool = False
+    files: list[Path] = field(default_factory=list)
+    parts: list[PartResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Indica se o link do PDF foi encontrado."""
+        return self.status in ("resolved", "downloaded")
+
+
+async def _iterate(urls: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    """Percorre um iterável síncrono ou assíncrono de URLs."""
+    if isinstance(urls, AsyncIterable):
+        async for url in urls:
+            yield url
+    else:
+        for url in urls:
+            yield url
+
+
+async def _run_pipeline(
+    urls: Iterable[str] | AsyncIterable[str],
+    handler: Callable[[str], Awaitable[ResolveResult]],
+    concurrency: int,
+    scheduler: HostScheduler,
+    lookahead: int,
+) -> AsyncIterator[ResolveResult]:
+    """
+    Executa `handler` para cada URL com no máximo `concurrency` tarefas
+    simultâneas, retornando os resultados conforme são concluídos.
+
+    Até `lookahead` URLs pendentes são distribuídas em rodízio entre os hosts
+    livres no `scheduler`, para que um repositório lento não ocupe todos os
+    workers.
+    """
+    inbox = HostQueue(scheduler, maxsize=lookahead)
+    outbox: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def feed():
+        try:
+            async for url in _iterate(urls):
+                await inbox.put(url)
+        finally:
+            await inbox.close()
+
+    async def work():
+        while (url := await inbox.get()) is not None:
+            try:
+                result = await handler(url)
+            except Exception as e:  # pylint: disable=broad-except
+                result = ResolveResult(
+                    url=url,
+                    status="error",
+                    error=f"{type(e).__name__}: {e}",
+                    reason=http_utils.classify_error(e),
+                )
+            await outbox.put(result)
+        await outbox.put(_DONE)
+
+    feeder = asyncio.create_task(feed())
+    workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        pending = concurrency
+        while pending:
+            result = await outbox.get()
+            if result is _DONE:
+                pending -= 1
+            else:
+                yield result
+        await feeder
+    finally:
+        for task in (feeder, *workers):
+            task.cancel()
+        await asyncio.gather(feeder, *workers, return_exceptions=True)
+
+
+def _resume(
+    urls: Iterable[str] | AsyncIterable[str], journal: CrawlJournal | None, stage: str
+) -> Iterable[str] | AsyncIterable[str]:
+    """Remove da entrada as URLs já concluídas na etapa, segundo o diário."""
+    return urls if journal is None else journal.pending(urls, stage)
+
+
+@asynccontextmanager
+async def _open(session: HttpSession | None, browser_pool: BrowserPool | None):
+    """Cria a sessão e o pool de navegadores ausentes, fechando-os ao final."""
+    own_session, own_pool = session is None, browser_pool is None
+    session = session or HttpSession()
+    browser_pool = browser_pool or BrowserPool()
+    try:
+        yield session, browser_pool
+    finally:
+        if own_pool:
+            await browser_pool.close()
+        if own_session:
+            await session.aclose()
+
+
+def _from_cache(result: ResolveResult, entry: CacheEntry) -> ResolveResult:
+    """Preenche o resultado com uma resolução armazenada no cache."""
+    result.pdf_link = entry.pdf_link
+    result.final_url = entry.final_url
+    result.parser = entry.parser
+    result.cached = True
+    result.status = "resolved" if entry.pdf_link else "not_found"
+    return result
+
+
+async def resolve_url(
+    url: str,
+    session: HttpSession | None = None,
+    cache: ResolutionCache | None = None,
+    revalidate: str = "stale",
+    browser_pool: BrowserPool | None = None,
+    **kwargs,
+) -> ResolveResult:
+    """
+    Corrige, filtra e resolve o link do PDF de uma URL.
+
+    Args:
+        url (str): URL do trabalho.
+        session (HttpSession | None): Sessão HTTP compartilhada.
+        cache (ResolutionCache | None): Cache persistente das resoluções.
+        revalidate (str): Quando consultar novamente o repositório para URLs
+            presentes no cache: "stale" (apenas entradas vencidas), "never"
+            ou "always". Entradas vencidas são revalidadas com uma requisição
+            condicional se a sessão tiver um `ValidatorStore`.
+        browser_pool (BrowserPool | None): Pool de navegadores para
+            repositórios que dependem de JavaScript.
+        **kwargs: Args adicionais para `Parser.get_pdf_link`.
+
+    Returns:
+        ResolveResult: Resultado da resolução.
+    """
+    result = ResolveResult(url=url)
+    if not is_valid_url(url):
+        result.status = "invalid"
+        return result
+    with metrics.timer("fix_url", url):
+        result.normalized_url = update_url(url)
+    if is_denied(result.normalized_url):
+        result.status = "denied"
+        return result
+
+    entry = cache.get(result.normalized_url) if cache is not None else None
+    if entry and revalidate != "always":
+        if revalidate == "never" or not cache.is_stale(entry):
+            return _from_cache(result, entry)
+        if session is not None and session.validators is not None:
+            # Entrada vencida: a página só é analisada novamente se mudou
+            kwargs["conditional"] = True
+
+    with metrics.timer("route", result.normalized_url):
+        parser = ParserFactory.get_parser(
+            result.normalized_url, session=session, browser_pool=browser_pool
+        )
+    result.parser = type(parser).__name__
+    current_final_url.set(None)
+    try:
+        result.pdf_link = await parser.get_pdf_link(result.normalized_url, **kwargs)
+    except http_utils.NotModified:
+        cache.touch(result.normalized_url)
+        return _from_cache(result, entry)
+    except Exception as e:  # pylint: disable=broad-except
+        result.status = "error"
+        result.error = f"{type(e).__name__}: {e}"
+        result.reason = http_utils.classify_error(e)
+        return result
+    result.final_url = current_final_url.get() or result.normalized_url
+    result.status = "resolved" if result.pdf_link else "not_found"
+    result.reason = None if result.pdf_link else "no_link"
+    if cache is not None:
+        cache.put(
+            result.normalized_url, result.pdf_link, result.final_url, result.parser
+        )
+    return result
+
+
+async def resolve_many(
+    urls: Iterable[str] | AsyncIterable[str],
+    session: HttpSession | None = None,
+    concurrency: int = 32,
+    lookahead: int = 2048,
+    cache: ResolutionCache | None = None,
+    revalidate: str = "stale",
+    browser_pool: BrowserPool | None = None,
+    journal: CrawlJournal | None = None,
+    **kwargs,
+) -> AsyncIterator[ResolveResult]:
+    """
+    Resolve os links de PDF de várias URLs de forma concorrente.
+
+    Args:
+        urls (Iterable[str] | AsyncIterable[str]): URLs dos trabalhos.
+        session (HttpSession | None): Sessão HTTP compartilhada. Se None, uma
+            sessão é criada e fechada ao final.
+        concurrency (int): Número máximo de URLs resolvidas simultaneamente.
+        lookahead (int): Número máximo de URLs lidas da entrada e ainda não
+            processadas, usadas para alternar entre hosts.
+        cache (ResolutionCache | None): Cache persistente das resoluções.
+        revalidate (str): Política de revalidação do cache (ver
+            `resolve_url`).
+        browser_pool (BrowserPool | None): Pool de navegadores. Se None, um
+            pool é criado e fechado ao final.
+        journal (CrawlJournal | None): Diário da coleta. URLs já concluídas
+            ou com falhas permanentes são ignoradas e cada resultado é
+            registrado, permitindo retomar uma coleta interrompida.
+        **kwargs: Args adicionais para `Parser.get_pdf_link`.
+
+    Yields:
+        ResolveResult: Resultados na ordem em que são concluídos.
+
+    Exemplo:
+        >>> async for result in resolve_many(urls, concurrency=64):
+        ...     print(result.url, result.pdf_link)
+    """
+    async with _open(session, browser_pool) as (session, browser_pool):
+
+        async def handle(url: str) -> ResolveResult:
+            return await resolve_url(
+                url, session, cache, revalidate, browser_pool, **kwargs
+            )
+
+        async for result in _run_pipeline(
+            _resume(urls, journal, "resolve"),
+            handle,
+            concurrency,
+            session.scheduler,
+            lookahead,
+        ):
+            if journal is not None:
+                journal.record_result(result)
+            yield result
+
+
+async def scrape_many(
+    urls: Iterable[str] | AsyncIterable[str],
+    save_path: str,
+    session: HttpSession | None = None,
+    concurrency: int = 32,
+    lookahead: int = 2048,
+    cache: ResolutionCache | None = None,
+    revalidate: str = "stale",
+    browser_pool: BrowserPool | None = None,
+    store: ContentStore | None = None,
+    journal: CrawlJournal | None = None,
+    **kwargs,
+) -> AsyncIterator[ResolveResult]:
+    """
+    Resolve e faz o download dos trabalhos de várias URLs de forma concorrente.
+
+    URLs diferentes que resolvem para o mesmo documento (ex.: handles
+    espelhados do mesmo bitstream) compartilham o download em andamento, sem
+    chegar ao downloader ou ao `ContentStore` uma segunda vez.
+
+    Args:
+        urls (Iterable[str] | AsyncIterable[str]): URLs dos trabalhos.
+        save_path (str): Diretório onde os documentos serão salvos.
+        session (HttpSession | None): Sessão HTTP compartilhada.
+        concurrency (int): Número máximo de trabalhos processados
+            simultaneamente.
+        lookahead (int): Número máximo de URLs lidas da entrada e ainda não
+            processadas, usadas para alternar entre hosts.
+        cache (ResolutionCache | None): Cache persistente das resoluções.
+        revalidate (str): Política de revalidação do cache (ver
+            `resolve_url`).
+        browser_pool (BrowserPool | None): Pool de navegadores. Se None, um
+            pool é criado e fechado ao final.
+        store (ContentStore | None): Armazenamento endereçado por conteúdo,
+            que evita gravar o mesmo documento mais de uma vez.
+        journal (CrawlJournal | None): Diário da coleta. URLs já concluídas
+            ou com falhas permanentes são ignoradas e cada resultado é
+            registrado, permitindo retomar uma coleta interrompida.
+        **kwargs: Args adicionais para `Parser.get_pdf_link`.
+
+    Yields:
+        ResolveResult: Resultados na ordem em que são concluídos.
+    """
+    async with _open(session, browser_pool) as (session, browser_pool):
+        downloader = DocumentDownloader(save_path, session=session, store=store)
+        # Downloads em andamento, pelo link do documento
+        downloads = SingleFlight()
+
+        async def save_part(link: str, response, chunks) -> PartResult:
+            path = await downloader.save_response(link, response, chunks)
+            return PartResult(link, 0, path, "downloaded" if path else "failed")
+
+        async def download_part(link: str) -> PartResult:
+            (part,) = await downloader.download_parts([link])
+            return part
+
+        async def handle(url: str) -> ResolveResult:
+            # Documentos entregues pela própria URL resolvida, já gravados
+            saved: dict[str, PartResult] = {}
+
+            async def save(link: str, response, chunks):
+                # `link` pode ser a URL do handle; o documento é a URL final
+                saved[link] = await downloads.run(
+                    str(response.url), lambda: save_part(link, response, chunks)
+                )
+
+            async def fetch(index: int, link: str) -> PartResult:
+                part = saved.get(link)
+                if part is None:
+                    part = await downloads.run(link, lambda: download_part(link))
+                # O resultado pode ser compartilhado com outras URLs
+                return replace(part, url=link, index=index)
+
+            token = pdf_handoff.set(save)
+            try:
+                result = await resolve_url(
+                    url, session, cache, revalidate, browser_pool, **kwargs
+                )
+            finally:
+                pdf_handoff.reset(token)
+            if not result.ok:
+                return result
+            links = (
+                result.pdf_link
+                if isinstance(result.pdf_link, list)
+                else [result.pdf_link]
+            )
+            result.parts = list(
+                await asyncio.gather(
+                    *(fetch(index, link) for index, link in enumerate(links))
+                )
+            )
+            result.files = [part.path for part in result.parts if part.path]
+            failed = [part for part in result.parts if part.status != "downloaded"]
+            result.error = failed[0].error if failed else None
+            result.reason = failed[0].reason if failed else None
+            if result.files:
+                result.status = "downloaded"
+            elif any(part.status == "error" for part in failed):
+                result.status = "error"
+            else:
+                result.status = "download_failed"
+            return result
+
+        async for result in _run_pipeline(
+            _resume(urls, journal, "download"),
+            handle,
+            concurrency,
+            session.scheduler,
+            lookahead,
+        ):
+            if journal is not None:
+                journal.record_result(result)
+            yield result
+
+
+async def record_fixtures(
+    urls: Iterable[str] | AsyncIterable[str],
+    path: str,
+    concurrency: int = 8,
+    max_body: int = MAX_BODY,
+    browser_pool: BrowserPool | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+    **kwargs,
+) -> AsyncIterator[ResolveResult]:
+    """
+    Resolve as URLs gravando as respostas HTTP em um arquivo de fixtures.
+
+    O resultado de cada URL (parser, link e status) também é gravado, como
+    metadado, para servir de resultado esperado na reprodução (ver
+    `theses_scraper.utils.fixtures`). Páginas renderizadas pelo navegador não
+    passam pela sessão HTTP e, por isso, não são gravadas.
+
+    Args:
+        urls (Iterable[str] | AsyncIterable[str]): URLs dos trabalhos.
+        path (str): Arquivo `.warc.gz`; se existir, os registros são
+            acrescentados.
+        concurrency (int): Número máximo de URLs resolvidas simultaneamente.
+        max_body (int): Tamanho máximo, em bytes, do corpo gravado de cada
+            resposta.
+        browser_pool (BrowserPool | None): Pool de navegadores.
+        transport (httpx.AsyncBaseTransport | None): Transporte que acessa a
+            rede. Se None, é usado o padrão do httpx.
+        **kwargs: Args adicionais para `resolve_many`.
+
+    Yields:
+        ResolveResult: Resultados na ordem em que são concluídos.
+    """
+    with FixtureWriter(path) as writer:
+        transport = RecordingTransport(writer, transport, max_body=max_body)
+        async with HttpSession(transport=transport) as session:
+            async for result in resolve_many(
+                urls,
+                session,
+                concurrency=concurrency,
+                browser_pool=browser_pool,
+                **kwargs,
+            ):
+                writer.write_metadata(
+                    result.url,
+                    {
+                        "parser": result.parser,
+                        "status": result.status,
+                        "pdf_link": result.pdf_link,
+                        "final_url": result.final_url,
+                    },
+                )
+                yield result
@@ -0,0 +1,214 @@
+"""
+Módulo com o cache persistente de resoluções (URL do trabalho → link do PDF).
+
+O cache é um banco SQLite local, indexado pela URL já corrigida por
+`update_url`. Guarda tanto os links encontrados quanto os resultados
+negativos (nenhum link encontrado), cada um com seu próprio prazo de validade.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resolutions (
+    url TEXT PRIMARY KEY,
+    links TEXT,
+    final_url TEXT,
+    parser TEXT,
+    resolved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resolutions_resolved_at ON resolutions (resolved_at);
+"""
+
+
+@dataclass
+class CacheEntry:
+    """Resolução armazenada no cache."""
+
+    url: str
+    pdf_link: str | list[str] | None
+    final_url: str | None
+    parser: str | None
+    resolved_at: float
+
+    @property
+    def negative(self) -> bool:
+        """Indica se a resolução não encontrou nenhum link."""
+        return not self.pdf_link
+
+
+class ResolutionCache:
+    """
+    Cache persistente das resoluções de links de PDF.
+
+    Exemplo:
+        >>> with ResolutionCache("resolucoes.db", ttl=7 * 86400) as cache:
+        ...     async for result in resolve_many(urls, cache=cache):
+        ...         ...
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 30 * 86400,
+        negative_ttl: float = 7 * 86400,
+        max_entries: int | None = None,
+    ):
+        """
+        Args:
+            path (str): Caminho do arquivo SQLite.
+            ttl (float): Validade, em segundos, das resoluções com link.
+            negative_ttl (float): Validade, em segundos, dos resultados
+                negativos.
+            max_entries (int | None): Número máximo de entradas. As mais
+                antigas são removidas quando o limite é ultrapassado.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._writes = 0
+        self._evict_interval = max(1, min(1000, (max_entries or 0) // 10))
+
+    def __enter__(self) -> "ResolutionCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM resolutions"
+            ).fetchone()[0]
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._connection.close()
+
+    def is_stale(self, entry: CacheEntry, now: float | None = None) -> bool:
+        """Indica se uma entrada passou do prazo de validade."""
+        ttl = self.negative_ttl if entry.negative else self.ttl
+        return (now or time.time()) - entry.resolved_at > ttl
+
+    def get(self, url: str) -> CacheEntry | None:
+        """
+        Busca a resolução de uma URL.
+
+        Args:
+            url (str): URL corrigida por `update_url`.
+
+        Returns:
+            CacheEntry | None: Entrada armazenada, mesmo que vencida.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, links, final_url, parser, resolved_at "
+                "FROM resolutions WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, links, final_url, parser, resolved_at = row
+        return CacheEntry(url, json.loads(links), final_url, parser, resolved_at)
+
+    def put(
+        self,
+        url: str,
+        pdf_link: str | list[str] | None,
+        final_url: str | None = None,
+        parser: str | None = None,
+    ):
+        """
+        Armazena a resolução de uma URL.
+
+        Args:
+            url (str): URL corrigida por `update_url`.
+            pdf_link (str | list[str] | None): Link(s) encontrado(s) ou None.
+            final_url (str | None): URL final após redirecionamentos.
+            parser (str | None): Nome da classe do parser utilizado.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO resolutions "
+                "(url, links, final_url, parser, resolved_at) VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(pdf_link or None), final_url, parser, time.time()),
+            )
+            self._connection.commit()
+            self._writes += 1
+            # A contagem de entradas é verificada periodicamente, não a cada escrita
+            if self.max_entries and not self._writes % self._evict_interval:
+                self._evict()
+
+    def touch(self, url: str):
+        """Renova a validade de uma entrada sem alterar seu conteúdo."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE resolutions SET resolved_at = ? WHERE url = ?",
+                (time.time(), url),
+            )
+            self._connection.commit()
+
+    def _evict(self):
+        """Remove as entradas mais antigas que excedem `max_entries`."""
+        self._connection.execute(
+            "DELETE FROM resolutions WHERE url IN ("
+            "SELECT url FROM resolutions ORDER BY resolved_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._connection.commit()
+
+    def purge_stale(self) -> int:
+        """
+        Remove todas as entradas vencidas.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM resolutions WHERE "
+                "(links = 'null' AND resolved_at < ?) "
+                "OR (links != 'null' AND resolved_at < ?)",
+                (now - self.negative_ttl, now - self.ttl),
+            )
+            self._connection.commit()
+        return cursor.rowcount
+
+    def stale_urls(self) -> Iterator[str]:
+        """
+        Percorre as URLs com entradas vencidas, para revalidar apenas elas.
+
+        Exemplo:
+            >>> async for result in resolve_many(cache.stale_urls(), cache=cache):
+            ...     ...
+        """
+        now = time.time()
+        last_url = ""
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT url FROM resolutions WHERE url > ? AND ("
+                    "(links = 'null' AND resolved_at < ?) "
+                    "OR (links != 'null' AND resolved_at < ?)) "
+                    "ORDER BY url LIMIT 1000",
+                    (last_url, now - self.negative_ttl, now - self.ttl),
+                ).fetchall()
+            if not rows:
+                return
+            for (url,) in rows:
+                yield url
+            last_url = rows[-1][0]
@@ -1,39 +1,438 @@
 """Módulo para realizar o download de documentos PDF e Word."""
 
+import asyncio
+import hashlib
+import os
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from pathlib import Path
+from .store import PREFIX_SIZE, ContentStore
 from .utils import http_utils
+from .utils.metrics import metrics
+from .utils.session import HttpSession
+from .utils.single_flight import SingleFlight
+from .utils.validators import Validators
+
+ACCEPTED_TYPES = {
+    "application/pdf": "pdf",
+    "application/msword": "doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+}
+
+
+def _hash_file(file, size: int, hasher, block_size: int = 1024 * 1024):
+    """Adiciona ao hash os primeiros `size` bytes de um arquivo aberto."""
+    file.seek(0)
+    while size > 0 and (block := file.read(min(block_size, size))):
+        hasher.update(block)
+        size -= len(block)
+
+
+class DownloadError(Exception):
+    """O documento não pôde ser salvo."""
+
+    reason = "download_failed"
+
+
+class UnsupportedTypeError(DownloadError):
+    """O tipo do conteúdo não está em `ACCEPTED_TYPES`."""
+
+    reason = "unsupported_type"
+
+    def __init__(self, file_type: str):
+        super().__init__(f"Tipo de arquivo não suportado: {file_type}")
+        self.file_type = file_type
+
+
+class IncompleteDownloadError(DownloadError):
+    """O corpo recebido é menor que o informado no `Content-Length`."""
+
+    reason = "incomplete"
+
+
+@dataclass
+class PartResult:
+    """
+    Resultado do download de uma parte de um documento.
+
+    O status é "downloaded", "failed" (ex.: tipo não suportado ou download
+    incompleto) ou "error" (falha na requisição), e `reason` traz a
+    classificação da falha (ver `http_utils.classify_error`).
+    """
+
+    url: str
+    index: int
+    path: Path | None = None
+    status: str = "downloaded"
+    error: str | None = None
+    reason: str | None = None
 
 
 class DocumentDownloader:
-    """Classe para realizar o download de documentos PDF e Word."""
+    """
+    Classe para realizar o download de documentos PDF e Word.
+
+    O corpo da resposta é gravado em blocos em um arquivo temporário
+    (`.part`), que só é renomeado para o nome final quando o download termina
+    e o tamanho confere com o `Content-Length`. Downloads interrompidos são
+    retomados com requisições `Range` quando o servidor permite. Downloads
+    simultâneos da mesma URL compartilham o mesmo arquivo parcial, por isso
+    apenas o primeiro é executado e os demais recebem o seu resultado.
 
-    def __init__(self, save_path: str):
+    Se a sessão tiver um `ValidatorStore`, documentos já baixados são
+    verificados com uma requisição condicional e não são baixados novamente
+    quando o servidor responde 304.
+
+    Com um `ContentStore`, os documentos são gravados pelo hash do conteúdo
+    em vez do nome do arquivo na URL, e conteúdos repetidos são gravados uma
+    só vez.
+    """
+
+    def __init__(
+        self,
+        save_path: str,
+        session: HttpSession | None = None,
+        chunk_size: int = 64 * 1024,
+        store: ContentStore | None = None,
+    ):
+        """
+        Args:
+            save_path (str): Diretório onde os documentos serão salvos.
+            session (HttpSession | None): Sessão HTTP compartilhada.
+            chunk_size (int): Tamanho, em bytes, dos blocos lidos da rede.
+            store (ContentStore | None): Armazenamento endereçado por
+                conteúdo. Se informado, os documentos são salvos nele e não
+                em `save_path`.
+        """
         self.save_path = Path(save_path)
         self.save_path.mkdir(parents=True, exist_ok=True)
+        self.session = session
+        self.chunk_size = chunk_size
+        self.store = store
+        # Downloads em andamento, pelo arquivo parcial
+        self._in_flight = SingleFlight()
+
+    def _partial_path(self, url: str) -> Path:
+        """Retorna o caminho do arquivo temporário do download de uma URL."""
+        digest = hashlib.sha1(url.encode()).hexdigest()[:16]
+        directory = self.store.tmp_dir if self.store is not None else self.save_path
+        return directory / f".{digest}.part"
+
+    async def download(
+        self, url: str | list[str], file_name: str = None
+    ) -> Path | list[Path | None] | None:
+        """
+        Faz o download de um documento e o salva no diretório especificado.
+
+        Documentos divididos em várias partes (ex.: Maxwell e CESPU) são
+        baixados de forma concorrente com `download_parts`.
+
+        Args:
+            url (str | list[str]): URL do documento ou lista com as URLs das
+                suas partes.
+            file_name (str): Nome do arquivo. Se não informado, é usado o nome
+                do arquivo na URL final. Ignorado com um `ContentStore`.
+
+        Returns:
+            Path | list[Path | None] | None: Caminho do arquivo salvo ou None
+            em caso de falha. Para uma lista de URLs, o caminho de cada
+            parte, na mesma ordem.
+        """
+        if isinstance(url, list):
+            return [part.path for part in await self.download_parts(url, file_name)]
+        try:
+            return await self._download(url, file_name)
+        except DownloadError as e:
+            print(e)
+            return None
+
+    async def download_parts(
+        self, urls: list[str], file_name: str = None
+    ) -> list[PartResult]:
+        """
+        Faz o download concorrente das partes de um documento.
+
+        As partes são requisitadas ao mesmo tempo, respeitando o limite de
+        conexões por host do escalonador da sessão, de modo que o tempo total
+        é próximo ao da parte mais lenta. A falha de uma parte não interrompe
+        as demais.
 
-    def download(self, url: str, file_name: str = None):
-        """Faz o download de um documento e o salva no diretório especificado."""
-        response = http_utils.get(url, follow_redirects=True)
-        if not response:
-            print(f"Falha ao acessar o documento em {url}")
-            return
-
-        accepted_types = {
-            "application/pdf": "pdf",
-            "application/msword": "doc",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
-        }
-
-        file_type = http_utils.get_file_type(response)
-
-        if file_type not in accepted_types:
-            print(f"Tipo de arquivo não suportado: {file_type}")
-            return
-
-        file_name = Path(str(response.url)).name
-        if not file_name.endswith(f".{accepted_types[file_type]}"):
-            file_name += f".{accepted_types[file_type]}"
-        file_path = self.save_path / file_name
-        with open(file_path, "wb") as file:
-            file.write(response.content)
+        Args:
+            urls (list[str]): URLs das partes, em ordem.
+            file_name (str): Nome base dos arquivos, numerados a partir de 1
+                (ex.: `tese_1.pdf`, `tese_2.pdf`).
+
+        Returns:
+            list[PartResult]: Resultado de cada parte, na ordem de `urls`.
+
+        Exemplo:
+            >>> parts = await downloader.download_parts(links, "tese")
+            >>> [part.status for part in parts]
+            ['downloaded', 'downloaded', 'error']
+        """
+
+        async def fetch(index: int, url: str) -> PartResult:
+            name = f"{file_name}_{index + 1}" if file_name else None
+            try:
+                path = await self._download(url, name)
+            except DownloadError as e:
+                print(e)
+                return PartResult(url, index, None, "failed", str(e), e.reason)
+            except Exception as e:  # pylint: disable=broad-except
+                return PartResult(
+                    url,
+                    index,
+                    None,
+                    "error",
+                    f"{type(e).__name__}: {e}",
+                    http_utils.classify_error(e),
+                )
+            return PartResult(url, index, path)
+
+        return list(
+            await asyncio.gather(*(fetch(i, url) for i, url in enumerate(urls)))
+        )
+
+    async def _download(self, url: str, file_name: str | None) -> Path | None:
+        """
+        Faz o download de um único documento.
+
+        Se a URL já estiver sendo baixada, aguarda o download em andamento em
+        vez de retomar o arquivo parcial que ele ainda está gravando.
+        """
+        return await self._in_flight.run(
+            self._partial_path(url), lambda: self._fetch(url, file_name)
+        )
+
+    async def _fetch(
+        self, url: str, file_name: str | None, resume: bool = True
+    ) -> Path | None:
+        """
+        Requisita o documento, retomando o arquivo parcial se houver.
+
+        Se o servidor recusar o trecho pedido (416) ou responder com outro
+        trecho, o arquivo parcial é descartado e o documento é requisitado
+        novamente do início, uma única vez (`resume=False`).
+        """
+        partial_path = self._partial_path(url)
+        offset = partial_path.stat().st_size if resume and partial_path.exists() else 0
+        headers = {"Accept-Encoding": "identity"}
+        store = self.session.validators if self.session is not None else None
+        validators = store.get(url) if store is not None else None
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            if validators and (if_range := validators.if_range()):
+                headers["If-Range"] = if_range
+        elif self._is_stored(validators):
+            headers.update(validators.conditional_headers())
+
+        async with http_utils.stream(
+            url, session=self.session, follow_redirects=True, headers=headers
+        ) as response:
+            if response.status_code == 304 and self._is_stored(validators):
+                store.touch(url)
+                print(f"Documento não modificado: {validators.path}")
+                return Path(validators.path)
+            if response.status_code != 416 or not offset:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    # O servidor ignorou o `Range` (ou o `If-Range` não
+                    # confere) e enviou o documento completo
+                    return await self._save(url, response, 0, file_name)
+                if self._range_start(response) == offset:
+                    return await self._save(url, response, offset, file_name)
+                if not offset:
+                    raise DownloadError(
+                        f"Resposta parcial sem requisição de trecho em {url}"
+                    )
+
+        # O arquivo parcial não corresponde mais ao recurso remoto
+        partial_path.unlink(missing_ok=True)
+        return await self._fetch(url, file_name, resume=False)
+
+    async def save_response(
+        self,
+        url: str,
+        response,
+        chunks: AsyncIterator[bytes] | None = None,
+        file_name: str = None,
+    ) -> Path | None:
+        """
+        Salva o documento de uma resposta já recebida, sem nova requisição.
+
+        Usado quando a URL resolvida pelo parser já entrega o PDF (ver
+        `parsers.generic.pdf_handoff`). Se a URL já estiver sendo baixada, a
+        resposta não é lida e o resultado do download em andamento é
+        retornado.
+
+        Args:
+            url (str): URL do documento.
+            response (httpx.Response): Resposta aberta em modo streaming.
+            chunks (AsyncIterator[bytes] | None): Corpo da resposta, caso parte
+                dele já tenha sido lida. Se None, é lido da resposta.
+            file_name (str): Nome do arquivo. Se não informado, é usado o nome
+                do arquivo na URL final.
+
+        Returns:
+            Path | None: Caminho do arquivo salvo ou None em caso de falha.
+        """
+        try:
+            return await self._in_flight.run(
+                self._partial_path(url),
+                lambda: self._save(
+                    url, response, 0, file_name, chunks, file_type="application/pdf"
+                ),
+            )
+        except DownloadError as e:
+            print(e)
+            return None
+
+    async def _save(
+        self,
+        url: str,
+        response,
+        offset: int,
+        file_name: str | None,
+        chunks: AsyncIterator[bytes] | None = None,
+        file_type: str | None = None,
+    ) -> Path | None:
+        """Grava o corpo da resposta e move o arquivo para o nome final."""
+        file_type = file_type or (
+            http_utils.get_file_type(response).split(";")[0].strip()
+        )
+        if chunks is None:
+            chunks = response.aiter_bytes(self.chunk_size)
+        if file_type not in ACCEPTED_TYPES and not offset:
+            # Servidores que enviam PDFs como `application/octet-stream`
+            sniffed = await http_utils.read_prefix(chunks)
+            if http_utils.looks_like_pdf(file_type, sniffed):
+                file_type = "application/pdf"
+            chunks = http_utils.prepend(sniffed, chunks)
+        if file_type not in ACCEPTED_TYPES:
+            raise UnsupportedTypeError(file_type)
+
+        partial_path = self._partial_path(url)
+        store = self.session.validators if self.session is not None else None
+        expected_size = self._expected_size(response, offset)
+        if store is not None and response.status_code == 200:
+            # Guarda os validadores antes do corpo para usar `If-Range`
+            # caso o download seja interrompido.
+            store.record(url, response)
+
+        prefix = b""
+        hasher = None
+        if self.store is not None:
+            hasher = hashlib.sha256()
+            if not offset and expected_size is not None:
+                # O início é lido antes de gravar para descartar duplicatas
+                prefix = await http_utils.read_prefix(chunks, PREFIX_SIZE)
+                if stored := self.store.find_by_prefix(prefix, expected_size):
+                    self.store.link(url, stored, response)
+                    self._put_validators(url, response, stored.size, stored.path)
+                    print(f"Documento já armazenado: {stored.path}")
+                    return stored.path
+                chunks = http_utils.prepend(prefix, chunks)
+        with metrics.timer("download", url):
+            written = await self._write_stream(chunks, partial_path, offset, hasher)
+        metrics.count("download_bytes", written - offset, url)
+
+        if expected_size is not None and written != expected_size:
+            raise IncompleteDownloadError(
+                f"Download incompleto de {url}: {written} de {expected_size} bytes"
+            )
+
+        extension = ACCEPTED_TYPES[file_type]
+        if self.store is not None:
+            if len(prefix) < min(PREFIX_SIZE, written):
+                with open(partial_path, "rb") as file:
+                    prefix = file.read(PREFIX_SIZE)
+            stored = self.store.add(
+                url,
+                partial_path,
+                hasher.hexdigest(),
+                extension,
+                file_type,
+                prefix,
+                response,
+            )
+            file_path = stored.path
+        else:
+            file_name = file_name or Path(str(response.url)).name
+            if not file_name.endswith(f".{extension}"):
+                file_name += f".{extension}"
+            file_path = self.save_path / file_name
+            os.replace(partial_path, file_path)
+        self._put_validators(url, response, written, file_path)
         print(f"Documento salvo em {file_path}")
+        return file_path
+
+    def _put_validators(self, url: str, response, size: int, file_path: Path):
+        """Registra o arquivo local de uma URL no `ValidatorStore` da sessão."""
+        store = self.session.validators if self.session is not None else None
+        if store is not None:
+            store.put(
+                Validators(
+                    url,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    size,
+                    str(file_path),
+                )
+            )
+
+    @staticmethod
+    def _is_stored(validators: Validators | None) -> bool:
+        """Indica se o arquivo local registrado nos validadores está íntegro."""
+        if validators is None or not validators.path:
+            return False
+        path = Path(validators.path)
+        if not path.exists():
+            return False
+        return validators.size is None or path.stat().st_size == validators.size
+
+    @staticmethod
+    async def _write_stream(
+        chunks: AsyncIterator[bytes],
+        partial_path: Path,
+        offset: int,
+        hasher=None,
+    ) -> int:
+        """
+        Grava os blocos do corpo no arquivo parcial a partir de `offset`.
+
+        Se `hasher` for informado, o conteúdo completo do arquivo, incluindo
+        o trecho baixado anteriormente, é adicionado a ele.
+
+        Returns:
+            int: Tamanho do arquivo parcial ao final da gravação.
+        """
+        with open(partial_path, "r+b" if offset else "wb") as file:
+            if hasher is not None and offset:
+                await asyncio.to_thread(_hash_file, file, offset, hasher)
+            file.seek(offset)
+            file.truncate()
+            async for chunk in chunks:
+                file.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+            file.flush()
+            await asyncio.to_thread(os.fsync, file.fileno())
+            return file.tell()
+
+    @staticmethod
+    def _range_start(response) -> int | None:
+        """Retorna o byte inicial informado no cabeçalho `Content-Range`."""
+        match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def _expected_size(response, offset: int) -> int | None:
+        """Retorna o tamanho total esperado do arquivo, se conhecido."""
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            # O Content-Length se refere ao corpo comprimido
+            return None
+        content_length = response.headers.get("Content-Length")
+        if content_length is None or not content_length.isdigit():
+            return None
+        return offset + int(content_length)
@@ -0,0 +1,351 @@
+"""
+Módulo com o diário (journal) persistente da coleta.
+
+Cada mudança de estado de uma URL (triagem → resolução → download) é
+acrescentada a um banco SQLite em modo WAL, junto com o estado mais recente
+da URL. Assim, uma coleta interrompida pode ser retomada sem repetir o
+trabalho já concluído, as falhas transitórias são tentadas novamente e as
+falhas podem ser consultadas por host.
+"""
+
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    error TEXT,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_url ON events (url);
+CREATE TABLE IF NOT EXISTS state (
+    url TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS state_host ON state (host, stage, status);
+"""
+
+# Etapas da coleta, na ordem em que ocorrem
+STAGES = ("triage", "resolve", "download")
+
+# Status que concluem cada etapa com sucesso
+SUCCESS = {"triage": "ok", "resolve": "resolved", "download": "downloaded"}
+
+# Falhas tentadas novamente ao retomar a coleta
+RETRYABLE = frozenset({"timeout", "connection", "circuit_open", "incomplete", "error"})
+
+# Status HTTP tentados novamente, além dos 5xx
+RETRYABLE_HTTP = frozenset({408, 425, 429})
+
+
+def is_retryable(reason: str | None) -> bool:
+    """
+    Indica se uma falha é transitória.
+
+    Examples:
+        >>> is_retryable("http_503"), is_retryable("http_404")
+        (True, False)
+    """
+    if reason is None:
+        return False
+    if reason.startswith("http_"):
+        status = reason[5:]
+        return status.isdigit() and (
+            status.startswith("5") or int(status) in RETRYABLE_HTTP
+        )
+    return reason in RETRYABLE
+
+
+@dataclass
+class UrlState:
+    """Estado mais recente de uma URL no diário."""
+
+    url: str
+    host: str
+    stage: str
+    status: str
+    reason: str | None
+    error: str | None
+    attempts: int
+    updated_at: float
+
+    @property
+    def failed(self) -> bool:
+        """Indica se a última etapa registrada terminou em falha."""
+        return self.status != SUCCESS[self.stage]
+
+
+class CrawlJournal:
+    """
+    Diário das mudanças de estado das URLs de uma coleta.
+
+    Uma URL é considerada concluída para uma etapa quando essa etapa ou uma
+    posterior terminou com sucesso, ou quando falhou de forma permanente
+    (ex.: "not_found", "http_404", "unsupported_type"). Falhas transitórias
+    são tentadas novamente até `max_attempts` vezes.
+
+    Exemplo:
+        >>> with CrawlJournal("coleta.db") as journal:
+        ...     async for result in scrape_many(urls, "./data", journal=journal):
+        ...         ...
+        >>> journal.report()[0]
+        ('repositorio.ufsc.br', 'download', 'download_failed', 'unsupported_type', 12)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 3,
+        commit_every: int = 100,
+        commit_interval: float = 1.0,
+    ):
+        """
+        Args:
+            path (str): Caminho do arquivo SQLite.
+            max_attempts (int): Número máximo de tentativas de uma URL com
+                falhas transitórias consecutivas.
+            commit_every (int): Número de registros entre cada commit.
+            commit_interval (float): Intervalo máximo, em segundos, entre
+                um registro e o seu commit.
+        """
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._committed_at = time.monotonic()
+        self._lock = threading.Lock()
+        # O timeout permite que vários processos gravem no mesmo diário
+        self._connection = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "CrawlJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Grava os registros pendentes e fecha a conexão com o banco."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def flush(self):
+        """Grava os registros pendentes."""
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        self._connection.commit()
+        self._pending = 0
+        self._committed_at = time.monotonic()
+
+    def record(
+        self,
+        url: str,
+        stage: str,
+        status: str,
+        reason: str | None = None,
+        error: str | None = None,
+    ):
+        """
+        Registra uma mudança de estado de uma URL.
+
+        Args:
+            url (str): URL de entrada.
+            stage (str): Etapa ("triage", "resolve" ou "download").
+            status (str): Resultado da etapa (ex.: "resolved", "not_found").
+            reason (str | None): Classificação da falha, se houver.
+            error (str | None): Mensagem de erro, se houver.
+        """
+        # Importado no primeiro registro, para que importar o diário (ex.: no
+        # comando `report`) não carregue o asyncio
+        from .utils.scheduler import (  # pylint: disable=import-outside-toplevel
+            HostScheduler,
+        )
+
+        now = time.time()
+        failed = status != SUCCESS[stage]
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO events (url, stage, status, reason, error, at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, stage, status, reason, error, now),
+            )
+            self._connection.execute(
+                "INSERT INTO state "
+                "(url, host, stage, status, reason, error, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET stage = excluded.stage, "
+                "status = excluded.status, reason = excluded.reason, "
+                "error = excluded.error, updated_at = excluded.updated_at, "
+                # Falhas consecutivas na mesma etapa; um sucesso zera a contagem
+                "attempts = CASE WHEN NOT ? THEN 0 "
+                "WHEN state.stage = excluded.stage THEN state.attempts + 1 "
+                "ELSE 1 END",
+                (
+                    url,
+                    HostScheduler.host_of(url),
+                    stage,
+                    status,
+                    reason,
+                    error,
+                    int(failed),
+                    now,
+                    failed,
+                ),
+            )
+            self._pending += 1
+            if (
+                self._pending >= self.commit_every
+                or time.monotonic() - self._committed_at >= self.commit_interval
+            ):
+                self._commit()
+
+    def record_result(self, result):
+        """
+        Registra o resultado de `resolve_url` ou de `scrape_many`.
+
+        Args:
+            result (ResolveResult): Resultado da resolução ou do download.
+        """
+        if result.status in ("downloaded", "download_failed") or result.parts:
+            state = self.get(result.url)
+            # A resolução só é registrada se ainda não constava como concluída,
+            # para não zerar as tentativas de download da URL
+            if state is None or (
+                state.stage != "download"
+                and not (state.stage == "resolve" and not state.failed)
+            ):
+                self.record(result.url, "resolve", "resolved")
+            stage = "download"
+        else:
+            stage = "resolve"
+        self.record(result.url, stage, result.status, result.reason, result.error)
+
+    def get(self, url: str) -> UrlState | None:
+        """Retorna o estado mais recente de uma URL."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, host, stage, status, reason, error, attempts, "
+                "updated_at FROM state WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return UrlState(*row) if row else None
+
+    def is_done(self, url: str, stage: str) -> bool:
+        """
+        Indica se a URL não precisa ser processada novamente na etapa.
+
+        Args:
+            url (str): URL de entrada.
+            stage (str): Etapa a executar.
+        """
+        state = self.get(url)
+        if state is None:
+            return False
+        if not state.failed:
+            return STAGES.index(state.stage) >= STAGES.index(stage)
+        if not is_retryable(state.reason):
+            return True
+        return state.attempts >= self.max_attempts
+
+    async def pending(
+        self, urls: Iterable[str] | AsyncIterable[str], stage: str
+    ) -> AsyncIterator[str]:
+        """
+        Percorre as URLs que ainda precisam ser processadas na etapa.
+
+        Exemplo:
+            >>> async for url in journal.pending(urls, "download"):
+            ...     ...
+        """
+        if isinstance(urls, AsyncIterable):
+            async for url in urls:
+                if not self.is_done(url, stage):
+                    yield url
+        else:
+            for url in urls:
+                if not self.is_done(url, stage):
+                    yield url
+
+    def history(self, url: str) -> list[tuple[str, str, str | None, float]]:
+        """Retorna as mudanças de estado de uma URL: (etapa, status, motivo, data)."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT stage, status, reason, at FROM events WHERE url = ? "
+                "ORDER BY id",
+                (url,),
+            ).fetchall()
+
+    def report(
+        self, host: str | None = None
+    ) -> list[tuple[str, str, str, str | None, int]]:
+        """
+        Conta as URLs por host e estado mais recente.
+
+        Args:
+            host (str | None): Host a consultar. Se None, todos os hosts.
+
+        Returns:
+            list[tuple[str, str, str, str | None, int]]: Linhas (host, etapa,
+            status, motivo, quantidade), da maior para a menor quantidade.
+        """
+        query = (
+            "SELECT host, stage, status, reason, COUNT(*) AS count FROM state "
+            "{where} GROUP BY host, stage, status, reason "
+            "ORDER BY count DESC, host"
+        )
+        with self._lock:
+            if host is None:
+                return self._connection.execute(query.format(where="")).fetchall()
+            return self._connection.execute(
+                query.format(where="WHERE host = ?"), (host,)
+            ).fetchall()
+
+    def failures(
+        self, host: str | None = None, reason: str | None = None
+    ) -> Iterator[UrlState]:
+        """
+        Percorre as URLs cuja última etapa falhou.
+
+        Args:
+            host (str | None): Filtra pelo host.
+            reason (str | None): Filtra pela classificação da falha.
+        """
+        conditions = ["status NOT IN (?, ?, ?)"]
+        parameters = list(SUCCESS.values())
+        if host is not None:
+            conditions.append("host = ?")
+            parameters.append(host)
+        if reason is not None:
+            conditions.append("reason = ?")
+            parameters.append(reason)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT url, host, stage, status, reason, error, attempts, "
+                f"updated_at FROM state WHERE {' AND '.join(conditions)} "
+                "ORDER BY host, url",
+                parameters,
+            ).fetchall()
+        for row in rows:
+            yield UrlState(*row)
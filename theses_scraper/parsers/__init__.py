@@ -1,40 +1,149 @@
-"""Módulo com a fábrica de parsers."""
+"""
+Módulo com a fábrica de parsers.
 
+Apenas o `GenericParser` é importado com o pacote. Os parsers específicos são
+registrados por `módulo:Classe` e importados na primeira URL que atendem, para
+que comandos que não os usam (como `triage`) não carreguem o Playwright e o
+BeautifulSoup.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
 from .generic import GenericParser
-from .maxwell import MaxwellParser
-from .sophia import SophiaParser
-from .dynamic_parser import DynamicContentParser
-from .ufrr import UFRRParser
-from .cespu import CESPUParser
+from .registry import ParserRegistry, query_has
+from theses_scraper.utils.metrics import current_parser
+
+if TYPE_CHECKING:
+    from theses_scraper.utils.session import HttpSession
+    from .browser_pool import BrowserPool
+    from .cespu import CESPUParser
+    from .dynamic_parser import DynamicContentParser
+    from .maxwell import MaxwellParser
+    from .sophia import SophiaParser
+    from .ufrr import UFRRParser
+
+# Nomes do pacote importados apenas no primeiro acesso
+_LAZY = {
+    "MaxwellParser": "theses_scraper.parsers.maxwell:MaxwellParser",
+    "SophiaParser": "theses_scraper.parsers.sophia:SophiaParser",
+    "DynamicContentParser": "theses_scraper.parsers.dynamic_parser:DynamicContentParser",
+    "UFRRParser": "theses_scraper.parsers.ufrr:UFRRParser",
+    "CESPUParser": "theses_scraper.parsers.cespu:CESPUParser",
+    "BrowserPool": "theses_scraper.parsers.browser_pool:BrowserPool",
+}
+
+
+def __getattr__(name: str):
+    if (reference := _LAZY.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, _, attribute = reference.partition(":")
+    value = getattr(importlib.import_module(module), attribute)
+    globals()[name] = value
+    return value
+
+
+# Parsers do pacote, pelo nome usado nos arquivos de configuração
+PARSERS: dict[str, type | str] = {
+    "GenericParser": GenericParser,
+    **{name: reference for name, reference in _LAZY.items() if name != "BrowserPool"},
+}
+
+# Repositórios que necessitam de JavaScript para carregamento completo
+DYNAMIC_DOMAINS = [
+    "web.esenfc.pt",
+    "repositorio.esenfc.pt",
+    "repositorio.pgsskroton.com",
+    "pgsscogna.com.br",
+    "repositorio.unesp.br",
+    "ufvjm.edu.br",
+    "patua.iec.gov.br",
+    "repositorio.unifesp.br",
+    "ipen.br",
+    "locus.ufv.br",
+]
+
+registry = ParserRegistry(GenericParser)
+registry.register(PARSERS["SophiaParser"], predicate=query_has("codigo_sophia"))
+registry.register(PARSERS["MaxwellParser"], domains=["maxwell.vrac.puc-rio.br"])
+registry.register(PARSERS["DynamicContentParser"], domains=DYNAMIC_DOMAINS)
+registry.register(PARSERS["UFRRParser"], domains=["bdtd.ufrr.br"])
+registry.register(PARSERS["CESPUParser"], domains=["repositorio.cespu.pt"])
+
+# Parsers criados sem sessão nem pool; os demais ficam em `HttpSession.parsers`
+# ou, se usam navegador, em `BrowserPool.parsers`
+_parsers_without_session: dict = {}
 
 
 class ParserFactory:
     """Fábrica para instanciar parsers específicos com base no domínio da URL."""
 
     @staticmethod
-    def get_parser(url: str):
-        """Retorna um parser específico para a URL fornecida."""
-        if "maxwell.vrac.puc-rio.br" in url:
-            return MaxwellParser()
-        elif "codigo_sophia=" in url:
-            return SophiaParser()
-        elif any(
-            domain in url
-            for domain in [
-                "web.esenfc.pt",
-                "repositorio.pgsskroton.com",
-                "repositorio.pgsscogna.com.br",
-                "repositorio.unesp.br",
-                "ufvjm.edu.br",
-                "patua.iec.gov.br",
-                "repositorio.esenfc.pt",
-                "repositorio.unifesp.br",
-                "ipen.br",
-            ]
-        ):
-            return DynamicContentParser()
-        elif "bdtd.ufrr.br" in url:
-            return UFRRParser()
-        elif "repositorio.cespu.pt" in url:
-            return CESPUParser()
-        return GenericParser()
+    def register(
+        parser_class: type | str,
+        domains: list[str] | tuple[str, ...] = (),
+        predicate=None,
+    ):
+        """
+        Registra um parser para os domínios ou a regra informados.
+
+        Ver `ParserRegistry.register`.
+        """
+        registry.register(parser_class, domains=domains, predicate=predicate)
+
+    @staticmethod
+    def load_config(path: str):
+        """
+        Registra domínios a partir de um arquivo TOML ou JSON.
+
+        Ver `ParserRegistry.load_config`.
+        """
+        registry.load_config(path, PARSERS)
+
+    @staticmethod
+    def get_parser_class(url: str) -> type[GenericParser]:
+        """
+        Retorna a classe do parser específico para a URL fornecida.
+
+        Args:
+            url (str): URL do trabalho.
+        """
+        return registry.resolve(url)
+
+    @staticmethod
+    def get_parser(
+        url: str,
+        session: "HttpSession | None" = None,
+        browser_pool: "BrowserPool | None" = None,
+    ):
+        """
+        Retorna um parser específico para a URL fornecida.
+
+        Os parsers não guardam estado entre requisições, por isso uma mesma
+        instância é reaproveitada para cada sessão e pool de navegadores.
+        Os parsers que usam o pool ficam guardados nele, e não em um índice
+        global, para que o pool e seus navegadores possam ser liberados.
+
+        Args:
+            url (str): URL do trabalho.
+            session (HttpSession | None): Sessão HTTP compartilhada pelo parser.
+            browser_pool (BrowserPool | None): Pool de navegadores usado pelos
+                parsers de conteúdo dinâmico.
+        """
+        parser_class = registry.resolve(url)
+        # Rótulo das métricas registradas pela tarefa atual
+        current_parser.set(parser_class.__name__)
+        dynamic = parser_class.uses_browser
+        if dynamic and browser_pool is not None:
+            # Guardado no próprio pool, que é liberado junto com os parsers
+            instances, key = browser_pool.parsers, (parser_class, session)
+        else:
+            instances = _parsers_without_session if session is None else session.parsers
+            key = parser_class
+        parser = instances.get(key)
+        if parser is None:
+            if dynamic:
+                parser = parser_class(session, browser_pool)
+            else:
+                parser = parser_class(session)
+            instances[key] = parser
+        return parser
@@ -0,0 +1,246 @@
+"""Módulo com o pool de navegadores usado pelo DynamicContentParser."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from theses_scraper.utils.user_agent import user_agent_family
+
+# Segundos níveis genéricos usados sob domínios de país (ex.: `usp.br`, `gov.br`)
+_GENERIC_SLDS = {"com", "edu", "gov", "org", "net", "mil", "ac", "co"}
+
+
+def site_of(host: str) -> str:
+    """
+    Retorna o domínio registrável aproximado de um host.
+
+    Examples:
+        >>> site_of("repositorio.unesp.br")
+        'unesp.br'
+        >>> site_of("patua.iec.gov.br")
+        'iec.gov.br'
+    """
+    labels = host.lower().split(".")
+    size = 3 if len(labels) > 2 and labels[-2] in _GENERIC_SLDS else 2
+    return ".".join(labels[-size:])
+
+
+@dataclass
+class RenderPolicy:
+    """
+    Política de carregamento de recursos nas páginas renderizadas.
+
+    Attributes:
+        blocked_resource_types (frozenset[str]): Tipos de recurso do
+            Playwright que não são carregados.
+        block_third_party (bool): Bloqueia recursos de outros domínios.
+        allowed_hosts (frozenset[str]): Hosts de terceiros permitidos.
+        blocked_hosts (frozenset[str]): Domínios sempre bloqueados
+            (analytics, redes sociais).
+        stop_on_pdf (bool): Interrompe a renderização ao encontrar uma
+            resposta `application/pdf` ou um PDF embutido na página.
+    """
+
+    blocked_resource_types: frozenset[str] = frozenset(
+        {"image", "media", "font", "stylesheet", "texttrack", "manifest"}
+    )
+    block_third_party: bool = True
+    allowed_hosts: frozenset[str] = frozenset()
+    blocked_hosts: frozenset[str] = field(
+        default_factory=lambda: frozenset(
+            {
+                "google-analytics.com",
+                "googletagmanager.com",
+                "doubleclick.net",
+                "facebook.net",
+                "hotjar.com",
+                "addthis.com",
+                "sharethis.com",
+                "altmetric.com",
+                "plu.mx",
+            }
+        )
+    )
+    stop_on_pdf: bool = True
+
+    def should_block(self, url: str, resource_type: str, page_url: str) -> bool:
+        """Indica se uma requisição feita pela página deve ser abortada."""
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = urlparse(url).hostname or ""
+        if site_of(host) in self.blocked_hosts:
+            return True
+        if not self.block_third_party or host in self.allowed_hosts:
+            return False
+        page_host = urlparse(page_url).hostname or ""
+        return bool(page_host) and site_of(host) != site_of(page_host)
+
+    @staticmethod
+    def looks_like_pdf(url: str) -> bool:
+        """Indica se a URL aparenta apontar para um PDF."""
+        path = urlparse(url).path.lower()
+        return path.endswith(".pdf") or "/bitstream/" in path
+
+
+class BrowserPool:
+    """
+    Pool de navegadores Chromium de longa duração.
+
+    Os navegadores são iniciados no primeiro uso e as páginas são reaproveitadas
+    entre requisições, limitadas a `max_pages` páginas abertas ao mesmo tempo.
+    A `render_policy` define quais recursos as páginas deixam de carregar.
+
+    Cada navegador mantém um contexto por família de User-Agent (sistema e
+    navegador, ver `user_agent_family`), criado com o primeiro User-Agent
+    pedido da família. Assim o `navigator.userAgent` das páginas corresponde
+    ao cabeçalho enviado, e User-Agents da mesma família reaproveitam as
+    mesmas páginas.
+
+    Exemplo:
+        >>> async with BrowserPool(max_pages=8) as pool:
+        ...     async with pool.page() as page:
+        ...         await page.goto(url)
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 4,
+        browsers: int = 1,
+        headless: bool = True,
+        proxy: dict | None = None,
+        render_policy: RenderPolicy | None = None,
+    ):
+        """
+        Args:
+            max_pages (int): Número máximo de páginas abertas simultaneamente.
+            browsers (int): Número de processos do navegador.
+            headless (bool): Executa o navegador sem interface gráfica.
+            proxy (dict | None): Configuração de proxy do Playwright.
+            render_policy (RenderPolicy | None): Recursos bloqueados durante a
+                renderização. Se None, usa a política padrão.
+        """
+        self.max_pages = max_pages
+        self.browsers = browsers
+        self.headless = headless
+        self.proxy = proxy
+        self.render_policy = render_policy or RenderPolicy()
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._contexts_lock = asyncio.Lock()
+        self._playwright = None
+        self._browsers = []
+        # Contextos por navegador e família de User-Agent
+        self._contexts = {}
+        # Páginas livres e a família do seu contexto, da mais antiga à mais recente
+        self._idle = []
+        self._next_browser = 0
+        # Parsers que usam este pool, por classe e sessão (ver `ParserFactory`)
+        self.parsers: dict = {}
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _browser(self):
+        """Retorna um navegador, iniciando-o se necessário (em rodízio)."""
+        async with self._lock:
+            if self._playwright is None:
+                # O Playwright só é importado quando o primeiro navegador inicia
+                from playwright.async_api import (  # pylint: disable=import-outside-toplevel
+                    async_playwright,
+                )
+
+                self._playwright = await async_playwright().start()
+            self._browsers = [b for b in self._browsers if b.is_connected()]
+            self._contexts = {
+                key: context
+                for key, context in self._contexts.items()
+                if key[0].is_connected()
+            }
+            if len(self._browsers) < self.browsers:
+                browser = await self._playwright.chromium.launch(
+                    headless=self.headless, proxy=self.proxy
+                )
+                self._browsers.append(browser)
+                return browser
+            self._next_browser = (self._next_browser + 1) % len(self._browsers)
+            return self._browsers[self._next_browser]
+
+    async def _new_page(self, family: str | None, user_agent: str | None):
+        """Cria uma página no contexto da família de User-Agent."""
+        browser = await self._browser()
+        async with self._contexts_lock:
+            context = self._contexts.get((browser, family))
+            if context is None:
+                context = await browser.new_context(user_agent=user_agent)
+                self._contexts[browser, family] = context
+        return await context.new_page()
+
+    def _idle_page(self, family: str | None):
+        """Retira a página livre mais recente da família, se houver."""
+        for index in range(len(self._idle) - 1, -1, -1):
+            idle_family, page = self._idle[index]
+            if idle_family != family:
+                continue
+            del self._idle[index]
+            if not page.is_closed() and page.context.browser.is_connected():
+                return page
+        return None
+
+    @asynccontextmanager
+    async def page(self, user_agent: str | None = None):
+        """
+        Reserva uma página do pool durante o bloco.
+
+        Args:
+            user_agent (str | None): User-Agent enviado nas requisições. A
+                página pode usar outro User-Agent da mesma família.
+
+        Yields:
+            Page: Página do Playwright.
+        """
+        family = user_agent_family(user_agent) if user_agent else None
+        async with self._semaphore:
+            page = self._idle_page(family)
+            if page is None:
+                page = await self._new_page(family, user_agent)
+            reusable = False
+            try:
+                yield page
+                reusable = True
+            finally:
+                if reusable and not page.is_closed():
+                    self._idle.append((family, page))
+                    if len(self._idle) > self.max_pages:
+                        # Páginas de outras famílias não ficam abertas sem uso
+                        await self._close_page(self._idle.pop(0)[1])
+                else:
+                    await self._close_page(page)
+
+    @staticmethod
+    async def _close_page(page):
+        """Fecha a página, ignorando erros do navegador."""
+        try:
+            await page.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    async def close(self):
+        """Fecha todas as páginas, navegadores e o Playwright."""
+        async with self._lock:
+            self._idle.clear()
+            for context in self._contexts.values():
+                try:
+                    await context.close()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+            self._contexts.clear()
+            for browser in self._browsers:
+                await browser.close()
+            self._browsers.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
@@ -2,6 +2,7 @@
 
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
+from theses_scraper.utils.metrics import metrics
 from .generic import GenericParser
 
 
@@ -13,8 +14,9 @@ class CESPUParser(GenericParser):
         Extrai o link do PDF da página.
         """
         html, url = await self.get_html(url, **kwargs)
-        soup = BeautifulSoup(html, "html.parser")
-        pdf_links = self.extract_pdf_links(soup, url)
+        with metrics.timer("parse", url):
+            soup = BeautifulSoup(html, "html.parser")
+            pdf_links = self.extract_pdf_links(soup, url)
         return pdf_links
 
     def extract_pdf_links(self, soup: BeautifulSoup, base_url: str) -> list[str] | None:
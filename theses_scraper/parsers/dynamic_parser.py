@@ -1,7 +1,29 @@
 """Module for SeleniumParser class."""
 
-from playwright.async_api import async_playwright
-from .generic import GenericParser
+import asyncio
+from contextlib import nullcontext, suppress
+from contextvars import ContextVar
+from playwright.async_api import Error as PlaywrightError
+from theses_scraper.utils import http_utils
+from theses_scraper.utils.metrics import metrics
+from theses_scraper.utils.session import HttpSession
+from .browser_pool import BrowserPool, RenderPolicy
+from .generic import GenericParser, current_final_url
+from .link_extractor import PdfLinkExtractor
+
+# Elementos que indicam que o link do PDF já está no DOM
+_PDF_LINK_SELECTOR = ", ".join(
+    [
+        'meta[name="citation_pdf_url"]',
+        'a[href*="/bitstream/"]',
+        'a[href*="/bitstreams/"]',
+        'a[href$=".pdf"]',
+        'object[type="application/pdf"]',
+    ]
+)
+
+# URL de PDF detectada durante a renderização da página na tarefa atual
+_detected_pdf_url: ContextVar[str | None] = ContextVar("detected_pdf_url", default=None)
 
 
 class DynamicContentParser(GenericParser):
@@ -9,23 +31,170 @@ class DynamicContentParser(GenericParser):
     Parser para repositórios que necessitam de JavaScript para carregamento completo.
     """
 
+    uses_browser = True
+
+    def __init__(
+        self,
+        session: HttpSession | None = None,
+        browser_pool: BrowserPool | None = None,
+    ):
+        """
+        Args:
+            session (HttpSession | None): Sessão HTTP compartilhada.
+            browser_pool (BrowserPool | None): Pool de navegadores. Se None, um
+                navegador é iniciado e fechado a cada página.
+        """
+        super().__init__(session)
+        self.browser_pool = browser_pool
+
+    async def get_pdf_link(self, url: str, **kwargs) -> str | list[str] | None:
+        """
+        Extrai o link do PDF da página.
+
+        Se uma resposta PDF for detectada durante a renderização, a sua URL é
+        retornada diretamente.
+        """
+        _detected_pdf_url.set(None)
+        pdf_url = await super().get_pdf_link(url, **kwargs)
+        return _detected_pdf_url.get() or pdf_url
+
+    async def scan_html(self, url: str, **kwargs) -> tuple[str, str, PdfLinkExtractor]:
+        """
+        Renderiza a página e analisa o HTML completo com um `PdfLinkExtractor`.
+        """
+        html, url = await self.get_html(url, **kwargs)
+        with metrics.timer("parse", url):
+            extractor = PdfLinkExtractor()
+            extractor.feed(html)
+            extractor.close()
+        return html, url, extractor
+
     async def get_html(self, url: str, **kwargs) -> tuple[str, str]:
         """
         Obtém o HTML da página e a URL final.
+
+        A página é considerada pronta assim que um link para o PDF aparece no
+        DOM ou, na falta dele, quando a rede fica ociosa, limitado a `timeout`
+        segundos.
         """
         timeout = kwargs.get("timeout", 3)
-        proxy = kwargs.get("proxy", None)
         headers = kwargs.get("headers", None)
-        user_agent = headers.get("User-Agent") if headers else None
-
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True, proxy=proxy)
-            context = await browser.new_context(user_agent=user_agent)
-            page = await context.new_page()
-            await page.goto(url)
-            await page.wait_for_timeout(timeout * 1000)
-            page_content = await page.content()
-            current_url = page.url
-            await context.close()
-            await browser.close()
-            return page_content, current_url
+        user_agent = (headers or {}).get("User-Agent") or http_utils.user_agent_for(
+            url, self.session
+        )
+
+        with metrics.timer("render", url):
+            if self.browser_pool is not None:
+                return await self._render(self.browser_pool, url, timeout, user_agent)
+            async with BrowserPool(max_pages=1, proxy=kwargs.get("proxy")) as pool:
+                return await self._render(pool, url, timeout, user_agent)
+
+    async def _render(
+        self, pool: BrowserPool, url: str, timeout: float, user_agent: str | None
+    ) -> tuple[str, str]:
+        """Carrega a página em um navegador do pool e retorna o HTML."""
+        # Respeita os limites do host definidos no escalonador da sessão
+        slot = (
+            self.session.scheduler.slot(self.session.scheduler.host_of(url))
+            if self.session is not None
+            else nullcontext()
+        )
+        # A vaga do host só é ocupada depois de obter a página, para que a
+        # espera por uma página livre não bloqueie requisições ao host
+        async with pool.page(user_agent) as page, slot as feedback:
+            pdf_found = asyncio.get_running_loop().create_future()
+            route_handler, response_handler = self._interceptors(
+                page, pool.render_policy, pdf_found
+            )
+            await page.route("**/*", route_handler)
+            page.on("response", response_handler)
+
+            async def load():
+                response = await page.goto(url, wait_until="domcontentloaded")
+                if feedback is not None and response is not None:
+                    feedback(
+                        response.status, await response.header_value("retry-after")
+                    )
+                await self._wait_for_pdf_link(page, timeout)
+
+            loading = asyncio.ensure_future(load())
+            try:
+                await asyncio.wait(
+                    {loading, pdf_found}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if pdf_found.done():
+                    # A página entregou um PDF: não é preciso terminar de carregá-la
+                    loading.cancel()
+                    with suppress(asyncio.CancelledError, PlaywrightError):
+                        await loading
+                    _detected_pdf_url.set(pdf_found.result())
+                    current_final_url.set(page.url)
+                    return "", page.url
+                loading.result()
+                page_content = await page.content()
+                current_url = page.url
+                current_final_url.set(current_url)
+                return page_content, current_url
+            finally:
+                page.remove_listener("response", response_handler)
+                with suppress(PlaywrightError):
+                    await page.unroute("**/*", route_handler)
+
+    @staticmethod
+    def _interceptors(page, policy: RenderPolicy, pdf_found: asyncio.Future):
+        """
+        Cria os tratadores de requisições e respostas que aplicam a política
+        de renderização e detectam PDFs.
+        """
+
+        def found(pdf_url: str):
+            if policy.stop_on_pdf and not pdf_found.done():
+                pdf_found.set_result(pdf_url)
+
+        async def on_route(route):
+            request = route.request
+            if request.is_navigation_request():
+                if (
+                    policy.stop_on_pdf
+                    and request.frame.parent_frame is not None
+                    and policy.looks_like_pdf(request.url)
+                ):
+                    # PDF embutido em um visualizador: registra sem baixar
+                    found(request.url)
+                    await route.abort()
+                    return
+                await route.continue_()
+                return
+            if policy.should_block(request.url, request.resource_type, page.url):
+                await route.abort()
+                return
+            await route.continue_()
+
+        def on_response(response):
+            content_type = response.headers.get("content-type", "").lower()
+            if "application/pdf" in content_type:
+                found(response.url)
+
+        return on_route, on_response
+
+    @staticmethod
+    async def _wait_for_pdf_link(page, timeout: float):
+        """
+        Aguarda o link do PDF aparecer no DOM ou a rede ficar ociosa.
+
+        As duas esperas compartilham o mesmo prazo de `timeout` segundos.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            await page.wait_for_selector(
+                _PDF_LINK_SELECTOR, state="attached", timeout=timeout * 1000
+            )
+        except PlaywrightError:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await page.wait_for_load_state("networkidle", timeout=remaining * 1000)
+            except PlaywrightError:
+                pass
@@ -1,22 +1,60 @@
 """Módulo com o parser genérico para repositórios institucionais."""
 
 import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from theses_scraper.utils import http_utils
+from theses_scraper.utils.metrics import metrics
+from .link_extractor import PDF_PATTERNS, PdfLinkExtractor
 from .parser import Parser
 
+if TYPE_CHECKING:
+    import httpx
+    from bs4 import BeautifulSoup
+    from theses_scraper.utils.session import HttpSession
+
+# Bytes restantes até os quais uma resposta interrompida ainda é lida até o fim
+_DRAIN_LIMIT = 64 * 1024
+
+# URL final da última página obtida pela tarefa atual
+current_final_url: ContextVar[str | None] = ContextVar(
+    "current_final_url", default=None
+)
+
+# Função que recebe a resposta quando a URL analisada já é um PDF, para que o
+# documento seja gravado sem uma nova requisição: `handoff(url, response, chunks)`
+pdf_handoff: ContextVar[
+    "Callable[[str, httpx.Response, AsyncIterator[bytes]], Awaitable[None]] | None"
+] = ContextVar("pdf_handoff", default=None)
+
 
 class GenericParser(Parser):
     """
     Parser para repositórios institucionais genéricos.
     """
 
+    def __init__(self, session: "HttpSession | None" = None):
+        """
+        Args:
+            session (HttpSession | None): Sessão HTTP compartilhada. Se None,
+                cada requisição abre sua própria conexão.
+        """
+        self.session = session
+
     async def get_html(self, url: str, **kwargs) -> tuple[str, str]:
         """
         Obtém o HTML da página e a URL final.
         """
-        response = await http_utils.get(url, **kwargs)
+        # O httpx só é carregado na primeira requisição
+        from theses_scraper.utils import (  # pylint: disable=import-outside-toplevel
+            http_utils,
+        )
+
+        with metrics.timer("fetch", url):
+            response = await http_utils.get(url, session=self.session, **kwargs)
+        current_final_url.set(str(response.url))
         return response.content, str(response.url)
 
     async def get_pdf_link(self, url: str, **kwargs) -> str | list[str] | None:
@@ -25,16 +63,125 @@ class GenericParser(Parser):
         """
         if url.endswith(".pdf"):
             return url
-        if await http_utils.is_pdf(url):
+        html, final_url, extractor = await self.scan_html(url, **kwargs)
+        if html is None:
+            # A própria URL é o documento
             return url
-        html, url = await self.get_html(url, **kwargs)
-        soup = BeautifulSoup(html, "html.parser")
-        if pdf_url := self.find_meta_pdf_url(soup, url):
-            return pdf_url
-        return self.extract_pdf_url_from_soup(soup, url)
+        if extractor.reliable:
+            return self.pdf_url_from_extractor(extractor, html, final_url)
+        with metrics.timer("parse_soup", url):
+            return self.pdf_url_from_extractor(extractor, html, final_url)
+
+    async def scan_html(
+        self, url: str, **kwargs
+    ) -> tuple[bytes | None, str, PdfLinkExtractor]:
+        """
+        Lê a página em partes, analisando-a com um `PdfLinkExtractor`.
+
+        Uma única requisição GET, seguindo redirecionamentos, identifica se a
+        URL já é um PDF (pelo `Content-Type` ou pela assinatura `%PDF-`). Nesse
+        caso, a resposta é entregue à função em `pdf_handoff`, se houver.
+        Caso contrário, a leitura é interrompida assim que o link de maior
+        prioridade é encontrado (ex.: a tag meta `citation_pdf_url` no
+        `<head>`), sem baixar o restante da página.
+
+        Returns:
+            tuple[bytes | None, str, PdfLinkExtractor]: HTML lido (completo se
+            o extrator não for confiável, None se a URL for um PDF), URL
+            final e extrator.
+        """
+        from theses_scraper.utils import (  # pylint: disable=import-outside-toplevel
+            http_utils,
+        )
+
+        kwargs.setdefault("follow_redirects", True)
+        extractor = PdfLinkExtractor()
+        chunks = []
+        started = time.perf_counter()
+        parse_time = 0.0
+        async with http_utils.get_stream(
+            url, session=self.session, **kwargs
+        ) as response:
+            final_url = str(response.url)
+            current_final_url.set(final_url)
+            body = response.aiter_bytes()
+            prefix = await http_utils.read_prefix(body)
+            if http_utils.looks_like_pdf(http_utils.get_file_type(response), prefix):
+                if (handoff := pdf_handoff.get()) is not None:
+                    await handoff(url, response, http_utils.prepend(prefix, body))
+                else:
+                    await self._drain(response, body)
+                return None, final_url, extractor
+            async for chunk in http_utils.prepend(prefix, body):
+                chunks.append(chunk)
+                feed_started = time.perf_counter()
+                extractor.feed(chunk)
+                parse_time += time.perf_counter() - feed_started
+                if extractor.done and extractor.reliable:
+                    break
+            else:
+                extractor.close()
+            await self._drain(response, body)
+        metrics.observe("fetch", time.perf_counter() - started - parse_time, url)
+        metrics.observe("parse", parse_time, url)
+        return b"".join(chunks), final_url, extractor
+
+    @staticmethod
+    async def _drain(response, body):
+        """
+        Lê o restante de uma resposta pequena para que a conexão volte ao
+        pool. Respostas maiores são descartadas junto com a conexão.
+        """
+        content_length = response.headers.get("Content-Length", "")
+        if not content_length.isdigit():
+            return
+        if int(content_length) - response.num_bytes_downloaded > _DRAIN_LIMIT:
+            return
+        async for _ in body:
+            pass
+
+    @staticmethod
+    def extract_pdf_url(html: str | bytes, base_url: str) -> str | None:
+        """
+        Extrai o link do PDF do HTML em uma única passagem.
+
+        Usa o `PdfLinkExtractor` e recorre ao BeautifulSoup quando o resultado
+        depende da codificação do documento.
+        """
+        extractor = PdfLinkExtractor()
+        extractor.feed(html)
+        extractor.close()
+        return GenericParser.pdf_url_from_extractor(extractor, html, base_url)
+
+    @staticmethod
+    def pdf_url_from_extractor(
+        extractor: PdfLinkExtractor, html: str | bytes, base_url: str
+    ) -> str | None:
+        """
+        Resolve o link encontrado pelo extrator contra a URL base.
+
+        Se o resultado do extrator não for confiável, `html` deve conter o
+        documento completo, que é analisado com o BeautifulSoup.
+        """
+        if not extractor.reliable:
+            # O BeautifulSoup só é carregado quando o extrator não basta
+            from bs4 import (  # pylint: disable=import-outside-toplevel
+                BeautifulSoup,
+            )
+
+            return GenericParser.extract_pdf_url_from_soup(
+                BeautifulSoup(html, "html.parser"), base_url
+            )
+        match = extractor.best_match()
+        if match is None:
+            return None
+        tag, value = match
+        if tag == "meta":
+            return GenericParser.normalize_localhost_url(value, base_url)
+        return urljoin(base_url, value)
 
     @staticmethod
-    def find_meta_pdf_url(soup: BeautifulSoup, base_url: str) -> str | None:
+    def find_meta_pdf_url(soup: "BeautifulSoup", base_url: str) -> str | None:
         """Busca o link PDF na tag meta, se existir."""
         meta_tag = soup.find("meta", {"name": "citation_pdf_url"})
         if meta_tag:
@@ -60,24 +207,12 @@ class GenericParser(Parser):
         return pdf_url
 
     @staticmethod
-    def extract_pdf_url_from_soup(soup: BeautifulSoup, base_url: str) -> str | None:
+    def extract_pdf_url_from_soup(soup: "BeautifulSoup", base_url: str) -> str | None:
         """Extrai o link do PDF a partir de um objeto BeautifulSoup."""
         if pdf_url := GenericParser.find_meta_pdf_url(soup, base_url):
             return pdf_url
 
-        pdf_patterns = [
-            {"tag": "object", "attr": "data", "mime_type": "application/pdf"},
-            {"tag": "a", "attr": "href", "pattern": r"/Busca/Download\?codigoArquivo="},
-            {"tag": "a", "attr": "href", "pattern": r"/bitstream.*\.pdf$"},
-            {
-                "tag": "a",
-                "attr": "href",
-                "pattern": r"download.php\?(id_ficheiro|codigo)=",
-            },
-            {"tag": "a", "attr": "href", "pattern": r"auth-sophia/exibicao"},
-        ]
-
-        for pattern in pdf_patterns:
+        for pattern in PDF_PATTERNS:
             if pdf_url := GenericParser.find_pdf_url_by_pattern(
                 soup, base_url, **pattern
             ):
@@ -85,7 +220,7 @@ class GenericParser(Parser):
 
     @staticmethod
     def find_pdf_url_by_pattern(
-        soup: BeautifulSoup,
+        soup: "BeautifulSoup",
         base_url: str,
         tag: str,
         attr: str,
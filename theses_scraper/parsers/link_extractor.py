@@ -0,0 +1,191 @@
+"""
+Módulo com o extrator de links de PDF em passagem única.
+
+O HTML é percorrido uma única vez por um tokenizador incremental, sem montar a
+árvore do BeautifulSoup. Todos os padrões de `PDF_PATTERNS` são avaliados na
+mesma passagem e a análise é interrompida assim que a tag meta
+`citation_pdf_url` é encontrada.
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Nome da tag meta com o link do PDF, que tem prioridade sobre os padrões
+META_NAME = "citation_pdf_url"
+
+# Padrões de links de PDF, em ordem de prioridade
+PDF_PATTERNS = [
+    {"tag": "object", "attr": "data", "mime_type": "application/pdf"},
+    {"tag": "a", "attr": "href", "pattern": r"/Busca/Download\?codigoArquivo="},
+    {"tag": "a", "attr": "href", "pattern": r"/bitstream.*\.pdf$"},
+    {
+        "tag": "a",
+        "attr": "href",
+        "pattern": r"download.php\?(id_ficheiro|codigo)=",
+    },
+    {"tag": "a", "attr": "href", "pattern": r"auth-sophia/exibicao"},
+]
+
+# BOMs de codificações que não são compatíveis com ASCII
+_WIDE_BOMS = (
+    codecs.BOM_UTF32_LE,
+    codecs.BOM_UTF32_BE,
+    codecs.BOM_UTF16_LE,
+    codecs.BOM_UTF16_BE,
+)
+
+
+class _Stop(Exception):
+    """Interrompe a análise quando o resultado não pode mais mudar."""
+
+
+class PdfLinkExtractor(HTMLParser):
+    """
+    Extrator incremental de links de PDF.
+
+    Aplica as mesmas regras de `GenericParser.extract_pdf_url_from_soup`: a
+    primeira tag meta `citation_pdf_url` do documento e, na falta dela, o
+    primeiro elemento de cada padrão de `PDF_PATTERNS`, na ordem de
+    prioridade.
+
+    O conteúdo pode ser fornecido em partes com `feed`. Bytes são decodificados
+    como UTF-8 preservando os bytes inválidos, o que mantém a estrutura das
+    tags em qualquer codificação compatível com ASCII. Quando o resultado
+    depende da codificação, `reliable` indica que é preciso usar o
+    BeautifulSoup no documento completo.
+
+    Exemplo:
+        >>> extractor = PdfLinkExtractor()
+        >>> extractor.feed(html)
+        >>> extractor.close()
+        >>> extractor.best_match()
+        ('meta', 'https://repositorio.ufsc.br/bitstream/123/1/tese.pdf')
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.done = False
+        self.meta_content: str | None = None
+        self._meta_seen = False
+        self._reliable = True
+        self._decoder = None
+        self._found = [False] * len(PDF_PATTERNS)
+        self._values: list[str | None] = [None] * len(PDF_PATTERNS)
+        self._href_patterns = [
+            (index, re.compile(pattern["pattern"]))
+            for index, pattern in enumerate(PDF_PATTERNS)
+            if pattern["tag"] == "a"
+        ]
+        self._object_patterns = [
+            (index, pattern["mime_type"], pattern["attr"])
+            for index, pattern in enumerate(PDF_PATTERNS)
+            if pattern["tag"] == "object"
+        ]
+
+    @property
+    def reliable(self) -> bool:
+        """Indica se o resultado independe da codificação do documento."""
+        if not self._reliable:
+            return False
+        match = self.best_match()
+        return match is None or match[1] is None or match[1].isascii()
+
+    def feed(self, data: str | bytes):
+        """Analisa mais um trecho do documento."""
+        if self.done:
+            return
+        if isinstance(data, bytes):
+            if self._decoder is None:
+                if data.startswith(_WIDE_BOMS) or b"\x00" in data[:1024]:
+                    # UTF-16/UTF-32: a estrutura das tags não é legível como ASCII
+                    self._reliable = False
+                    self.done = True
+                    return
+                self._decoder = codecs.getincrementaldecoder("utf-8-sig")(
+                    "surrogateescape"
+                )
+            data = self._decoder.decode(data)
+        try:
+            super().feed(data)
+        except _Stop:
+            self.done = True
+        except Exception:  # pylint: disable=broad-except
+            # Documento malformado: o BeautifulSoup decide
+            self._reliable = False
+            self.done = True
+
+    def close(self):
+        """Conclui a análise do documento."""
+        if self.done:
+            return
+        if self._decoder is not None:
+            self.feed(self._decoder.decode(b"", final=True))
+            if self.done:
+                return
+        try:
+            super().close()
+        except _Stop:
+            pass
+        except Exception:  # pylint: disable=broad-except
+            self._reliable = False
+        self.done = True
+
+    def best_match(self) -> tuple[str, str | None] | None:
+        """
+        Retorna o link encontrado de maior prioridade.
+
+        Returns:
+            tuple[str, str | None] | None: Tag de origem ("meta", "object" ou
+            "a") e valor do atributo, ainda não resolvido contra a URL base.
+        """
+        if self.meta_content:
+            return "meta", self.meta_content
+        for index, found in enumerate(self._found):
+            if found:
+                return PDF_PATTERNS[index]["tag"], self._values[index]
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta":
+            if not self._meta_seen:
+                self._handle_meta(attrs)
+        elif tag == "a":
+            self._handle_link(attrs)
+        elif tag == "object":
+            self._handle_object(attrs)
+
+    def _handle_meta(self, attrs):
+        values = dict(attrs)
+        if values.get("name") != META_NAME:
+            return
+        # Apenas a primeira tag meta é considerada, como em `soup.find`
+        self._meta_seen = True
+        self.meta_content = values.get("content")
+        self._stop_if_settled()
+
+    def _handle_link(self, attrs):
+        href = None
+        for name, value in attrs:
+            if name == "href":
+                href = value or ""
+        if href is None:
+            return
+        for index, pattern in self._href_patterns:
+            if not self._found[index] and pattern.search(href):
+                self._found[index] = True
+                self._values[index] = href
+        self._stop_if_settled()
+
+    def _handle_object(self, attrs):
+        values = {name: value or "" for name, value in attrs}
+        for index, mime_type, attr in self._object_patterns:
+            if not self._found[index] and values.get("type") == mime_type:
+                self._found[index] = True
+                self._values[index] = values.get(attr)
+        self._stop_if_settled()
+
+    def _stop_if_settled(self):
+        """Interrompe a análise se nenhum elemento seguinte alterar o resultado."""
+        if self.meta_content or (self._meta_seen and self._found[0]):
+            raise _Stop
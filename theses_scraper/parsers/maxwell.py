@@ -1,6 +1,8 @@
 """Módulo para extrair links de PDFs da biblioteca Maxwell."""
 
+from urllib.parse import urljoin
 from bs4 import BeautifulSoup
+from theses_scraper.utils.metrics import metrics
 from .generic import GenericParser
 
 
@@ -12,18 +14,21 @@ class MaxwellParser(GenericParser):
         Extrai o link do PDF da página.
         """
         html, url = await self.get_html(url, **kwargs)
-        soup = BeautifulSoup(html, "html.parser")
-        pdf_links = self.extract_pdf_links(soup)
+        with metrics.timer("parse", url):
+            soup = BeautifulSoup(html, "html.parser")
+            pdf_links = self.extract_pdf_links(soup, url)
         return pdf_links
 
-    def extract_pdf_links(self, soup: BeautifulSoup) -> list[str] | None:
+    def extract_pdf_links(
+        self, soup: BeautifulSoup, base_url: str = ""
+    ) -> list[str] | None:
         """Extrai os links de PDFs da página."""
         select = soup.find("select", {"id": "file"})
         links = None
         if select:
             options = select.find_all("option", value=lambda v: v)
             links = [
-                a["href"]
+                urljoin(base_url, a["href"])
                 for a in soup.find_all("a", href=lambda a: a and "pdf" in a.lower())
             ]
             return links if len(options) == len(links) else None
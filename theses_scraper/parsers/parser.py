@@ -11,6 +11,9 @@ class Parser(ABC):
     Abstract class that defines the methods that must be implemented by the parsers classes.
     """
 
+    # Parsers que renderizam as páginas recebem o pool de navegadores
+    uses_browser: bool = False
+
     @abstractmethod
     # retorna o html da página e a url final
     async def get_html(self, url: str, **kwargs) -> tuple[str, str]:
@@ -0,0 +1,196 @@
+"""
+Módulo com o registro de parsers por host.
+
+Cada parser é associado a domínios (o próprio host e os seus subdomínios) ou
+a regras sobre a URL completa. A escolha do parser de uma URL consulta um
+dicionário com os sufixos do seu host, sem percorrer listas de domínios.
+
+Um parser pode ser registrado pela classe ou por `módulo:Classe`; neste caso
+o módulo só é importado quando uma URL é atribuída ao parser pela primeira vez.
+"""
+
+import importlib
+import json
+import re
+import tomllib
+from collections.abc import Callable
+from importlib.metadata import entry_points
+from pathlib import Path
+
+# Grupo de entry points usado por pacotes externos para registrar parsers
+ENTRY_POINT_GROUP = "theses_scraper.parsers"
+
+# Host de uma URL absoluta, sem usuário e porta
+_HOST = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://(?:[^@/?#]*@)?(\[[^\]]*\]|[^:/?#]*)")
+
+
+def host_of(url: str) -> str:
+    """
+    Retorna o host de uma URL em minúsculas.
+
+    Examples:
+        >>> host_of("https://User@Repositorio.UNESP.br.:8080/handle/1")
+        'repositorio.unesp.br'
+    """
+    match = _HOST.match(url)
+    # Um ponto final (`exemplo.br.`) indica o mesmo host
+    return match.group(1).lower().rstrip(".") if match else ""
+
+
+def query_has(parameter: str) -> Callable[[str], bool]:
+    """
+    Cria uma regra que verifica se a query string da URL tem o parâmetro.
+
+    Examples:
+        >>> query_has("codigo_sophia")("https://x.br/index.asp?codigo_sophia=12")
+        True
+    """
+    token = f"{parameter}="
+
+    def predicate(url: str) -> bool:
+        if token not in url:
+            return False
+        query = url.partition("?")[2].partition("#")[0]
+        return any(field.startswith(token) for field in query.split("&"))
+
+    return predicate
+
+
+class ParserRegistry:
+    """
+    Registro que associa URLs a classes de parser.
+
+    As regras são avaliadas na ordem de registro e, se nenhuma casar, o host
+    da URL e os seus sufixos (`a.b.c.br`, `b.c.br`, `c.br`) são buscados no
+    dicionário de domínios. Assim, uma regra prevalece sobre o domínio mesmo
+    que este tenha sido registrado antes (ex.: uma URL com `codigo_sophia=`
+    no host do Maxwell vai para o `SophiaParser`), ao contrário da antiga
+    busca por substrings, que seguia a ordem dos testes.
+
+    Exemplo:
+        >>> registry = ParserRegistry(GenericParser)
+        >>> registry.register(DynamicContentParser, domains=["repositorio.unesp.br"])
+        >>> registry.resolve("https://repositorio.unesp.br/handle/11449/1")
+        DynamicContentParser
+    """
+
+    def __init__(self, default: type):
+        """
+        Args:
+            default (type): Parser usado quando nenhum domínio ou regra casa.
+        """
+        self.default = default
+        self._domains: dict[str, type | str] = {}
+        self._rules: list[tuple[Callable[[str], bool], type | str]] = []
+        self._classes: dict[str, type] = {}
+        self._entry_points_loaded = False
+
+    def register(
+        self,
+        parser_class: type | str,
+        domains: list[str] | tuple[str, ...] = (),
+        predicate: Callable[[str], bool] | None = None,
+    ):
+        """
+        Registra um parser.
+
+        Args:
+            parser_class (type | str): Classe do parser ou `módulo:Classe`,
+                importada apenas quando o parser for usado.
+            domains (list[str]): Domínios atendidos pelo parser, incluindo os
+                seus subdomínios. Um domínio já registrado é substituído.
+            predicate (Callable[[str], bool] | None): Regra sobre a URL
+                completa, avaliada antes dos domínios.
+        """
+        for domain in domains:
+            self._domains[domain.lower().strip(".")] = parser_class
+        if predicate is not None:
+            self._rules.append((predicate, parser_class))
+
+    def domains(self, parser_class: type) -> list[str]:
+        """Retorna os domínios registrados para um parser."""
+        reference = f"{parser_class.__module__}:{parser_class.__qualname__}"
+        return [
+            domain
+            for domain, cls in self._domains.items()
+            if cls is parser_class or cls == reference
+        ]
+
+    def resolve(self, url: str) -> type:
+        """Retorna a classe do parser para a URL."""
+        if not self._entry_points_loaded:
+            self.load_entry_points()
+        for index, (predicate, parser_class) in enumerate(self._rules):
+            if predicate(url):
+                if isinstance(parser_class, str):
+                    parser_class = self._import(parser_class)
+                    self._rules[index] = (predicate, parser_class)
+                return parser_class
+        host = host_of(url)
+        domains = self._domains
+        while host:
+            if (parser_class := domains.get(host)) is not None:
+                if isinstance(parser_class, str):
+                    parser_class = domains[host] = self._import(parser_class)
+                return parser_class
+            host = host.partition(".")[2]
+        return self.default
+
+    def _import(self, reference: str) -> type:
+        """Importa a classe de um parser registrado por `módulo:Classe`."""
+        parser_class = self._classes.get(reference)
+        if parser_class is None:
+            module, _, attribute = reference.partition(":")
+            parser_class = getattr(importlib.import_module(module), attribute)
+            self._classes[reference] = parser_class
+        return parser_class
+
+    def load_entry_points(self):
+        """
+        Carrega os parsers registrados por pacotes instalados.
+
+        Cada entry point do grupo `theses_scraper.parsers` aponta para uma
+        função que recebe o registro, por exemplo:
+
+            [project.entry-points."theses_scraper.parsers"]
+            meu_repositorio = "meu_pacote.parsers:register"
+        """
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            entry_point.load()(self)
+
+    def load_config(self, path: str, parsers: dict[str, type | str] | None = None):
+        """
+        Registra domínios a partir de um arquivo TOML ou JSON.
+
+        O arquivo associa domínios a parsers, indicados pelo nome de um parser
+        do pacote ou por `módulo:Classe`:
+
+            [domains]
+            "repositorio.exemplo.br" = "DynamicContentParser"
+            "teses.exemplo.pt" = "meu_pacote.parsers:MeuParser"
+
+        Args:
+            path (str): Caminho do arquivo.
+            parsers (dict[str, type | str] | None): Parsers disponíveis pelo
+                nome, pela classe ou por `módulo:Classe`.
+        """
+        path = Path(path)
+        with open(path, "rb") as file:
+            config = (
+                json.load(file)
+                if path.suffix.lower() == ".json"
+                else tomllib.load(file)
+            )
+        for domain, name in config.get("domains", {}).items():
+            self.register(self._load_class(name, parsers or {}), domains=[domain])
+
+    @staticmethod
+    def _load_class(name: str, parsers: dict[str, type | str]) -> type | str:
+        """Obtém a classe de um parser pelo nome ou por `módulo:Classe`."""
+        if name in parsers:
+            return parsers[name]
+        module, _, attribute = name.partition(":")
+        if not attribute:
+            raise ValueError(f"Parser desconhecido: {name}")
+        return getattr(importlib.import_module(module), attribute)
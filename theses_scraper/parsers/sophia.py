@@ -2,9 +2,9 @@
 
 import re
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 from theses_scraper.utils import http_utils
-from .generic import GenericParser
+from .generic import GenericParser, current_final_url
+from .link_extractor import PdfLinkExtractor
 
 
 class SophiaParser(GenericParser):
@@ -16,23 +16,43 @@ class SophiaParser(GenericParser):
         """
         Obtém o HTML da página e a URL final.
         """
-        sophia_code = self.extract_sophia_code(url)
-        if not sophia_code:
+        download_page_url = self.download_page_url(url)
+        if not download_page_url:
             return "", ""
-        new_url = f"https://{urlparse(url).netloc}/php"
-        download_page_url = f"{new_url}/midia.php?tipo=1&codigo={sophia_code}"
-        response = await http_utils.get(download_page_url, **kwargs)
+        response = await http_utils.get(
+            download_page_url, session=self.session, **kwargs
+        )
+        current_final_url.set(str(response.url))
         return response.content, str(response.url)
 
+    async def scan_html(
+        self, url: str, **kwargs
+    ) -> tuple[bytes | None, str, PdfLinkExtractor]:
+        """
+        Lê a página de download do trabalho com um `PdfLinkExtractor`.
+        """
+        download_page_url = self.download_page_url(url)
+        if not download_page_url:
+            return b"", "", PdfLinkExtractor()
+        return await super().scan_html(download_page_url, **kwargs)
+
     async def get_pdf_link(self, url: str, **kwargs) -> str | list[str] | None:
         """
         Extrai o link do PDF da página.
         """
-        html, url = await self.get_html(url, **kwargs)
-        soup = BeautifulSoup(html, "html.parser")
-        if pdf_url := self.find_meta_pdf_url(soup, url):
-            return pdf_url
-        return self.extract_pdf_url_from_soup(soup, url)
+        html, final_url, extractor = await self.scan_html(url, **kwargs)
+        if html is None:
+            # A página de download já entrega o documento
+            return self.download_page_url(url)
+        return self.pdf_url_from_extractor(extractor, html, final_url)
+
+    def download_page_url(self, url: str) -> str | None:
+        """Monta a URL da página de download a partir do código Sophia."""
+        sophia_code = self.extract_sophia_code(url)
+        if not sophia_code:
+            return None
+        new_url = f"https://{urlparse(url).netloc}/php"
+        return f"{new_url}/midia.php?tipo=1&codigo={sophia_code}"
 
     def extract_sophia_code(self, url: str) -> str | None:
         """Extrai o código Sophia da URL."""
@@ -2,6 +2,7 @@
 
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
+from theses_scraper.utils.metrics import metrics
 from .generic import GenericParser
 
 
@@ -12,8 +13,9 @@ class UFRRParser(GenericParser):
 
     async def get_pdf_link(self, url, **kwargs):
         html, url = await self.get_html(url, **kwargs)
-        soup = BeautifulSoup(html, "html.parser")
-        frame = soup.find("frame", attrs={"name": "mainFrame"})
+        with metrics.timer("parse", url):
+            soup = BeautifulSoup(html, "html.parser")
+            frame = soup.find("frame", attrs={"name": "mainFrame"})
         if frame:
             frame_url = frame["src"]
             url = urljoin(url, frame_url)
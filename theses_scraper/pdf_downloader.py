@@ -1,119 +1,189 @@
 """Módulo para obter o link de PDFs de repositórios institucionais."""
 
+import asyncio
+import atexit
 import re
-import time
-from urllib.parse import urljoin, urlparse
+import threading
+import warnings
+from collections.abc import Coroutine, Iterable
+from typing import TYPE_CHECKING
+
 import httpx
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from .parsers import ParserFactory
+from .parsers.browser_pool import BrowserPool
+from .parsers.generic import GenericParser
+from .utils import http_utils
+from .utils.session import HttpSession
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+class _BackgroundLoop:
+    """
+    Laço de eventos executado em uma thread própria, compartilhado pelas
+    chamadas síncronas.
+
+    A sessão HTTP e o pool de navegadores são criados no primeiro uso e
+    reaproveitados por todas as chamadas, até `close`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self.session: HttpSession | None = None
+        self.browser_pool: BrowserPool | None = None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="theses-scraper-loop",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coroutine: Coroutine):
+        """Executa a corrotina no laço compartilhado e aguarda o resultado."""
+        loop = self._start()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    async def resources(self) -> tuple[HttpSession, BrowserPool]:
+        """Retorna a sessão e o pool de navegadores, criando-os se necessário."""
+        if self.session is None:
+            self.session = HttpSession()
+        if self.browser_pool is None:
+            self.browser_pool = BrowserPool()
+        return self.session, self.browser_pool
+
+    async def set_session(self, session: HttpSession):
+        """Substitui a sessão, fechando a anterior."""
+        if self.session is not None and self.session is not session:
+            await self.session.aclose()
+        self.session = session
+
+    async def _close_resources(self):
+        if self.browser_pool is not None:
+            await self.browser_pool.close()
+        if self.session is not None:
+            await self.session.aclose()
+        self.session = self.browser_pool = None
+
+    def close(self):
+        """Fecha a sessão, o pool de navegadores e encerra o laço."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_resources(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+_background = _BackgroundLoop()
+atexit.register(_background.close)
+
+
+def _deprecated(name: str, replacement: str):
+    """Avisa que um método antigo do `PDFDownloader` será removido."""
+    warnings.warn(
+        f"PDFDownloader.{name} está obsoleto; use {replacement}.",
+        DeprecationWarning,
+        stacklevel=3,
+    )
 
 
 class PDFDownloader:
     """Classe para obter o link de dissertações e
-    teses de repositórios institucionais."""
+    teses de repositórios institucionais.
+
+    Interface síncrona sobre os parsers assíncronos da `ParserFactory`. As
+    chamadas são executadas em um laço de eventos em segundo plano, que
+    mantém um único pool de conexões e de navegadores entre chamadas.
+    """
 
     @staticmethod
-    def get(url: str, **kwargs) -> httpx.Response:
+    def get_pdf_link(url: str, **kwargs) -> str | list[str] | None:
         """
-        Executa uma requisição HTTP GET e retorna a resposta.
+        Retorna o link de download do PDF conforme o tipo de repositório.
 
         Args:
             url (str): URL do recurso.
-            **kwargs: Args adicionais para `httpx.Client`.
+            **kwargs: Args adicionais para `Parser.get_pdf_link`.
 
         Returns:
-            httpx.Response: Resposta da requisição.
+            str | list[str] | None: URL(s) do PDF ou None se não encontrada.
         """
-        with httpx.Client(**kwargs) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            return response
+        return _background.run(PDFDownloader._get_pdf_link(url, **kwargs))
 
     @staticmethod
-    def check_redirect_to_pdf(url: str, **kwargs) -> bool:
+    def get_pdf_links(
+        urls: Iterable[str], concurrency: int = 32, **kwargs
+    ) -> list[str | list[str] | None]:
         """
-        Verifica se a URL redireciona para um PDF.
+        Retorna os links de download de várias URLs, resolvidas de forma
+        concorrente.
 
         Args:
-            url (str): URL para verificar redirecionamento.
-            **kwargs: Args adicionais para a requisição HTTP HEAD.
+            urls (Iterable[str]): URLs dos recursos.
+            concurrency (int): Número máximo de URLs resolvidas
+                simultaneamente.
+            **kwargs: Args adicionais para `Parser.get_pdf_link`.
 
         Returns:
-            bool: True se a URL redireciona para um PDF, False caso contrário.
+            list[str | list[str] | None]: Link(s) de cada URL, na ordem da
+            entrada. URLs cuja resolução falhou resultam em None.
         """
-        with httpx.Client(**kwargs) as client:
-            response = client.head(url, follow_redirects=True)
-            content_type = response.headers.get("Content-Type", "").lower()
-            return "application/pdf" in content_type
+        return _background.run(
+            PDFDownloader._get_pdf_links(list(urls), concurrency, **kwargs)
+        )
 
     @staticmethod
-    def get_pdf_link(url: str, **kwargs) -> str | None:
+    def set_session(session: HttpSession):
         """
-        Retorna o link de download do PDF conforme o tipo de repositório.
+        Define a sessão HTTP usada pelas chamadas seguintes.
+
+        Permite configurar os limites, as políticas ou o transporte da sessão
+        (ex.: nos benchmarks). A sessão anterior, se houver, é fechada.
 
         Args:
-            url (str): URL do recurso.
-            **kwargs: Args adicionais para o método `get`.
+            session (HttpSession): Sessão compartilhada pelas chamadas.
+        """
+        _background.run(_background.set_session(session))
 
-        Returns:
-            str | None: URL do PDF ou None se não encontrada.
-        """
-        if url.endswith(".pdf"):
-            return url
-        elif PDFDownloader.check_redirect_to_pdf(url, **kwargs):
-            return url
-        elif "codigo_sophia=" in url:
-            return PDFDownloader.get_pdf_url_sophia(url, **kwargs)
-        elif "maxwell.vrac.puc-rio.br" in url:
-            return PDFDownloader.get_maxwell_pdf_links(url, **kwargs)
-        elif any(
-            domain in url
-            for domain in [
-                "web.esenfc.pt",
-                "pgsscogna.com.br",
-                "repositorio.pgsskroton.com",
-                "repositorio.unesp.br",
-                "repositorio.esenfc.pt",
-                "locus.ufv.br",
-                "www.locus.ufv.br",
-            ]
-        ):
-            return PDFDownloader.fetch_with_selenium(url)
-        else:
-            return PDFDownloader.extract_pdf_from_get(url, **kwargs)
+    @staticmethod
+    def close():
+        """Fecha a sessão HTTP e os navegadores compartilhados."""
+        _background.close()
 
     @staticmethod
-    def extract_pdf_from_get(url: str, **kwargs) -> str | None:
-        """Extrai o link PDF de uma página acessada via GET."""
-        response = PDFDownloader.get(url, **kwargs)
-        current_url = str(response.url)
-        return PDFDownloader.extract_pdf_url_from_soup(
-            BeautifulSoup(response.content, "html.parser"), base_url=current_url
+    async def _get_pdf_link(url: str, **kwargs) -> str | list[str] | None:
+        session, browser_pool = await _background.resources()
+        parser = ParserFactory.get_parser(
+            url, session=session, browser_pool=browser_pool
         )
+        return await parser.get_pdf_link(url, **kwargs)
 
     @staticmethod
-    def get_pdf_url_sophia(url: str, **kwargs) -> str | None:
-        """
-        Gera a URL de download para sistemas baseados no código Sophia.
-
-        Args:
-            url (str): URL contendo o parâmetro 'codigo_sophia'.
+    async def _get_pdf_links(
+        urls: list[str], concurrency: int, **kwargs
+    ) -> list[str | list[str] | None]:
+        semaphore = asyncio.Semaphore(concurrency)
 
-        Returns:
-            str | None: URL do PDF ou None se não encontrada.
-        """
-        codigo_sophia = PDFDownloader.extract_sophia_code(url)
-        if not codigo_sophia:
-            return None
+        async def resolve(url: str) -> str | list[str] | None:
+            async with semaphore:
+                try:
+                    return await PDFDownloader._get_pdf_link(url, **kwargs)
+                except Exception:  # pylint: disable=broad-except
+                    return None
 
-        new_url = f"https://{urlparse(url).netloc}/php"
-        download_page_url = f"{new_url}/midia.php?tipo=1&codigo={codigo_sophia}"
-        response = PDFDownloader.get(download_page_url, **kwargs)
-
-        return PDFDownloader.extract_pdf_url_from_soup(
-            BeautifulSoup(response.content, "html.parser"), base_url=download_page_url
-        )
+        return await asyncio.gather(*(resolve(url) for url in urls))
 
     @staticmethod
     def extract_sophia_code(url: str) -> str | None:
@@ -121,108 +191,156 @@ class PDFDownloader:
         match = re.search(r"codigo_sophia=([^&]+)", url)
         return match.group(1) if match else None
 
+    # Métodos da versão síncrona anterior, mantidos como atalhos obsoletos
+    # para os parsers assíncronos.
+
     @staticmethod
-    def extract_pdf_url_from_soup(soup: BeautifulSoup, base_url: str) -> str | None:
+    def get(url: str, **kwargs) -> httpx.Response:
         """
-        Extrai a URL do PDF a partir do HTML.
+        Executa uma requisição HTTP GET e retorna a resposta.
+
+        Obsoleto: use `http_utils.get`.
 
         Args:
-            soup (BeautifulSoup): Objeto BeautifulSoup do HTML.
-            base_url (str): URL base para construção de URLs relativas.
+            url (str): URL do recurso.
+            **kwargs: Args adicionais para `httpx.AsyncClient`.
+        """
+        _deprecated("get", "theses_scraper.utils.http_utils.get")
+        return _background.run(http_utils.get(url, **kwargs))
 
-        Returns:
-            str | None: URL do PDF ou None.
+    @staticmethod
+    def check_redirect_to_pdf(url: str, **kwargs) -> bool:
         """
-        if pdf_url := PDFDownloader.find_meta_pdf_url(soup, base_url):
-            return pdf_url
+        Verifica se a URL redireciona para um PDF.
 
-        pdf_patterns = [
-            {"tag": "object", "attr": "data", "type": "application/pdf"},
-            {"tag": "a", "attr": "href", "pattern": r"/Busca/Download\?codigoArquivo="},
-            {"tag": "a", "attr": "href", "pattern": r"/bitstream.*\.pdf$"},
-            {
-                "tag": "a",
-                "attr": "href",
-                "pattern": r"download.php\?(id_ficheiro|codigo)=",
-            },
-        ]
+        Obsoleto: `GenericParser.get_pdf_link` já identifica a URL de um PDF
+        pela resposta do GET.
 
-        for pattern in pdf_patterns:
-            if pdf_url := PDFDownloader.find_pdf_url_by_pattern(
-                soup, base_url, **pattern
-            ):
-                return pdf_url
+        Args:
+            url (str): URL para verificar redirecionamento.
+            **kwargs: Args adicionais para `httpx.AsyncClient`.
+        """
+        _deprecated("check_redirect_to_pdf", "PDFDownloader.get_pdf_link")
+
+        async def head() -> bool:
+            async with httpx.AsyncClient(**kwargs) as client:
+                response = await client.head(url, follow_redirects=True)
+            return "application/pdf" in http_utils.get_file_type(response)
+
+        return _background.run(head())
 
     @staticmethod
-    def find_meta_pdf_url(soup: BeautifulSoup, base_url: str) -> str | None:
-        """Busca o link PDF na tag meta, se existir."""
-        meta_tag = soup.find("meta", {"name": "citation_pdf_url"})
-        return urljoin(base_url, meta_tag["content"]) if meta_tag else None
+    def extract_pdf_from_get(url: str, **kwargs) -> str | None:
+        """
+        Extrai o link PDF de uma página acessada via GET.
+
+        Obsoleto: use `GenericParser.get_pdf_link`.
+        """
+        _deprecated("extract_pdf_from_get", "GenericParser.get_pdf_link")
+        response = _background.run(http_utils.get(url, **kwargs))
+        return GenericParser.extract_pdf_url(response.content, str(response.url))
 
     @staticmethod
-    def find_pdf_url_by_pattern(
-        soup: BeautifulSoup,
-        base_url: str,
-        tag: str,
-        attr: str,
-        pattern: str = None,
-        mime_type: str = None,
-    ) -> str | None:
-        """Busca uma URL de PDF usando padrões específicos."""
-        search_filter = {attr: re.compile(pattern)} if pattern else {}
-        if mime_type:
-            search_filter["type"] = mime_type
-        link = soup.find(tag, search_filter)
-        return urljoin(base_url, link.get(attr)) if link else None
+    def get_pdf_url_sophia(url: str, **kwargs) -> str | None:
+        """
+        Gera a URL de download para sistemas baseados no código Sophia.
+
+        Obsoleto: use `SophiaParser.get_pdf_link`.
+        """
+        _deprecated("get_pdf_url_sophia", "SophiaParser.get_pdf_link")
+        return PDFDownloader._run_parser("SophiaParser", url, **kwargs)
+
+    @staticmethod
+    def get_maxwell_pdf_links(url: str, **kwargs) -> list[str] | None:
+        """
+        Extrai os links dos arquivos PDF de uma página da biblioteca Maxwell.
+
+        Obsoleto: use `MaxwellParser.get_pdf_link`.
+        """
+        _deprecated("get_maxwell_pdf_links", "MaxwellParser.get_pdf_link")
+        return PDFDownloader._run_parser("MaxwellParser", url, **kwargs)
 
     @staticmethod
     def fetch_with_selenium(
-        url: str, proxy: str = None, timeout: int = 2
+        url: str, proxy: str | None = None, timeout: int = 2
     ) -> str | None:
         """
-        Obtém o conteúdo HTML de uma página usando Selenium e extrai o link do PDF.
+        Renderiza a página em um navegador e extrai o link do PDF.
 
-        Args:
-            url (str): URL da página.
-            proxy (str): Servidor proxy (opcional).
-            timeout (int): Tempo máximo de espera em segundos.
+        Com `proxy` (ex.: "http://proxy.exemplo.br:3128"), a página é
+        renderizada em um navegador próprio, fora do pool compartilhado.
 
-        Returns:
-            str | None: Link do PDF ou None.
+        Obsoleto: use `DynamicContentParser.get_pdf_link`, que usa o
+        Playwright no lugar do Selenium.
+        """
+        _deprecated("fetch_with_selenium", "DynamicContentParser.get_pdf_link")
+        return PDFDownloader._run_parser(
+            "DynamicContentParser",
+            url,
+            shared_pool=proxy is None,
+            proxy={"server": proxy} if proxy else None,
+            timeout=timeout,
+        )
+
+    @staticmethod
+    def extract_pdf_url_from_soup(soup: "BeautifulSoup", base_url: str) -> str | None:
+        """
+        Extrai a URL do PDF a partir do HTML.
+
+        Obsoleto: use `GenericParser.extract_pdf_url_from_soup`.
+        """
+        _deprecated(
+            "extract_pdf_url_from_soup", "GenericParser.extract_pdf_url_from_soup"
+        )
+        return GenericParser.extract_pdf_url_from_soup(soup, base_url)
+
+    @staticmethod
+    def find_meta_pdf_url(soup: "BeautifulSoup", base_url: str) -> str | None:
         """
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        if proxy:
-            options.add_argument(f"--proxy-server={proxy}")
+        Busca o link PDF na tag meta, se existir.
 
-        with webdriver.Chrome(options=options) as driver:
-            driver.get(url)
-            time.sleep(timeout)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            return PDFDownloader.extract_pdf_url_from_soup(
-                soup, base_url=driver.current_url
-            )
+        Obsoleto: use `GenericParser.find_meta_pdf_url`.
+        """
+        _deprecated("find_meta_pdf_url", "GenericParser.find_meta_pdf_url")
+        return GenericParser.find_meta_pdf_url(soup, base_url)
 
     @staticmethod
-    def get_maxwell_pdf_links(url: str, **kwargs) -> list[str] | None:
+    def find_pdf_url_by_pattern(
+        soup: "BeautifulSoup",
+        base_url: str,
+        tag: str,
+        attr: str,
+        pattern: str = None,
+        mime_type: str = None,
+    ) -> str | None:
         """
-        Extrai links de arquivos PDF da biblioteca Maxwell a partir de um objeto BeautifulSoup.
+        Busca uma URL de PDF usando padrões específicos.
 
-        Args:
-            url (str): URL da página Maxwell.
+        Obsoleto: use `GenericParser.find_pdf_url_by_pattern`.
+        """
+        _deprecated("find_pdf_url_by_pattern", "GenericParser.find_pdf_url_by_pattern")
+        return GenericParser.find_pdf_url_by_pattern(
+            soup, base_url, tag, attr, pattern, mime_type
+        )
 
-        Returns:
-            list[str] | None: Lista de URLs dos arquivos PDF encontrados ou
-            None se não houver links.
-        """
-        response = PDFDownloader.get(url, **kwargs)
-        soup = BeautifulSoup(response.content, "html.parser")
-        select = soup.find("select", {"id": "file"})
-        if select:
-            options = select.find_all("option", value=lambda v: v)
-            links = [
-                a["href"]
-                for a in soup.find_all("a", href=lambda a: a and "pdf" in a.lower())
-            ]
-            return links if len(options) == len(links) else None
+    @staticmethod
+    def _run_parser(name: str, url: str, shared_pool: bool = True, **kwargs):
+        """
+        Executa `get_pdf_link` de um parser do pacote pelo nome.
+
+        Se `shared_pool` for False, os parsers de conteúdo dinâmico abrem o
+        próprio navegador (ex.: para usar o `proxy` informado em `kwargs`).
+        """
+        # pylint: disable=import-outside-toplevel
+        from . import parsers
+
+        async def run():
+            session, browser_pool = await _background.resources()
+            parser_class = getattr(parsers, name)
+            if parser_class.uses_browser:
+                parser = parser_class(session, browser_pool if shared_pool else None)
+            else:
+                parser = parser_class(session)
+            return await parser.get_pdf_link(url, **kwargs)
+
+        return _background.run(run())
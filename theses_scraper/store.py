@@ -0,0 +1,235 @@
+"""
+Módulo com o armazenamento endereçado por conteúdo dos documentos baixados.
+
+Cada documento é gravado uma única vez, com o nome igual ao hash SHA-256 do
+seu conteúdo, em subdiretórios formados pelos primeiros caracteres do hash
+(`objects/ab/cd/abcd….pdf`). Um índice SQLite associa as URLs de origem ao
+hash e aos metadados do documento, de modo que cópias do mesmo trabalho em
+repositórios diferentes (ex.: BDTD e o repositório institucional) ocupam
+espaço uma só vez e arquivos com o mesmo nome não se sobrescrevem.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    path TEXT NOT NULL,
+    prefix TEXT,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_prefix ON objects (prefix, size);
+CREATE TABLE IF NOT EXISTS sources (
+    url TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES objects (hash),
+    final_url TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sources_hash ON sources (hash);
+"""
+
+# Bytes iniciais usados para identificar duplicatas antes do fim da transferência
+PREFIX_SIZE = 64 * 1024
+
+
+@dataclass
+class StoredObject:
+    """Documento armazenado."""
+
+    hash: str
+    size: int
+    content_type: str | None
+    path: Path
+
+
+def prefix_digest(prefix: bytes) -> str:
+    """Retorna o hash dos bytes iniciais de um documento."""
+    return hashlib.blake2b(prefix[:PREFIX_SIZE], digest_size=16).hexdigest()
+
+
+class ContentStore:
+    """
+    Armazena documentos pelo hash do seu conteúdo.
+
+    Documentos com o mesmo conteúdo são gravados uma só vez. Quando os
+    primeiros `PREFIX_SIZE` bytes e o tamanho total (`Content-Length`) de um
+    download coincidem com os de um documento já armazenado, o restante da
+    transferência pode ser descartado (ver `find_by_prefix`).
+
+    Exemplo:
+        >>> with ContentStore("./documentos") as store:
+        ...     downloader = DocumentDownloader("./documentos", store=store)
+        ...     path = await downloader.download(url)
+        >>> store.get(url).hash
+        '9f86d081884c7d65…'
+    """
+
+    def __init__(self, root: str, early_dedup: bool = True):
+        """
+        Args:
+            root (str): Diretório do armazenamento. O índice é gravado em
+                `root/index.db` e os documentos em `root/objects`.
+            early_dedup (bool): Se True, downloads cujo início e tamanho
+                coincidem com um documento armazenado são interrompidos.
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.tmp_dir = self.root / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.early_dedup = early_dedup
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.root / "index.db", check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ContentStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Fecha a conexão com o índice."""
+        with self._lock:
+            self._connection.close()
+
+    def object_path(self, digest: str, extension: str) -> Path:
+        """Retorna o caminho de um documento pelo hash e extensão."""
+        return self.objects_dir / digest[:2] / digest[2:4] / f"{digest}.{extension}"
+
+    def get(self, url: str) -> StoredObject | None:
+        """Retorna o documento armazenado para uma URL de origem."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT o.hash, o.size, o.content_type, o.path "
+                "FROM sources s JOIN objects o ON o.hash = s.hash WHERE s.url = ?",
+                (url,),
+            ).fetchone()
+        return self._existing(row)
+
+    def find_by_prefix(self, prefix: bytes, size: int) -> StoredObject | None:
+        """
+        Busca um documento com os mesmos bytes iniciais e tamanho total.
+
+        Args:
+            prefix (bytes): Primeiros `PREFIX_SIZE` bytes do download (ou o
+                documento inteiro, se menor).
+            size (int): Tamanho total do download.
+        """
+        if not self.early_dedup:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT hash, size, content_type, path FROM objects "
+                "WHERE prefix = ? AND size = ? LIMIT 1",
+                (prefix_digest(prefix), size),
+            ).fetchone()
+        return self._existing(row)
+
+    def add(
+        self,
+        url: str,
+        file_path: Path,
+        digest: str,
+        extension: str,
+        content_type: str | None = None,
+        prefix: bytes = b"",
+        response=None,
+    ) -> StoredObject:
+        """
+        Move um arquivo baixado para o armazenamento e o associa à URL.
+
+        Se já houver um documento com o mesmo hash, o arquivo é descartado.
+
+        Args:
+            url (str): URL de origem.
+            file_path (Path): Arquivo baixado, no mesmo sistema de arquivos
+                que `root` (ex.: em `tmp_dir`).
+            digest (str): Hash SHA-256 do conteúdo.
+            extension (str): Extensão do documento.
+            content_type (str | None): Tipo do documento.
+            prefix (bytes): Primeiros `PREFIX_SIZE` bytes do conteúdo.
+            response (httpx.Response | None): Resposta do download, cujos
+                validadores e URL final são guardados no índice.
+
+        Returns:
+            StoredObject: Documento armazenado.
+        """
+        path = self.object_path(digest, extension)
+        size = file_path.stat().st_size
+        if path.exists():
+            file_path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(file_path, path)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO objects "
+                "(hash, size, content_type, path, prefix, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    digest,
+                    size,
+                    content_type,
+                    str(path),
+                    prefix_digest(prefix),
+                    time.time(),
+                ),
+            )
+            self._link(url, digest, response)
+        return StoredObject(digest, size, content_type, path)
+
+    def link(self, url: str, stored: StoredObject, response=None):
+        """Associa uma URL de origem a um documento já armazenado."""
+        with self._lock:
+            self._link(url, stored.hash, response)
+
+    def _link(self, url: str, digest: str, response=None):
+        headers = response.headers if response is not None else {}
+        self._connection.execute(
+            "INSERT OR REPLACE INTO sources "
+            "(url, hash, final_url, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                digest,
+                str(response.url) if response is not None else None,
+                headers.get("ETag"),
+                headers.get("Last-Modified"),
+                time.time(),
+            ),
+        )
+        self._connection.commit()
+
+    def urls(self, digest: str) -> list[str]:
+        """Retorna as URLs de origem de um documento."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT url FROM sources WHERE hash = ? ORDER BY url", (digest,)
+            ).fetchall()
+        return [url for (url,) in rows]
+
+    @staticmethod
+    def _existing(row) -> StoredObject | None:
+        """Converte uma linha do índice, ignorando arquivos removidos do disco."""
+        if row is None:
+            return None
+        digest, size, content_type, path = row
+        path = Path(path)
+        if not path.exists():
+            return None
+        return StoredObject(digest, size, content_type, path)
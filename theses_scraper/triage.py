@@ -0,0 +1,327 @@
+"""
+Módulo com a triagem em lote das URLs de entrada.
+
+As URLs são lidas em fluxo de arquivos CSV, JSONL ou texto, padronizadas,
+filtradas (inválidas e bloqueadas), deduplicadas e agrupadas por parser e
+host, para que a coleta possa ser planejada e dividida entre workers.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .journal import CrawlJournal
+from .parsers import ParserFactory
+from .url_fixer import is_denied, is_valid_url, update_url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (digest BLOB PRIMARY KEY) WITHOUT ROWID;
+"""
+
+# Esquema e autoridade (usuário, host e porta) de uma URL
+_PREFIX = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*://)([^/?#]*)")
+
+# Caracteres permitidos nos nomes dos arquivos de cada host
+_UNSAFE = re.compile(r"[^\w.-]")
+
+
+class SeenSet:
+    """
+    Conjunto de URLs já vistas, armazenado em disco.
+
+    Guarda apenas um hash de 16 bytes de cada URL em um banco SQLite, de modo
+    que milhões de URLs podem ser deduplicadas sem ocupar memória.
+
+    Exemplo:
+        >>> with SeenSet("vistas.db") as seen:
+        ...     seen.add("https://repositorio.ufsc.br/handle/1/2")
+        True
+    """
+
+    def __init__(self, path: str | None = None, commit_every: int = 10_000):
+        """
+        Args:
+            path (str | None): Caminho do arquivo SQLite. Se None, um arquivo
+                temporário é criado e removido ao fechar o conjunto.
+            commit_every (int): Número de inserções entre cada commit.
+        """
+        self._temporary = path is None
+        if path is None:
+            descriptor, path = tempfile.mkstemp(suffix=".db")
+            os.close(descriptor)
+        self.path = Path(path)
+        self.commit_every = commit_every
+        self._pending = 0
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SeenSet":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, url: str) -> bool:
+        """
+        Adiciona uma URL ao conjunto.
+
+        Returns:
+            bool: True se a URL ainda não estava no conjunto.
+        """
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        cursor = self._connection.execute(
+            "INSERT OR IGNORE INTO seen (digest) VALUES (?)", (digest,)
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._connection.commit()
+            self._pending = 0
+        return cursor.rowcount == 1
+
+    def close(self):
+        """Fecha o banco, removendo-o se for temporário."""
+        self._connection.commit()
+        self._connection.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{self.path}{suffix}").unlink(missing_ok=True)
+
+
+@dataclass
+class TriagedUrl:
+    """Resultado da triagem de uma URL."""
+
+    url: str
+    status: str
+    normalized_url: str | None = None
+    parser: str | None = None
+    host: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Indica se a URL deve ser coletada."""
+        return self.status == "ok"
+
+
+@dataclass
+class TriageReport:
+    """Contagens de uma triagem."""
+
+    total: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    shards: Counter = field(default_factory=Counter)
+
+    def add(self, item: TriagedUrl):
+        """Contabiliza o resultado de uma URL."""
+        self.total += 1
+        self.statuses[item.status] += 1
+        if item.ok:
+            self.shards[item.parser, item.host] += 1
+
+
+def read_urls(path: str, column: str = "url", fmt: str | None = None) -> Iterator[str]:
+    """
+    Lê as URLs de um arquivo, uma a uma.
+
+    Args:
+        path (str): Caminho do arquivo.
+        column (str): Coluna (CSV) ou campo (JSONL) com a URL.
+        fmt (str | None): "csv", "jsonl" ou "txt". Se None, o formato é
+            deduzido pela extensão do arquivo.
+
+    Yields:
+        str: URLs na ordem do arquivo.
+    """
+    fmt = fmt or {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(
+        Path(path).suffix.lower(), "txt"
+    )
+    with open(path, encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            reader = csv.DictReader(file)
+            if column not in (reader.fieldnames or []):
+                raise ValueError(f"Coluna '{column}' não encontrada em {path}")
+            for row in reader:
+                if row[column]:
+                    yield row[column]
+        elif fmt == "jsonl":
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                url = record.get(column) if isinstance(record, dict) else record
+                if isinstance(url, str):
+                    yield url
+        else:
+            for line in file:
+                if line.strip():
+                    yield line
+
+
+def canonicalize(url: str) -> str:
+    """
+    Padroniza a forma de uma URL de entrada.
+
+    Remove espaços nas extremidades e converte o esquema e o host para
+    minúsculas. As regras de `update_url` não são aplicadas, pois
+    `resolve_url` as aplica ao processar a URL.
+
+    Examples:
+        >>> canonicalize(" HTTPS://Repositorio.UFSC.br/handle/1/2\\n")
+        'https://repositorio.ufsc.br/handle/1/2'
+    """
+    url = url.strip()
+    match = _PREFIX.match(url)
+    if match is None:
+        return url
+    userinfo, at, host = match.group(2).rpartition("@")
+    return f"{match.group(1).lower()}{userinfo}{at}{host.lower()}{url[match.end():]}"
+
+
+def triage(urls: Iterable[str], seen: SeenSet | None = None) -> Iterator[TriagedUrl]:
+    """
+    Classifica as URLs de entrada.
+
+    As URLs são padronizadas com `canonicalize`, corrigidas com `update_url`
+    e classificadas como "invalid", "denied", "duplicate" ou "ok". As
+    duplicatas são identificadas pela URL corrigida.
+
+    Args:
+        urls (Iterable[str]): URLs de entrada.
+        seen (SeenSet | None): Conjunto das URLs já vistas. Se None, um
+            conjunto temporário é usado durante a triagem.
+
+    Yields:
+        TriagedUrl: Resultado de cada URL, na ordem da entrada.
+    """
+    # Importado no primeiro uso, para que importar o módulo não carregue o asyncio
+    from .utils.scheduler import (  # pylint: disable=import-outside-toplevel
+        HostScheduler,
+    )
+
+    own_seen = seen is None
+    seen = seen or SeenSet()
+    try:
+        for url in urls:
+            url = canonicalize(url)
+            if not is_valid_url(url):
+                yield TriagedUrl(url, "invalid")
+                continue
+            normalized_url = update_url(url)
+            if is_denied(normalized_url):
+                yield TriagedUrl(url, "denied", normalized_url)
+                continue
+            if not seen.add(normalized_url):
+                yield TriagedUrl(url, "duplicate", normalized_url)
+                continue
+            yield TriagedUrl(
+                url,
+                "ok",
+                normalized_url,
+                ParserFactory.get_parser_class(normalized_url).__name__,
+                HostScheduler.host_of(normalized_url),
+            )
+    finally:
+        if own_seen:
+            seen.close()
+
+
+class _ShardWriter:
+    """
+    Grava as URLs em um arquivo por parser e host.
+
+    As linhas são acumuladas em memória e acrescentadas aos arquivos em
+    lotes, para não manter um arquivo aberto por host.
+    """
+
+    def __init__(self, out_dir: Path, max_buffered: int):
+        self.out_dir = out_dir
+        self.max_buffered = max_buffered
+        self._buffers: dict[tuple[str, str], list[str]] = {}
+        self._buffered = 0
+
+    def path(self, parser: str, host: str) -> Path:
+        """Caminho do arquivo de um parser e host."""
+        return self.out_dir / parser / f"{_UNSAFE.sub('_', host) or '_'}.txt"
+
+    def write(self, parser: str, host: str, url: str):
+        """Acrescenta a URL ao arquivo do parser e host."""
+        self._buffers.setdefault((parser, host), []).append(url)
+        self._buffered += 1
+        if self._buffered >= self.max_buffered:
+            self.flush()
+
+    def flush(self):
+        """Grava as linhas acumuladas."""
+        for (parser, host), lines in self._buffers.items():
+            path = self.path(parser, host)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+        self._buffers.clear()
+        self._buffered = 0
+
+
+def triage_to_shards(
+    urls: Iterable[str],
+    out_dir: str,
+    seen: SeenSet | None = None,
+    max_buffered: int = 100_000,
+    journal: CrawlJournal | None = None,
+) -> TriageReport:
+    """
+    Faz a triagem das URLs e grava as válidas em arquivos por parser e host.
+
+    As URLs são gravadas em `out_dir/<Parser>/<host>.txt`, acrescentadas aos
+    arquivos existentes, e as contagens em `out_dir/counts.csv`.
+
+    Args:
+        urls (Iterable[str]): URLs de entrada.
+        out_dir (str): Diretório de saída.
+        seen (SeenSet | None): Conjunto das URLs já vistas, para deduplicar
+            também entre execuções.
+        max_buffered (int): Número de URLs mantidas em memória antes de
+            serem gravadas nos arquivos.
+        journal (CrawlJournal | None): Diário da coleta, onde o resultado da
+            triagem de cada URL é registrado.
+
+    Returns:
+        TriageReport: Contagens da triagem.
+
+    Exemplo:
+        >>> report = triage_to_shards(read_urls("bdtd.csv"), "./shards")
+        >>> report.statuses["duplicate"]
+        1532
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    report = TriageReport()
+    writer = _ShardWriter(out, max_buffered)
+    try:
+        for item in triage(urls, seen):
+            report.add(item)
+            # URLs já registradas mantêm o estado das etapas seguintes
+            if journal is not None and journal.get(item.url) is None:
+                journal.record(item.url, "triage", item.status)
+            if item.ok:
+                writer.write(item.parser, item.host, item.url)
+    finally:
+        writer.flush()
+        if journal is not None:
+            journal.flush()
+    with open(out / "counts.csv", "w", encoding="utf-8", newline="") as file:
+        rows = csv.writer(file)
+        rows.writerow(["parser", "host", "count", "path"])
+        for (parser, host), count in report.shards.most_common():
+            path = writer.path(parser, host).relative_to(out)
+            rows.writerow([parser, host, count, path.as_posix()])
+    return report
@@ -1,7 +1,9 @@
 """Módulo com funções para corrigir e verificar URLs"""
 
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from urllib.parse import urlparse
-from functools import reduce
 
 _DENY_LIST = {
     "",
@@ -144,6 +146,81 @@ _REPLACEMENTS = {
 }
 
 
+# Sequências de caracteres de palavra usadas para indexar as regras
+_TOKEN = re.compile(r"\w+")
+
+
+class _Rewriter:
+    """
+    Aplica as regras de `_REPLACEMENTS` em ordem, como substituições
+    encadeadas, consultando apenas as regras que podem casar com a URL.
+
+    Cada regra é indexada por um token interno do seu alvo (delimitado por
+    caracteres que não são de palavra dentro do próprio alvo). Se o alvo
+    ocorre na URL, esse token também ocorre nela como um token completo, de
+    modo que as demais regras podem ser ignoradas sem alterar o resultado.
+    """
+
+    def __init__(self, rules: dict[str, str]):
+        self._rules = list(rules.items())
+        self._index: dict[str, list[int]] = defaultdict(list)
+        self._unindexed: list[int] = []
+        interior = [self._interior_tokens(target) for target, _ in self._rules]
+        frequency = defaultdict(int)
+        for tokens in interior:
+            for token in set(tokens):
+                frequency[token] += 1
+        for position, tokens in enumerate(interior):
+            if not tokens:
+                self._unindexed.append(position)
+                continue
+            # O token mais raro entre as regras gera menos candidatos
+            anchor = min(tokens, key=lambda token: (frequency[token], -len(token)))
+            self._index[anchor].append(position)
+        self._index = dict(self._index)
+        self._anchors = frozenset(self._index)
+
+    @staticmethod
+    def _interior_tokens(target: str) -> list[str]:
+        """Tokens do alvo que não estão no seu início nem no seu fim."""
+        return [
+            match.group()
+            for match in _TOKEN.finditer(target)
+            if match.start() > 0 and match.end() < len(target)
+        ]
+
+    def _candidates(self, url: str, start: int) -> list[int]:
+        """Regras a partir de `start` cujo token aparece na URL, em ordem."""
+        anchors = self._anchors.intersection(_TOKEN.findall(url))
+        if not anchors and not self._unindexed:
+            return []
+        candidates = {
+            position
+            for anchor in anchors
+            for position in self._index[anchor]
+            if position >= start
+        }
+        candidates.update(p for p in self._unindexed if p >= start)
+        return sorted(candidates)
+
+    def rewrite(self, url: str) -> str:
+        """Aplica as regras à URL."""
+        start = 0
+        while True:
+            for position in self._candidates(url, start):
+                target, replacement = self._rules[position]
+                if target in url:
+                    url = url.replace(target, replacement)
+                    # A URL mudou: as regras seguintes são consultadas novamente
+                    start = position + 1
+                    break
+            else:
+                return url
+
+
+_REWRITER = _Rewriter(_REPLACEMENTS)
+
+
 def update_url(url: str) -> str:
     """
     Atualiza uma URL para a versão correta, considerando um conjunto de regras pré-definidas.
@@ -158,16 +235,33 @@ def update_url(url: str) -> str:
         >>> update_url("http://tede2.usc.br:8080")
         'https://tede2.usc.br:8443'
     """
-    return reduce(
-        lambda updated_url, target: updated_url.replace(target, _REPLACEMENTS[target]),
-        _REPLACEMENTS,
-        url,
-    )
+    return _REWRITER.rewrite(url)
+
+
+def update_urls(urls: Iterable[str]) -> Iterator[str]:
+    """
+    Atualiza várias URLs, na ordem da entrada.
+
+    Args:
+        urls (Iterable[str]): URLs a serem corrigidas.
+
+    Yields:
+        str: As URLs corrigidas conforme as regras.
+
+    Examples:
+        >>> list(update_urls(["http://tede2.usc.br:8080", "https://x.br"]))
+        ['https://tede2.usc.br:8443', 'https://x.br']
+    """
+    rewrite = _REWRITER.rewrite
+    for url in urls:
+        yield rewrite(url)
 
 
 def is_denied(url: str) -> bool:
     """Verifica se a url está na lista de urls não permitidas"""
-    base_url = url.split("/")[2]
+    parts = url.split("/")
+    # URLs sem host (ex.: "http:teste") são tratadas como host vazio
+    base_url = parts[2] if len(parts) > 2 else ""
     return base_url in _DENY_LIST
 
 
@@ -0,0 +1,388 @@
+"""
+Módulo com a gravação e a reprodução de respostas HTTP (fixtures).
+
+No modo de gravação, o `RecordingTransport` é usado pela `HttpSession` e
+grava cada par requisição/resposta em um arquivo WARC 1.1 comprimido
+(`.warc.gz`, um membro gzip por registro), o mesmo formato usado por
+ferramentas de arquivamento da web. No modo de reprodução, o
+`ReplayTransport` responde às requisições a partir do arquivo, sem acesso à
+rede. Assim, os parsers podem ser testados e medidos contra páginas reais,
+na velocidade da CPU e sempre com o mesmo conteúdo.
+
+Além das respostas, o arquivo pode guardar registros de metadados (ex.: o
+link de PDF encontrado para cada URL na gravação), usados como resultado
+esperado nos testes de regressão.
+
+Exemplo:
+    >>> with FixtureWriter("fixtures.warc.gz") as writer:
+    ...     async with HttpSession(transport=RecordingTransport(writer)) as session:
+    ...         await parser_for(url, session).get_pdf_link(url)
+    >>> archive = FixtureArchive("fixtures.warc.gz")
+    >>> session = HttpSession(transport=ReplayTransport(archive))
+"""
+
+import gzip
+import json
+import threading
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+
+import httpx
+
+# Tamanho máximo, em bytes, do corpo gravado de cada resposta
+MAX_BODY = 1024 * 1024
+
+
+class NotRecordedError(httpx.TransportError):
+    """A requisição não foi gravada no arquivo de fixtures."""
+
+    reason = "not_recorded"
+
+
+def _record(headers: dict[str, str], block: bytes) -> bytes:
+    """Monta um registro WARC."""
+    lines = ["WARC/1.1"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    lines.append(f"Content-Length: {len(block)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + block + b"\r\n\r\n"
+
+
+def _http_head(start_line: str, headers: list[tuple[bytes, bytes]]) -> bytes:
+    """Monta a linha inicial e os cabeçalhos de uma mensagem HTTP."""
+    lines = [start_line.encode()]
+    lines += [name + b": " + value for name, value in headers]
+    return b"\r\n".join(lines) + b"\r\n\r\n"
+
+
+class FixtureWriter:
+    """
+    Grava registros WARC comprimidos em um arquivo.
+
+    Os registros são acrescentados ao arquivo, de modo que gravações
+    sucessivas podem ser reunidas em um mesmo arquivo.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Caminho do arquivo `.warc.gz`.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "ab")  # pylint: disable=consider-using-with
+
+    def __enter__(self) -> "FixtureWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Fecha o arquivo."""
+        with self._lock:
+            self._file.close()
+
+    def _write(self, record: bytes):
+        compressed = gzip.compress(record)
+        with self._lock:
+            self._file.write(compressed)
+            self._file.flush()
+
+    @staticmethod
+    def _headers(kind: str, url: str, content_type: str) -> dict[str, str]:
+        return {
+            "WARC-Type": kind,
+            "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+            "WARC-Date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "WARC-Target-URI": url,
+            "Content-Type": content_type,
+        }
+
+    def write_exchange(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        body: bytes,
+        truncated: bool = False,
+    ):
+        """
+        Grava uma requisição e a sua resposta.
+
+        Args:
+            request (httpx.Request): Requisição enviada.
+            response (httpx.Response): Resposta recebida.
+            body (bytes): Corpo da resposta como recebido da rede (ainda
+                comprimido, se houver `Content-Encoding`).
+            truncated (bool): Indica que o corpo não foi gravado por inteiro.
+        """
+        url = str(request.url)
+        target = request.url.raw_path.decode("ascii")
+        request_headers = self._headers(
+            "request", url, "application/http; msgtype=request"
+        )
+        self._write(
+            _record(
+                request_headers,
+                _http_head(f"{request.method} {target} HTTP/1.1", request.headers.raw),
+            )
+        )
+        response_headers = self._headers(
+            "response", url, "application/http; msgtype=response"
+        )
+        response_headers["WARC-Concurrent-To"] = request_headers["WARC-Record-ID"]
+        if truncated:
+            response_headers["WARC-Truncated"] = "length"
+        reason = response.reason_phrase or HTTPStatus(response.status_code).phrase
+        self._write(
+            _record(
+                response_headers,
+                _http_head(
+                    f"HTTP/1.1 {response.status_code} {reason}", response.headers.raw
+                )
+                + body,
+            )
+        )
+
+    def write_metadata(self, url: str, data: dict):
+        """
+        Grava metadados sobre uma URL (ex.: o resultado esperado do parser).
+
+        Args:
+            url (str): URL de entrada.
+            data (dict): Dados serializáveis em JSON.
+        """
+        block = json.dumps(data, ensure_ascii=False).encode()
+        self._write(_record(self._headers("metadata", url, "application/json"), block))
+
+
+def read_records(path: str) -> Iterator[tuple[dict[str, str], bytes]]:
+    """
+    Percorre os registros de um arquivo WARC, comprimido ou não.
+
+    Yields:
+        tuple[dict[str, str], bytes]: Cabeçalhos WARC (em minúsculas) e
+        conteúdo de cada registro.
+    """
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as file:
+        while line := file.readline():
+            if not line.strip():
+                continue
+            if not line.startswith(b"WARC/"):
+                raise ValueError(f"Registro WARC inválido em {path}: {line[:40]!r}")
+            headers = {}
+            while (line := file.readline()).strip():
+                name, _, value = line.decode("utf-8").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            yield headers, file.read(int(headers["content-length"]))
+
+
+def _parse_http(block: bytes) -> tuple[str, list[tuple[bytes, bytes]], bytes]:
+    """Separa a linha inicial, os cabeçalhos e o corpo de uma mensagem HTTP."""
+    head, _, body = block.partition(b"\r\n\r\n")
+    start_line, *lines = head.split(b"\r\n")
+    headers = []
+    for line in lines:
+        name, _, value = line.partition(b":")
+        headers.append((name.strip(), value.strip()))
+    return start_line.decode("latin-1"), headers, body
+
+
+class FixtureArchive:
+    """
+    Respostas e metadados de um arquivo de fixtures, carregados em memória.
+
+    As respostas são indexadas pelo método e pela URL da requisição; se uma
+    URL foi gravada mais de uma vez (ex.: após uma retentativa), vale a
+    última resposta.
+    """
+
+    def __init__(self, *paths: str):
+        """
+        Args:
+            *paths (str): Arquivos `.warc.gz` a carregar.
+        """
+        self._responses: dict[tuple[str, str], tuple[int, list, bytes, bool]] = {}
+        self._metadata: dict[str, dict] = {}
+        for path in paths:
+            self.load(path)
+
+    def load(self, path: str):
+        """Acrescenta as respostas e os metadados de um arquivo."""
+        methods: dict[str, str] = {}
+        for headers, block in read_records(path):
+            kind = headers.get("warc-type")
+            url = headers.get("warc-target-uri", "")
+            if kind == "request":
+                methods[headers["warc-record-id"]] = block.split(b" ", 1)[0].decode()
+            elif kind == "response":
+                method = methods.pop(headers.get("warc-concurrent-to"), "GET")
+                start_line, response_headers, body = _parse_http(block)
+                status = int(start_line.split(" ", 2)[1])
+                truncated = "warc-truncated" in headers
+                self._responses[method, url] = (
+                    status,
+                    response_headers,
+                    body,
+                    truncated,
+                )
+            elif kind == "metadata":
+                self._metadata.setdefault(url, json.loads(block))
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def metadata(self) -> dict[str, dict]:
+        """Retorna os metadados gravados, por URL de entrada."""
+        return dict(self._metadata)
+
+    def response(self, method: str, url: str) -> httpx.Response | None:
+        """
+        Retorna a resposta gravada para a requisição, se houver.
+
+        Uma requisição HEAD sem resposta própria é atendida com os cabeçalhos
+        da resposta ao GET da mesma URL.
+        """
+        entry = self._responses.get((method, url))
+        if entry is None and method == "HEAD":
+            entry = self._responses.get(("GET", url))
+            if entry is not None:
+                entry = (entry[0], entry[1], b"", False)
+        if entry is None:
+            return None
+        status, headers, body, truncated = entry
+        if truncated:
+            # O corpo gravado é apenas o início do original
+            headers = [
+                (name, value)
+                for name, value in headers
+                if name.lower() not in (b"content-length", b"content-encoding")
+            ]
+            headers.append((b"Content-Length", str(len(body)).encode()))
+        return httpx.Response(status, headers=headers, stream=httpx.ByteStream(body))
+
+
+def _is_text(content_type: str) -> bool:
+    """Indica se o conteúdo é uma página ou outro documento textual."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith(("xml", "json"))
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """
+    Repassa o corpo da resposta ao cliente, guardando uma cópia.
+
+    Páginas são guardadas por inteiro, mesmo que o cliente pare de ler antes
+    do fim, para que a reprodução não dependa de quanto o parser atual lê. Os
+    demais conteúdos são guardados até `max_body` bytes.
+    """
+
+    def __init__(self, stream, on_close, max_body: int | None):
+        self._stream = stream
+        self._iterator = None
+        self._on_close = on_close
+        self._max_body = max_body
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._complete = False
+
+    def _keep(self, chunk: bytes):
+        if self._max_body is None:
+            self._chunks.append(chunk)
+        elif self._size < self._max_body:
+            self._chunks.append(chunk[: self._max_body - self._size])
+        self._size += len(chunk)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self._iterator = self._stream.__aiter__()
+        async for chunk in self._iterator:
+            self._keep(chunk)
+            yield chunk
+        self._complete = True
+
+    async def aclose(self):
+        if self._on_close is not None and not self._complete:
+            if self._max_body is None:
+                # Lê o restante da página que o cliente não consumiu
+                try:
+                    async for chunk in self._iterator or self._stream:
+                        self._keep(chunk)
+                    self._complete = True
+                except httpx.HTTPError:
+                    pass
+        await self._stream.aclose()
+        if self._on_close is None:
+            return
+        on_close, self._on_close = self._on_close, None
+        body = b"".join(self._chunks)
+        on_close(body, not self._complete or self._size > len(body))
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte que grava as requisições e respostas enviadas pela rede.
+
+    O corpo é gravado enquanto é lido pelo cliente, sem atrasar o download.
+    O corpo de documentos (ex.: PDFs) é limitado a `max_body` bytes: o início
+    basta para os parsers, que só verificam o tipo do documento.
+    """
+
+    def __init__(
+        self,
+        writer: FixtureWriter,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_body: int = MAX_BODY,
+    ):
+        """
+        Args:
+            writer (FixtureWriter): Arquivo onde as respostas são gravadas.
+            transport (httpx.AsyncBaseTransport | None): Transporte que acessa
+                a rede. Se None, é criado um `httpx.AsyncHTTPTransport`.
+            max_body (int): Tamanho máximo, em bytes, do corpo gravado de
+                respostas que não são páginas.
+        """
+        self.writer = writer
+        self.max_body = max_body
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+
+        def on_close(body: bytes, truncated: bool):
+            self.writer.write_exchange(request, response, body, truncated)
+
+        text = _is_text(response.headers.get("Content-Type", ""))
+        response.stream = _RecordingStream(
+            response.stream, on_close, None if text else self.max_body
+        )
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte que responde às requisições com as respostas gravadas.
+
+    Requisições que não foram gravadas falham com `NotRecordedError`.
+    """
+
+    def __init__(self, archive: FixtureArchive):
+        """
+        Args:
+            archive (FixtureArchive): Respostas gravadas.
+        """
+        self.archive = archive
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = self.archive.response(request.method, str(request.url))
+        if response is None:
+            raise NotRecordedError(
+                f"Requisição não gravada: {request.method} {request.url}",
+                request=request,
+            )
+        return response
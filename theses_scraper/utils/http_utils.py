@@ -2,60 +2,303 @@
 Módulo com funções utilitárias para requisições HTTP.
 """
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
 import httpx
+from .metrics import metrics
+from .session import HttpSession
+from .user_agent import user_agents
+
+# Assinatura do início de um arquivo PDF
+PDF_MAGIC = b"%PDF-"
+
+# Bytes lidos do início do corpo para identificar um PDF
+SNIFF_SIZE = 1024
+
+
+class NotModified(Exception):
+    """O recurso não mudou desde a última requisição (HTTP 304)."""
+
+    def __init__(self, url: str):
+        super().__init__(f"Recurso não modificado: {url}")
+        self.url = url
+
+
+def user_agent_for(url: str, session: HttpSession | None = None) -> str | None:
+    """
+    Sorteia o User-Agent de uma requisição, evitando os usados recentemente
+    no host da URL.
+
+    Returns:
+        str | None: O User-Agent, ou None se a sessão define um fixo.
+    """
+    manager = session.user_agents if session is not None else user_agents
+    if manager is None:
+        return None
+    return str(manager.get_user_agent(urlparse(url).netloc))
+
+
+def _user_agent(url: str, session: HttpSession | None, kwargs: dict) -> dict:
+    """Adiciona aos args um User-Agent, se a requisição não define um."""
+    headers = kwargs.get("headers") or {}
+    if any(key.lower() == "user-agent" for key in headers):
+        return kwargs
+    if (user_agent := user_agent_for(url, session)) is not None:
+        kwargs["headers"] = {**headers, "User-Agent": user_agent}
+    return kwargs
+
+
+def _conditional(
+    url: str, session: HttpSession, conditional: bool, kwargs: dict
+) -> dict:
+    """Adiciona aos args os cabeçalhos condicionais armazenados na sessão."""
+    store = session.validators
+    if conditional and store is not None and (validators := store.get(url)):
+        kwargs["headers"] = {
+            **(kwargs.get("headers") or {}),
+            **validators.conditional_headers(),
+        }
+    return kwargs
+
 
+def _check(url: str, session: HttpSession, response: httpx.Response):
+    """Valida a resposta e armazena os seus validadores na sessão."""
+    store = session.validators
+    if response.status_code == 304 and store is not None:
+        store.touch(url)
+        raise NotModified(url)
+    response.raise_for_status()
+    if store is not None:
+        store.record(url, response)
 
-async def get(url: str, **kwargs) -> httpx.Response:
+
+async def get(
+    url: str, session: HttpSession | None = None, conditional: bool = False, **kwargs
+) -> httpx.Response:
     """
     Executa uma requisição HTTP GET e retorna a resposta.
 
     Args:
         url (str): URL do recurso.
+        session (HttpSession | None): Sessão com o pool de conexões. Se None,
+            um cliente temporário é criado para a requisição.
+        conditional (bool): Envia `If-None-Match`/`If-Modified-Since` com os
+            validadores armazenados na sessão.
         **kwargs: Args adicionais para `httpx.Client`.
 
     Returns:
         httpx.Response: Resposta da requisição.
+
+    Raises:
+        NotModified: Se a requisição condicional retornar 304.
     """
+    kwargs = _user_agent(url, session, kwargs)
+    if session is not None:
+        kwargs = _conditional(url, session, conditional, kwargs)
+        response = await session.request("GET", url, **kwargs)
+        _check(url, session, response)
+        return response
     async with httpx.AsyncClient(**kwargs) as client:
         response = await client.get(url)
         response.raise_for_status()
         return response
 
 
+@asynccontextmanager
+async def get_stream(
+    url: str, session: HttpSession | None = None, conditional: bool = False, **kwargs
+):
+    """
+    Executa uma requisição HTTP GET sem carregar o corpo da resposta.
+
+    Igual a `get`, mas o corpo pode ser lido em partes e a conexão é
+    encerrada ao final do bloco, mesmo que o corpo não tenha sido lido.
+
+    Yields:
+        httpx.Response: Resposta com o corpo ainda não lido.
+
+    Raises:
+        NotModified: Se a requisição condicional retornar 304.
+    """
+    kwargs = _user_agent(url, session, kwargs)
+    if session is not None:
+        kwargs = _conditional(url, session, conditional, kwargs)
+        async with session.stream("GET", url, **kwargs) as response:
+            _check(url, session, response)
+            yield response
+        return
+    async with httpx.AsyncClient(**kwargs) as client:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            yield response
+
+
+@asynccontextmanager
+async def stream(
+    url: str, session: HttpSession | None = None, method: str = "GET", **kwargs
+):
+    """
+    Executa uma requisição HTTP sem carregar o corpo da resposta.
+
+    Args:
+        url (str): URL do recurso.
+        session (HttpSession | None): Sessão com o pool de conexões. Se None,
+            um cliente temporário é criado para a requisição.
+        method (str): Método HTTP.
+        **kwargs: Args adicionais para `httpx.Client`.
+
+    Yields:
+        httpx.Response: Resposta com o corpo ainda não lido.
+    """
+    kwargs = _user_agent(url, session, kwargs)
+    if session is not None:
+        async with session.stream(method, url, **kwargs) as response:
+            yield response
+        return
+    async with httpx.AsyncClient(**kwargs) as client:
+        async with client.stream(method, url) as response:
+            yield response
+
+
 def get_file_type(response: httpx.Response) -> str:
     """Obtém o tipo de conteúdo do cabeçalho de resposta."""
     return response.headers.get("Content-Type", "").lower()
 
 
-async def is_pdf(url: str) -> bool:
-    """Verifica se a URL redireciona para um conteúdo PDF."""
-    try:
+def looks_like_pdf(content_type: str, prefix: bytes = b"") -> bool:
+    """
+    Indica se uma resposta é um PDF pelo `Content-Type` ou, quando o tipo é
+    genérico, pela assinatura `%PDF-` no início do corpo.
+
+    Args:
+        content_type (str): Valor do cabeçalho `Content-Type`.
+        prefix (bytes): Primeiros bytes do corpo da resposta.
+    """
+    content_type = content_type.lower()
+    if "application/pdf" in content_type:
+        return True
+    if "html" in content_type or "xml" in content_type:
+        return False
+    return PDF_MAGIC in prefix[:SNIFF_SIZE]
+
+
+async def read_prefix(chunks: AsyncIterator[bytes], size: int = SNIFF_SIZE) -> bytes:
+    """Lê pelo menos `size` bytes do início do corpo, ou o corpo inteiro."""
+    prefix = b""
+    async for chunk in chunks:
+        prefix += chunk
+        if len(prefix) >= size:
+            break
+    return prefix
+
+
+async def prepend(prefix: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Percorre o corpo da resposta incluindo o início já lido."""
+    if prefix:
+        yield prefix
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _head(url: str, session: HttpSession | None = None) -> httpx.Response:
+    """Executa uma requisição HEAD seguindo redirecionamentos."""
+    kwargs = _user_agent(url, session, {})
+    with metrics.timer("head", url):
+        if session is not None:
+            return await session.request("HEAD", url, follow_redirects=True, **kwargs)
         async with httpx.AsyncClient(
-            timeout=10, verify=False, follow_redirects=True
+            timeout=10, verify=False, follow_redirects=True, **kwargs
         ) as client:
-            response = await client.head(url)
-            content_type = get_file_type(response)
-        return "application/pdf" in content_type
+            return await client.head(url)
+
+
+async def _sniff(url: str, session: HttpSession | None = None) -> bool:
+    """Verifica se a URL é um PDF lendo apenas o início da resposta do GET."""
+    async with stream(
+        url,
+        session=session,
+        follow_redirects=True,
+        headers={"Range": f"bytes=0-{SNIFF_SIZE - 1}"},
+    ) as response:
+        if response.status_code >= 400:
+            return False
+        prefix = await read_prefix(response.aiter_bytes())
+        return looks_like_pdf(get_file_type(response), prefix)
+
+
+async def is_pdf(url: str, session: HttpSession | None = None) -> bool:
+    """
+    Verifica se a URL redireciona para um conteúdo PDF.
+
+    Faz parte da API pública do pacote, para quem precisa apenas classificar
+    URLs. O pipeline de resolução não a usa: `GenericParser.get_pdf_link`
+    identifica o PDF pela própria resposta do GET da página.
+
+    Usa uma requisição HEAD enquanto o host responder a ela de forma
+    confiável. Se o HEAD falhar ou trouxer um tipo genérico, o início do
+    corpo é verificado com um GET, e hosts cujo HEAD não corresponde ao GET
+    passam a ser verificados apenas com o GET (ver `HttpSession.head_reliable`).
+    """
+    memo = session.head_reliable if session is not None else {}
+    host = urlparse(url).netloc
+    try:
+        if memo.get(host) is False:
+            return await _sniff(url, session)
+        response = await _head(url, session)
+        content_type = get_file_type(response)
+        if response.status_code < 400 and (
+            "application/pdf" in content_type or "html" in content_type
+        ):
+            memo.setdefault(host, True)
+            return "application/pdf" in content_type
+        # HEAD não suportado ou tipo genérico: confirma com o início do corpo
+        pdf = await _sniff(url, session)
+        if response.status_code >= 400 or pdf:
+            memo[host] = False
+        return pdf
     except httpx.RequestError:
         return False
 
 
-async def resolve_final_url(url: str) -> str:
+async def resolve_final_url(url: str, session: HttpSession | None = None) -> str:
     """
     Resolve o URL final seguindo redirecionamentos.
 
     Parâmetros:
         url (str): O URL a ser resolvido.
+        session (HttpSession | None): Sessão com o pool de conexões.
 
     Retorna:
         str: O URL final após todos os redirecionamentos.
     """
     try:
-        async with httpx.AsyncClient(
-            follow_redirects=True, timeout=10, verify=False
-        ) as client:
-            response = await client.head(url)
-            return str(response.url)
+        response = await _head(url, session)
+        return str(response.url)
     except httpx.RequestError as e:
         print(f"Erro ao resolver a URL {url}: {e}")
         return url  # Retorna a URL original em caso de erro
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classifica a causa de uma falha em uma categoria estável.
+
+    Returns:
+        str: O `reason` de erros que o definem (ex.: "unsupported_type",
+        "circuit_open"), "http_<status>", "timeout", "connection" ou "error".
+
+    Examples:
+        >>> classify_error(httpx.ConnectTimeout("timed out"))
+        'timeout'
+    """
+    if reason := getattr(error, "reason", None):
+        return reason
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"http_{error.response.status_code}"
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.TransportError):
+        return "connection"
+    return "error"
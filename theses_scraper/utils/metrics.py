@@ -0,0 +1,342 @@
+"""
+Módulo com as métricas de tempo e contadores das etapas da coleta.
+
+Cada etapa (correção da URL, escolha do parser, HEAD, obtenção e análise do
+HTML, renderização e download) registra a sua duração em um histograma
+rotulado pelo host e pelo parser. As métricas podem ser exportadas no
+formato de texto do Prometheus, repassadas a ganchos (ex.: OpenTelemetry) e
+resumidas periodicamente.
+
+As métricas ficam desativadas por padrão; nesse caso, cada ponto de medição
+custa apenas a verificação de um atributo.
+
+Exemplo:
+    >>> from theses_scraper.utils.metrics import metrics
+    >>> metrics.enable()
+    >>> stop = metrics.start_reporter(interval=60)
+    >>> ...
+    >>> print(metrics.to_prometheus())
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from urllib.parse import urlparse
+
+# Limites superiores, em segundos, dos intervalos dos histogramas
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Parser que processa a URL na tarefa atual (definido pela `ParserFactory`)
+current_parser: ContextVar[str] = ContextVar("current_parser", default="")
+
+# Gancho: `hook(kind, name, value, labels)`, com `kind` "histogram" ou "counter"
+Hook = Callable[[str, str, float, dict[str, str]], None]
+
+
+def _host(url: str) -> str:
+    try:
+        return urlparse(url).netloc
+    except ValueError:
+        return ""
+
+
+class _Histogram:
+    """Contagens por intervalo, soma e total de observações."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimativa do quantil pelo limite superior do intervalo."""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip((*BUCKETS, float("inf")), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    """Mede a duração do bloco e a registra ao sair."""
+
+    __slots__ = ("_metrics", "_stage", "_url", "_parser", "_started")
+
+    def __init__(self, metrics: "Metrics", stage: str, url: str, parser: str | None):
+        self._metrics = metrics
+        self._stage = stage
+        self._url = url
+        self._parser = parser
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._metrics.observe(
+            self._stage, time.perf_counter() - self._started, self._url, self._parser
+        )
+
+
+class _NoopTimer:
+    """Substituto do `_Timer` quando as métricas estão desativadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NOOP = _NoopTimer()
+
+
+class Metrics:
+    """
+    Registro de histogramas de duração e contadores.
+
+    Os rótulos de cada observação são a etapa, o host (extraído da URL
+    informada) e o parser (por padrão, o da tarefa atual, ver
+    `current_parser`).
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], _Histogram] = {}
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._hooks: list[Hook] = []
+
+    def enable(self):
+        """Ativa a coleta das métricas."""
+        self.enabled = True
+
+    def disable(self):
+        """Desativa a coleta das métricas, mantendo os valores registrados."""
+        self.enabled = False
+
+    def reset(self):
+        """Remove todos os valores registrados."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def add_hook(self, hook: Hook):
+        """Registra uma função chamada a cada observação (ver `otel_hook`)."""
+        self._hooks.append(hook)
+
+    def timer(self, stage: str, url: str = "", parser: str | None = None):
+        """
+        Mede a duração de um bloco.
+
+        Exemplo:
+            >>> with metrics.timer("fetch", url):
+            ...     response = await http_utils.get(url, session=session)
+        """
+        if not self.enabled:
+            return _NOOP
+        return _Timer(self, stage, url, parser)
+
+    def observe(
+        self, stage: str, seconds: float, url: str = "", parser: str | None = None
+    ):
+        """Registra a duração de uma etapa."""
+        if not self.enabled:
+            return
+        key = (stage, _host(url), current_parser.get() if parser is None else parser)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.add(seconds)
+        for hook in self._hooks:
+            hook("histogram", stage, seconds, {"host": key[1], "parser": key[2]})
+
+    def count(self, name: str, value: float = 1, url: str = "", **labels: str):
+        """
+        Incrementa um contador.
+
+        Args:
+            name (str): Nome do contador (ex.: "download_bytes").
+            value (float): Incremento.
+            url (str): URL cujo host é usado como rótulo.
+            **labels (str): Rótulos adicionais.
+        """
+        if not self.enabled:
+            return
+        labels = {"host": _host(url), "parser": current_parser.get(), **labels}
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        for hook in self._hooks:
+            hook("counter", name, value, labels)
+
+    def to_prometheus(self) -> str:
+        """Exporta as métricas no formato de texto do Prometheus."""
+        with self._lock:
+            histograms = [
+                (key, list(h.counts), h.sum, h.count)
+                for key, h in self._histograms.items()
+            ]
+            counters = list(self._counters.items())
+        lines = [
+            "# HELP theses_scraper_stage_seconds Duração de cada etapa.",
+            "# TYPE theses_scraper_stage_seconds histogram",
+        ]
+        for (stage, host, parser), counts, total, count in sorted(histograms):
+            labels = f'stage="{stage}",host="{_escape(host)}",parser="{parser}"'
+            cumulative = 0
+            for bound, bucket in zip((*BUCKETS, "+Inf"), counts):
+                cumulative += bucket
+                lines.append(
+                    f'theses_scraper_stage_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f"theses_scraper_stage_seconds_sum{{{labels}}} {total}")
+            lines.append(f"theses_scraper_stage_seconds_count{{{labels}}} {count}")
+        names = sorted({name for (name, _), _ in counters})
+        for name in names:
+            lines.append(f"# TYPE theses_scraper_{name}_total counter")
+            for (counter, labels), value in sorted(counters):
+                if counter != name:
+                    continue
+                text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"theses_scraper_{name}_total{{{text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top: int = 15) -> str:
+        """
+        Resume as etapas que mais consumiram tempo.
+
+        Returns:
+            str: Tabela com etapa, parser, host, número de observações,
+            média, p50, p95 e tempo total, ordenada pelo tempo total.
+        """
+        with self._lock:
+            rows = sorted(
+                (
+                    (
+                        h.sum,
+                        stage,
+                        parser,
+                        host,
+                        h.count,
+                        h.quantile(0.5),
+                        h.quantile(0.95),
+                    )
+                    for (stage, host, parser), h in self._histograms.items()
+                ),
+                reverse=True,
+            )[:top]
+        lines = [
+            f"{'etapa':<10} {'parser':<22} {'host':<32} {'n':>7} "
+            f"{'média':>8} {'p50':>7} {'p95':>7} {'total':>9}"
+        ]
+        for total, stage, parser, host, count, p50, p95 in rows:
+            lines.append(
+                f"{stage:<10} {parser[:22]:<22} {host[:32]:<32} {count:>7} "
+                f"{total / count:>8.3f} {p50:>7} {p95:>7} {total:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def start_reporter(self, interval: float = 60.0, stream=None) -> Callable[[], None]:
+        """
+        Imprime o resumo periodicamente em uma thread em segundo plano.
+
+        Args:
+            interval (float): Intervalo, em segundos, entre os resumos.
+            stream: Arquivo de saída. Se None, `sys.stderr`.
+
+        Returns:
+            Callable[[], None]: Função que interrompe os resumos.
+        """
+        stopped = threading.Event()
+
+        def report():
+            while not stopped.wait(interval):
+                print(self.summary(), file=stream or sys.stderr, flush=True)
+
+        threading.Thread(target=report, name="metrics-reporter", daemon=True).start()
+        return stopped.set
+
+    def serve_prometheus(self, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Expõe as métricas em `http://host:port/metrics` para o Prometheus.
+
+        Returns:
+            ThreadingHTTPServer: Servidor em execução; use `shutdown()` para
+            encerrá-lo.
+        """
+        # O http.server só é carregado quando as métricas são expostas
+        from http.server import (  # pylint: disable=import-outside-toplevel
+            BaseHTTPRequestHandler,
+            ThreadingHTTPServer,
+        )
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(
+            target=server.serve_forever, name="metrics-server", daemon=True
+        ).start()
+        return server
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def otel_hook(meter) -> Hook:
+    """
+    Cria um gancho que repassa as métricas a um `Meter` do OpenTelemetry.
+
+    Exemplo:
+        >>> from opentelemetry import metrics as otel
+        >>> metrics.add_hook(otel_hook(otel.get_meter("theses_scraper")))
+    """
+    histogram = meter.create_histogram(
+        "theses_scraper.stage.duration", unit="s", description="Duração das etapas"
+    )
+    counters = {}
+
+    def hook(kind: str, name: str, value: float, labels: dict[str, str]):
+        if kind == "histogram":
+            histogram.record(value, {"stage": name, **labels})
+            return
+        counter = counters.get(name)
+        if counter is None:
+            counter = counters[name] = meter.create_counter(f"theses_scraper.{name}")
+        counter.add(value, labels)
+
+    return hook
+
+
+# Registro global, ativado também pela variável de ambiente THESES_SCRAPER_METRICS
+metrics = Metrics(enabled=os.environ.get("THESES_SCRAPER_METRICS", "") not in ("", "0"))
@@ -0,0 +1,215 @@
+"""
+Módulo com as políticas de retentativa, timeout e disjuntores por host.
+
+Usadas pela `HttpSession`: falhas transitórias (conexões interrompidas,
+timeouts, 5xx e 429) são tentadas novamente com espera exponencial e
+aleatória, e um disjuntor (circuit breaker) por host passa a recusar
+imediatamente as requisições a um repositório fora do ar, em vez de esperar
+o timeout de cada URL da fila.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from .scheduler import parse_retry_after
+
+
+class CircuitOpenError(httpx.TransportError):
+    """O disjuntor do host está aberto: a requisição não foi enviada."""
+
+    reason = "circuit_open"
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(
+            f"Host indisponível: {host} (nova tentativa em {retry_in:.0f}s)"
+        )
+        self.host = host
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Política de retentativas com espera exponencial e jitter.
+
+    Attributes:
+        attempts (int): Número total de tentativas (1 desativa as retentativas).
+        backoff (float): Espera, em segundos, antes da segunda tentativa.
+        max_backoff (float): Maior espera entre tentativas.
+        retry_status (frozenset[int]): Status HTTP tentados novamente.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    retry_status: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Espera antes da próxima tentativa ("full jitter").
+
+        Args:
+            attempt (int): Número da tentativa que falhou, a partir de 1.
+            retry_after (str | None): Cabeçalho `Retry-After` da resposta,
+                respeitado se não exceder `max_backoff`.
+        """
+        wait = parse_retry_after(retry_after)
+        if wait is not None and wait <= self.max_backoff:
+            return wait
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def should_retry(self, attempt: int, status: int | None = None) -> bool:
+        """Indica se a falha (status HTTP ou erro de transporte) é tentada de novo."""
+        if attempt >= self.attempts:
+            return False
+        return status is None or status in self.retry_status
+
+
+@dataclass
+class TimeoutPolicy:
+    """
+    Timeouts das requisições, em segundos.
+
+    Attributes:
+        connect (float): Estabelecimento da conexão.
+        read (float): Intervalo máximo entre dois blocos recebidos.
+        write (float): Envio de cada bloco da requisição.
+        pool (float): Espera por uma conexão livre no pool.
+        total (float | None): Duração máxima de uma tentativa, até o fim do
+            corpo em `HttpSession.request` e até os cabeçalhos em
+            `HttpSession.stream`.
+    """
+
+    connect: float = 5.0
+    read: float = 10.0
+    write: float = 10.0
+    pool: float = 10.0
+    total: float | None = 60.0
+
+    def to_httpx(self) -> httpx.Timeout:
+        """Converte para o `httpx.Timeout` do cliente."""
+        return httpx.Timeout(
+            connect=self.connect, read=self.read, write=self.write, pool=self.pool
+        )
+
+
+@dataclass
+class _Breaker:
+    """Estado do disjuntor de um host."""
+
+    state: str = "closed"
+    failures: int = 0
+    opened_at: float = 0.0
+    probing: bool = False
+    counters: dict[str, int] = field(
+        default_factory=lambda: {"opened": 0, "rejected": 0, "retries": 0}
+    )
+
+
+class CircuitBreakers:
+    """
+    Disjuntores independentes por host.
+
+    Após `failure_threshold` falhas consecutivas (erros de conexão, timeouts
+    ou 5xx), o disjuntor abre e as requisições ao host falham imediatamente
+    com `CircuitOpenError`. Passado `recovery_time`, uma única requisição de
+    teste é liberada (estado "half_open"): se for bem-sucedida o disjuntor
+    fecha, senão volta a abrir.
+
+    Exemplo:
+        >>> session = HttpSession(breakers=CircuitBreakers(failure_threshold=3))
+        >>> session.breakers.stats()["repositorio.ufsc.br"]["state"]
+        'open'
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_time: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Falhas consecutivas que abrem o disjuntor.
+            recovery_time (float): Tempo, em segundos, com o disjuntor aberto
+                antes da requisição de teste.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self._hosts: dict[str, _Breaker] = {}
+
+    def _breaker(self, host: str) -> _Breaker:
+        breaker = self._hosts.get(host)
+        if breaker is None:
+            breaker = self._hosts[host] = _Breaker()
+        return breaker
+
+    def check(self, host: str):
+        """
+        Verifica se uma requisição ao host pode ser enviada.
+
+        Raises:
+            CircuitOpenError: Se o disjuntor estiver aberto ou já houver uma
+                requisição de teste em andamento.
+        """
+        breaker = self._hosts.get(host)
+        if breaker is None or breaker.state == "closed":
+            return
+        retry_in = breaker.opened_at + self.recovery_time - time.monotonic()
+        if breaker.state == "open" and retry_in <= 0:
+            breaker.state = "half_open"
+        if breaker.state == "half_open" and not breaker.probing:
+            breaker.probing = True
+            return
+        breaker.counters["rejected"] += 1
+        raise CircuitOpenError(host, max(0.0, retry_in))
+
+    def record(self, host: str, success: bool):
+        """Registra o resultado de uma requisição ao host."""
+        breaker = self._breaker(host)
+        breaker.probing = False
+        if success:
+            breaker.state = "closed"
+            breaker.failures = 0
+            return
+        breaker.failures += 1
+        if breaker.state == "half_open" or (
+            breaker.state == "closed" and breaker.failures >= self.failure_threshold
+        ):
+            breaker.state = "open"
+            breaker.opened_at = time.monotonic()
+            breaker.counters["opened"] += 1
+
+    def release(self, host: str):
+        """Libera a requisição de teste sem registrar o seu resultado."""
+        if (breaker := self._hosts.get(host)) is not None:
+            breaker.probing = False
+
+    def count_retry(self, host: str):
+        """Contabiliza uma retentativa ao host."""
+        self._breaker(host).counters["retries"] += 1
+
+    def state(self, host: str) -> str:
+        """Retorna o estado do disjuntor: "closed", "open" ou "half_open"."""
+        breaker = self._hosts.get(host)
+        return "closed" if breaker is None else breaker.state
+
+    def stats(self) -> dict[str, dict]:
+        """Retorna o estado e os contadores do disjuntor de cada host."""
+        now = time.monotonic()
+        return {
+            host: {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "retry_in": (
+                    max(0.0, breaker.opened_at + self.recovery_time - now)
+                    if breaker.state == "open"
+                    else 0.0
+                ),
+                **breaker.counters,
+            }
+            for host, breaker in self._hosts.items()
+        }
+
+
+def is_failure(status: int | None) -> bool:
+    """Indica se o resultado conta como falha do host para o disjuntor."""
+    return status is None or status >= 500
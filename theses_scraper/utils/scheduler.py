@@ -0,0 +1,369 @@
+"""
+Módulo com o escalonador de requisições por host.
+
+Cada host tem um balde de tokens (taxa e rajada), um limite de requisições
+simultâneas e uma taxa adaptativa: respostas 429/503, `Retry-After` e aumento
+da latência reduzem a taxa, que volta a crescer aos poucos enquanto o host
+responde normalmente.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Status que indicam que o host pediu para diminuirmos o ritmo.
+_THROTTLE_STATUS = {429, 503}
+
+# Respostas observadas antes de definir a latência de referência de um host
+_LATENCY_WARMUP = 5
+
+# Fração da diferença entre a latência atual e a de referência absorvida a
+# cada resposta
+_FLOOR_DRIFT = 0.05
+
+# Menor fração da taxa configurada alcançada por reduções devidas à latência
+_LATENCY_MIN_SHARE = 0.25
+
+
+@dataclass
+class HostPolicy:
+    """
+    Limites de acesso a um host.
+
+    Attributes:
+        rate (float): Requisições por segundo.
+        burst (int): Número máximo de requisições em rajada.
+        max_in_flight (int): Número máximo de requisições simultâneas.
+    """
+
+    rate: float = 5.0
+    burst: int = 10
+    max_in_flight: int = 8
+
+
+class _HostState:
+    """Estado do balde de tokens e da taxa adaptativa de um host."""
+
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.rate = policy.rate
+        self.tokens = float(policy.burst)
+        self.updated_at = time.monotonic()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.latency = None
+        self.latency_floor = None
+        self.samples = 0
+        self.condition = asyncio.Condition()
+
+    def refill(self, now: float):
+        """Repõe os tokens de acordo com o tempo decorrido."""
+        elapsed = now - self.updated_at
+        self.tokens = min(self.policy.burst, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Tempo até que uma nova requisição possa ser iniciada."""
+        self.refill(now)
+        if self.in_flight >= self.policy.max_in_flight:
+            return float("inf")
+        delay = max(0.0, self.blocked_until - now)
+        if self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        return delay
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Converte o cabeçalho `Retry-After` em segundos.
+
+    Args:
+        value (str | None): Valor do cabeçalho, em segundos ou data HTTP.
+
+    Returns:
+        float | None: Segundos de espera ou None se o valor for inválido.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostScheduler:
+    """
+    Escalonador de requisições com limites independentes por host.
+
+    Exemplo:
+        >>> scheduler = HostScheduler(policies={"repositorio.unb.br": HostPolicy(rate=1)})
+        >>> async with scheduler.slot("repositorio.unb.br") as feedback:
+        ...     response = await client.get(url)
+        ...     feedback(response.status_code, response.headers.get("Retry-After"))
+    """
+
+    def __init__(
+        self,
+        default: HostPolicy | None = None,
+        policies: dict[str, HostPolicy] | None = None,
+        min_rate: float = 0.05,
+        backoff_factor: float = 0.5,
+        recovery_step: float = 0.05,
+        latency_factor: float = 3.0,
+    ):
+        """
+        Args:
+            default (HostPolicy | None): Limites dos hosts sem política própria.
+            policies (dict[str, HostPolicy] | None): Limites por host.
+            min_rate (float): Menor taxa, em requisições por segundo, após
+                sucessivas reduções.
+            backoff_factor (float): Fator aplicado à taxa quando o host
+                responde 429/503.
+            recovery_step (float): Fração da taxa original recuperada a cada
+                resposta bem-sucedida.
+            latency_factor (float): Quantas vezes a latência pode superar a
+                menor latência observada antes de reduzir a taxa.
+        """
+        self.default = default or HostPolicy()
+        self.policies = policies or {}
+        self.min_rate = min_rate
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.latency_factor = latency_factor
+        self._hosts: dict[str, _HostState] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Retorna o host (netloc) de uma URL."""
+        try:
+            return urlparse(str(url)).netloc
+        except ValueError:
+            return ""
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.policies.get(host, self.default))
+            self._hosts[host] = state
+        return state
+
+    def is_ready(self, host: str) -> bool:
+        """Indica se uma requisição ao host pode ser iniciada imediatamente."""
+        state = self._hosts.get(host)
+        return state is None or state.wait_time(time.monotonic()) == 0
+
+    def wait_time(self, host: str) -> float:
+        """Tempo estimado, em segundos, até o host aceitar uma nova requisição."""
+        state = self._hosts.get(host)
+        return 0.0 if state is None else state.wait_time(time.monotonic())
+
+    async def acquire(self, host: str):
+        """Aguarda até que uma requisição ao host possa ser iniciada."""
+        state = self._state(host)
+        async with state.condition:
+            while (delay := state.wait_time(time.monotonic())) > 0:
+                timeout = None if delay == float("inf") else delay
+                try:
+                    await asyncio.wait_for(state.condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            state.tokens -= 1
+            state.in_flight += 1
+
+    async def release(
+        self,
+        host: str,
+        status: int | None = None,
+        retry_after: str | None = None,
+        latency: float | None = None,
+    ):
+        """
+        Libera a vaga do host e ajusta a taxa conforme a resposta.
+
+        Args:
+            host (str): Host da requisição.
+            status (int | None): Status HTTP, ou None se a requisição falhou.
+            retry_after (str | None): Valor do cabeçalho `Retry-After`.
+            latency (float | None): Tempo, em segundos, até a resposta.
+        """
+        state = self._state(host)
+        async with state.condition:
+            state.in_flight -= 1
+            self._adapt(state, status, retry_after, latency)
+            state.condition.notify_all()
+
+    def _adapt(
+        self,
+        state: _HostState,
+        status: int | None,
+        retry_after: str | None,
+        latency: float | None,
+    ):
+        """Ajusta a taxa do host (aumento aditivo, redução multiplicativa)."""
+        now = time.monotonic()
+        base_rate = state.policy.rate
+        if status in _THROTTLE_STATUS:
+            state.rate = max(self.min_rate, state.rate * self.backoff_factor)
+            wait = parse_retry_after(retry_after)
+            if wait is None:
+                wait = 1 / state.rate
+            state.blocked_until = max(state.blocked_until, now + wait)
+            # Após a pausa, apenas uma requisição sonda o host.
+            state.tokens = min(state.tokens, 1.0)
+            return
+
+        if latency is not None and status is not None:
+            state.latency = (
+                latency
+                if state.latency is None
+                else 0.8 * state.latency + 0.2 * latency
+            )
+            state.samples += 1
+            if state.samples < _LATENCY_WARMUP:
+                pass
+            elif state.latency_floor is None or state.latency < state.latency_floor:
+                state.latency_floor = state.latency
+            else:
+                # A referência acompanha devagar a latência atual, para que só
+                # aumentos recentes (e não a mistura de requisições) reduzam a taxa
+                state.latency_floor += _FLOOR_DRIFT * (
+                    state.latency - state.latency_floor
+                )
+            if (
+                state.latency_floor is not None
+                and state.latency > self.latency_factor * state.latency_floor
+            ):
+                # A latência é um sinal fraco: não reduz a taxa tanto quanto
+                # 429/503 e nunca a aumenta (ex.: após um 429 do servidor)
+                state.rate = min(
+                    state.rate,
+                    max(
+                        self.min_rate,
+                        base_rate * _LATENCY_MIN_SHARE,
+                        state.rate * 0.8,
+                    ),
+                )
+                return
+
+        if status is not None and status < 500:
+            state.rate = min(base_rate, state.rate + base_rate * self.recovery_step)
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """
+        Reserva uma vaga no host durante o bloco.
+
+        Yields:
+            Callable: Função `feedback(status, retry_after=None)` para informar
+            o resultado da requisição; a latência é medida automaticamente.
+        """
+        await self.acquire(host)
+        started = time.monotonic()
+        outcome = {}
+
+        def feedback(status: int | None, retry_after: str | None = None):
+            outcome.update(
+                status=status,
+                retry_after=retry_after,
+                latency=time.monotonic() - started,
+            )
+
+        try:
+            yield feedback
+        finally:
+            await asyncio.shield(self.release(host, **outcome))
+
+    def stats(self) -> dict[str, dict]:
+        """Retorna o estado atual de cada host."""
+        now = time.monotonic()
+        return {
+            host: {
+                "rate": state.rate,
+                "tokens": state.tokens,
+                "in_flight": state.in_flight,
+                "blocked_for": max(0.0, state.blocked_until - now),
+                "latency": state.latency,
+            }
+            for host, state in self._hosts.items()
+        }
+
+
+class HostQueue:
+    """
+    Fila que alterna entre hosts, entregando primeiro as URLs cujos hosts
+    estão livres no escalonador, de modo que um host lento não bloqueia os
+    demais.
+    """
+
+    def __init__(self, scheduler: HostScheduler, maxsize: int):
+        """
+        Args:
+            scheduler (HostScheduler): Escalonador consultado para saber quais
+                hosts estão livres.
+            maxsize (int): Número máximo de itens armazenados.
+        """
+        self.scheduler = scheduler
+        self.maxsize = maxsize
+        self._queues: OrderedDict[str, deque] = OrderedDict()
+        self._size = 0
+        self._closed = False
+        self._changed = asyncio.Condition()
+
+    async def put(self, url: str):
+        """Adiciona uma URL à fila, aguardando se ela estiver cheia."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._size < self.maxsize)
+            host = self.scheduler.host_of(url)
+            self._queues.setdefault(host, deque()).append(url)
+            self._size += 1
+            self._changed.notify_all()
+
+    async def close(self):
+        """Indica que não serão adicionadas novas URLs."""
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    def _pop_ready(self) -> str | None:
+        """Retira a próxima URL de um host livre, em rodízio."""
+        for host in list(self._queues):
+            if self.scheduler.is_ready(host):
+                queue = self._queues.pop(host)
+                url = queue.popleft()
+                if queue:
+                    # O host vai para o fim da fila de rodízio.
+                    self._queues[host] = queue
+                self._size -= 1
+                return url
+        return None
+
+    async def get(self) -> str | None:
+        """
+        Retorna a próxima URL ou None quando a fila estiver fechada e vazia.
+        """
+        async with self._changed:
+            while True:
+                if (url := self._pop_ready()) is not None:
+                    self._changed.notify_all()
+                    return url
+                if self._closed and not self._size:
+                    return None
+                delay = min(
+                    (self.scheduler.wait_time(host) for host in self._queues),
+                    default=None,
+                )
+                # Hosts ocupados liberam vagas sem avisar a fila: verifica de
+                # novo após um intervalo curto.
+                timeout = 0.05 if delay is None or delay == float("inf") else delay
+                try:
+                    await asyncio.wait_for(self._changed.wait(), max(timeout, 0.001))
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,318 @@
+"""
+Módulo com a sessão HTTP compartilhada entre parsers e downloader.
+"""
+
+import asyncio
+import importlib.util
+import warnings
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import httpx
+from .policy import (
+    CircuitBreakers,
+    CircuitOpenError,
+    RetryPolicy,
+    TimeoutPolicy,
+    is_failure,
+)
+from .scheduler import HostPolicy, HostScheduler
+from .user_agent import UserAgentManager, user_agents as shared_user_agents
+from .validators import ValidatorStore
+
+# Argumentos de `httpx.AsyncClient` que também são aceitos por requisição.
+_REQUEST_KWARGS = {
+    "headers",
+    "params",
+    "cookies",
+    "timeout",
+    "follow_redirects",
+    "auth",
+    "extensions",
+}
+
+
+def _request_kwargs(kwargs: dict, stacklevel: int = 3) -> dict:
+    """
+    Retorna os args aceitos por requisição, avisando sobre os demais.
+
+    Args do cliente (ex.: `proxy`, `verify`) não podem mudar a cada
+    requisição: devem ser informados ao criar a `HttpSession`.
+    """
+    ignored = kwargs.keys() - _REQUEST_KWARGS
+    if not ignored:
+        return kwargs
+    warnings.warn(
+        f"Args ignorados pela HttpSession: {', '.join(sorted(ignored))}. "
+        "Args do cliente devem ser informados ao criar a sessão.",
+        RuntimeWarning,
+        stacklevel=stacklevel,
+    )
+    return {k: v for k, v in kwargs.items() if k in _REQUEST_KWARGS}
+
+
+class HttpSession:
+    """
+    Sessão HTTP com um único `httpx.AsyncClient` de longa duração.
+
+    Mantém as conexões abertas (keep-alive) entre requisições, usa HTTP/2
+    quando o pacote `h2` está instalado e passa todas as requisições pelo
+    escalonador por host (`HostScheduler`). Falhas transitórias são tentadas
+    novamente conforme a `RetryPolicy`, e hosts fora do ar são recusados
+    pelos disjuntores (`CircuitBreakers`) sem esperar o timeout.
+
+    Exemplo:
+        >>> async with HttpSession() as session:
+        ...     parser = ParserFactory.get_parser(url, session=session)
+        ...     link = await parser.get_pdf_link(url)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 50,
+        max_connections_per_host: int = 8,
+        keepalive_expiry: float = 30.0,
+        http2: bool | None = None,
+        timeout: float | httpx.Timeout | TimeoutPolicy | None = None,
+        verify: bool = True,
+        headers: dict[str, str] | None = None,
+        scheduler: HostScheduler | None = None,
+        validators: ValidatorStore | None = None,
+        retry: RetryPolicy | None = None,
+        breakers: CircuitBreakers | None = None,
+        user_agents: UserAgentManager | None = None,
+        **client_kwargs,
+    ):
+        """
+        Args:
+            max_connections (int): Total de conexões abertas no pool.
+            max_keepalive_connections (int): Conexões ociosas mantidas abertas.
+            max_connections_per_host (int): Requisições simultâneas por host,
+                usado quando `scheduler` não é informado.
+            keepalive_expiry (float): Tempo, em segundos, que uma conexão
+                ociosa permanece aberta.
+            http2 (bool | None): Habilita HTTP/2. Se None, é habilitado
+                quando o pacote `h2` estiver disponível.
+            timeout (float | httpx.Timeout | TimeoutPolicy | None): Timeouts
+                das requisições. Se None, é usada a `TimeoutPolicy` padrão,
+                com timeouts de conexão, leitura e total separados.
+            verify (bool): Verifica os certificados TLS.
+            headers (dict[str, str] | None): Cabeçalhos padrão.
+            scheduler (HostScheduler | None): Escalonador de requisições por
+                host. Se None, é criado um com a política padrão.
+            validators (ValidatorStore | None): Armazena ETag/Last-Modified
+                das respostas para permitir requisições condicionais.
+            retry (RetryPolicy | None): Política de retentativas. Se None, é
+                usada a política padrão.
+            breakers (CircuitBreakers | None): Disjuntores por host. Se None,
+                são criados com os limites padrão.
+            user_agents (UserAgentManager | None): Sorteia o User-Agent de
+                cada requisição. Se None, é usado o gerenciador compartilhado.
+                Não é usado quando `headers` define o User-Agent.
+            **client_kwargs: Args adicionais para `httpx.AsyncClient`.
+        """
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+        self.scheduler = scheduler or HostScheduler(
+            HostPolicy(max_in_flight=max_connections_per_host)
+        )
+        self.validators = validators
+        self.retry = retry or RetryPolicy()
+        self.breakers = breakers or CircuitBreakers()
+        self.user_agents = (
+            None
+            if any(key.lower() == "user-agent" for key in headers or {})
+            else user_agents or shared_user_agents
+        )
+        if timeout is None or isinstance(timeout, TimeoutPolicy):
+            self.timeouts = timeout or TimeoutPolicy()
+            timeout = self.timeouts.to_httpx()
+        else:
+            self.timeouts = TimeoutPolicy(total=None)
+        # Parsers criados pela `ParserFactory` para esta sessão
+        self.parsers: dict = {}
+        # Hosts cujas respostas a HEAD correspondem (ou não) às do GET
+        self.head_reliable: dict[str, bool] = {}
+        self._client_kwargs = {
+            "limits": httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            "http2": http2,
+            "timeout": timeout,
+            "verify": verify,
+            "headers": headers,
+            **client_kwargs,
+        }
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "HttpSession":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Retorna o cliente HTTP, criando-o no primeiro uso."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+        return self._client
+
+    async def aclose(self):
+        """Fecha o cliente HTTP e todas as conexões do pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(
+        self, method: str, url: str, retry: RetryPolicy | None = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Executa uma requisição HTTP usando o pool de conexões da sessão.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL do recurso.
+            retry (RetryPolicy | None): Política de retentativas desta
+                requisição. Se None, é usada a da sessão.
+            **kwargs: Args da requisição. Args que só valem para o cliente
+                (ex.: `proxy`, `verify`) são ignorados com um `RuntimeWarning`.
+
+        Returns:
+            httpx.Response: Resposta da requisição.
+
+        Raises:
+            CircuitOpenError: Se o disjuntor do host estiver aberto.
+        """
+        kwargs = _request_kwargs(kwargs)
+        retry = retry or self.retry
+        host = self.scheduler.host_of(url)
+        attempt = 1
+        while True:
+            async with AsyncExitStack() as stack:
+                try:
+                    async with self._attempt(host, stack) as (feedback, outcome):
+                        response = await self.client.request(method, url, **kwargs)
+                        feedback(
+                            response.status_code, response.headers.get("Retry-After")
+                        )
+                        outcome(response.status_code)
+                except httpx.TransportError as e:
+                    if isinstance(e, CircuitOpenError) or not retry.should_retry(
+                        attempt
+                    ):
+                        raise
+                    delay = retry.delay(attempt)
+                else:
+                    if not retry.should_retry(attempt, response.status_code):
+                        return response
+                    delay = retry.delay(attempt, response.headers.get("Retry-After"))
+            self.breakers.count_retry(host)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, retry: RetryPolicy | None = None, **kwargs
+    ):
+        """
+        Executa uma requisição HTTP sem carregar o corpo da resposta.
+
+        As retentativas ocorrem apenas antes de a resposta ser entregue ao
+        bloco; falhas durante a leitura do corpo não são repetidas.
+
+        Args:
+            method (str): Método HTTP.
+            url (str): URL do recurso.
+            retry (RetryPolicy | None): Política de retentativas desta
+                requisição. Se None, é usada a da sessão.
+            **kwargs: Args da requisição. Args que só valem para o cliente
+                (ex.: `proxy`, `verify`) são ignorados com um `RuntimeWarning`.
+
+        Yields:
+            httpx.Response: Resposta com o corpo ainda não lido.
+        """
+        # O bloco `async with` do chamador passa pelo `__aenter__` do contextlib
+        kwargs = _request_kwargs(kwargs, stacklevel=4)
+        retry = retry or self.retry
+        host = self.scheduler.host_of(url)
+        attempt = 1
+        while True:
+            async with AsyncExitStack() as stack:
+                try:
+                    async with self._attempt(host, stack) as (feedback, outcome):
+                        response = await stack.enter_async_context(
+                            self.client.stream(method, url, **kwargs)
+                        )
+                        feedback(
+                            response.status_code, response.headers.get("Retry-After")
+                        )
+                        outcome(response.status_code)
+                except httpx.TransportError as e:
+                    if isinstance(e, CircuitOpenError) or not retry.should_retry(
+                        attempt
+                    ):
+                        raise
+                    delay = retry.delay(attempt)
+                else:
+                    if not retry.should_retry(attempt, response.status_code):
+                        yield response
+                        return
+                    delay = retry.delay(attempt, response.headers.get("Retry-After"))
+            self.breakers.count_retry(host)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @asynccontextmanager
+    async def _attempt(self, host: str, stack: AsyncExitStack):
+        """
+        Executa uma tentativa sob o disjuntor e o timeout total do host.
+
+        A vaga do host é reservada em `stack` antes de o timeout começar a
+        contar: a espera imposta pelo escalonador (limite de taxa, pausa após
+        429/503) não é uma falha do host.
+
+        Yields:
+            tuple[Callable, Callable]: Funções `feedback(status, retry_after)`
+            do escalonador e `outcome(status)` para informar o status HTTP.
+        """
+        self.breakers.check(host)
+        try:
+            feedback = await stack.enter_async_context(self.scheduler.slot(host))
+        except BaseException:
+            # Inclui o cancelamento durante a espera pela vaga
+            self.breakers.release(host)
+            raise
+        status = []
+        try:
+            async with asyncio.timeout(self.timeouts.total):
+                yield feedback, status.append
+        except TimeoutError as e:
+            self.breakers.record(host, success=False)
+            raise httpx.TimeoutException(
+                f"Tempo total excedido ({self.timeouts.total}s): {host}"
+            ) from e
+        except httpx.TransportError:
+            self.breakers.record(host, success=False)
+            raise
+        except BaseException:
+            # Erros que não indicam falha do host (ex.: cancelamento)
+            self.breakers.release(host)
+            raise
+        self.breakers.record(host, success=not is_failure(status[-1]))
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Retorna, por host, o estado do escalonador e do disjuntor.
+
+        Exemplo:
+            >>> session.stats()["repositorio.ufsc.br"]["breaker"]["state"]
+            'closed'
+        """
+        breakers = self.breakers.stats()
+        return {
+            host: {**scheduler, "breaker": breakers.get(host)}
+            for host, scheduler in self.scheduler.stats().items()
+        }
@@ -0,0 +1,73 @@
+"""
+Módulo com a execução única de operações assíncronas simultâneas.
+
+Quando várias tarefas pedem a mesma operação (ex.: o download de uma URL)
+ao mesmo tempo, apenas a primeira a executa; as demais aguardam e recebem o
+mesmo resultado ou a mesma exceção.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Executa uma única vez as operações simultâneas com a mesma chave.
+
+    Se a tarefa que executa a operação for cancelada, a próxima tarefa que a
+    aguardava passa a executá-la.
+
+    Exemplo:
+        >>> downloads = SingleFlight()
+        >>> paths = await asyncio.gather(
+        ...     *(downloads.run(url, lambda: fetch(url)) for _ in range(3))
+        ... )
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def run(self, key: Hashable, operation: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa `operation()` ou aguarda a execução em andamento da chave.
+
+        Args:
+            key (Hashable): Chave da operação.
+            operation (Callable[[], Awaitable[T]]): Função que inicia a
+                operação; só é chamada se nenhuma estiver em andamento.
+
+        Returns:
+            T: Resultado da operação.
+        """
+        while (call := self._calls.get(key)) is not None:
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                # A tarefa que executava a operação foi cancelada, esta não
+                if call.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            # Evita o aviso de exceção não lida quando ninguém aguardava
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
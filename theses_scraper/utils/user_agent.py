@@ -1,8 +1,110 @@
-"""Módulo para representar um User Agent."""
+"""
+Módulo para representar e sortear User Agents.
+
+O sorteio usa uma tabela de alias (método de Walker), montada uma única vez a
+partir dos pesos do sistema operacional e do navegador de cada User Agent, e
+custa O(1) por requisição. Por host, os User Agents usados mais recentemente
+são evitados, para que requisições seguidas ao mesmo repositório alternem
+entre eles.
+"""
 
-import time
 import random
-from ua_parser import user_agent_parser
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+# Trechos do User Agent que identificam a família do sistema operacional e do
+# navegador, na ordem em que são testados (ex.: o Edge também contém "Chrome/")
+_OS_TOKENS = (
+    ("Android", "Android"),
+    ("iPhone", "iOS"),
+    ("iPad", "iOS"),
+    ("Windows", "Windows"),
+    ("Mac OS X", "Mac OS X"),
+    ("Ubuntu", "Ubuntu"),
+    ("Linux", "Linux"),
+)
+_BROWSER_TOKENS = (
+    ("Edg/", "Edge"),
+    ("EdgA/", "Edge"),
+    ("EdgiOS/", "Edge"),
+    ("Firefox/", "Firefox"),
+    ("Chrome/", "Chrome"),
+    ("Safari/", "Safari"),
+)
+
+# Famílias dos navegadores móveis, com nomes próprios no ua_parser
+_MOBILE_BROWSERS = {
+    "Edge": "Edge Mobile",
+    "Firefox": "Firefox Mobile",
+    "Chrome": "Chrome Mobile",
+    "Safari": "Mobile Safari",
+}
+
+# Peso das famílias sem peso definido em `UserAgentManager._weights`
+_DEFAULT_WEIGHT = 0.1
+
+# Novos sorteios antes de recorrer ao User Agent menos recente do host
+_ATTEMPTS = 4
+
+
+def _family(user_agent: str, tokens: tuple[tuple[str, str], ...]) -> str | None:
+    """Retorna a família do primeiro trecho encontrado no User Agent."""
+    for token, family in tokens:
+        if token in user_agent:
+            return family
+    return None
+
+
+def _browser_family(user_agent: str) -> str | None:
+    """Retorna a família do navegador com o mesmo nome usado pelo ua_parser."""
+    family = _family(user_agent, _BROWSER_TOKENS)
+    if family is not None and "Mobile" in user_agent:
+        return _MOBILE_BROWSERS[family]
+    return family
+
+
+def user_agent_family(user_agent: str) -> str:
+    """
+    Retorna a família (sistema e navegador) de um User Agent.
+
+    User Agents de sistema ou navegador desconhecido formam a própria família.
+
+    Examples:
+        >>> user_agent_family(
+        ...     "Mozilla/5.0 (Android 13; Mobile; rv:109.0) Gecko/113.0 Firefox/113.0"
+        ... )
+        'Android/Firefox Mobile'
+    """
+    os_family = _family(user_agent, _OS_TOKENS)
+    browser_family = _browser_family(user_agent)
+    if os_family is None or browser_family is None:
+        return user_agent
+    return f"{os_family}/{browser_family}"
+
+
+def _alias_table(weights: list[float]) -> tuple[list[float], list[int]]:
+    """
+    Monta a tabela de alias para sortear índices proporcionalmente aos pesos.
+
+    Returns:
+        tuple[list[float], list[int]]: Probabilidade de manter cada índice e
+        o índice sorteado no lugar dele.
+    """
+    size = len(weights)
+    total = sum(weights)
+    scaled = [weight * size / total for weight in weights]
+    probability = [1.0] * size
+    alias = list(range(size))
+    small = [i for i, value in enumerate(scaled) if value < 1]
+    large = [i for i, value in enumerate(scaled) if value >= 1]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probability[less] = scaled[less]
+        alias[less] = more
+        scaled[more] += scaled[less] - 1
+        (small if scaled[more] < 1 else large).append(more)
+    return probability, alias
 
 
 class UserAgent:
@@ -10,8 +112,6 @@ class UserAgent:
 
     def __init__(self, user_agent_string: str):
         self.user_agent_string = user_agent_string
-        self.parsed_string = user_agent_parser.Parse(user_agent_string)
-        self.last_access = time.time()
 
     def __repr__(self) -> str:
         return self.user_agent_string
@@ -19,6 +119,16 @@ class UserAgent:
     def __str__(self) -> str:
         return self.user_agent_string
 
+    @cached_property
+    def parsed_string(self) -> dict:
+        """Retorna o User Agent analisado pelo ua_parser, no primeiro acesso."""
+        # O ua_parser compila centenas de expressões regulares ao ser importado
+        from ua_parser import (  # pylint: disable=import-outside-toplevel
+            user_agent_parser,
+        )
+
+        return user_agent_parser.Parse(self.user_agent_string)
+
     @property
     def browser(self) -> str:
         """Retorna o User Agent."""
@@ -45,9 +155,27 @@ class UserAgent:
         patch = self.parsed_string["os"]["patch"] or "0"
         return f"{major}.{minor}.{patch}"
 
+    @property
+    def weight(self) -> float:
+        """Retorna o peso do User Agent no sorteio."""
+        weights = UserAgentManager._weights
+        return weights.get(
+            _family(self.user_agent_string, _OS_TOKENS), _DEFAULT_WEIGHT
+        ) + weights.get(_browser_family(self.user_agent_string), _DEFAULT_WEIGHT)
+
 
 class UserAgentManager:
-    """Gerenciador de User Agents."""
+    """
+    Gerenciador de User Agents.
+
+    Pode ser compartilhado entre threads e tarefas: o sorteio e o registro
+    dos User Agents recentes de cada host ocorrem sob uma trava, sem esperas.
+
+    Exemplo:
+        >>> manager = UserAgentManager(recent=4)
+        >>> str(manager.get_user_agent("repositorio.unesp.br"))
+        'Mozilla/5.0 (Linux; Android 10; CPH1819) AppleWebKit/537.36 ...'
+    """
 
     _uas = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36 Edg/113.0.1774.35",
@@ -119,26 +247,65 @@ class UserAgentManager:
         "Edge": 0.075,
     }
 
-    def __init__(self):
+    def __init__(self, recent: int = 8, max_hosts: int = 4096, seed: int | None = None):
+        """
+        Args:
+            recent (int): User Agents usados mais recentemente em cada host que
+                são evitados no sorteio seguinte.
+            max_hosts (int): Hosts cujos User Agents recentes são lembrados;
+                os menos usados são esquecidos.
+            seed (int | None): Semente do gerador de números aleatórios.
+        """
         self.user_agents = [UserAgent(ua) for ua in self._uas]
+        self.recent = max(0, min(recent, len(self.user_agents) - 1))
+        self.max_hosts = max_hosts
+        self._probability, self._alias = _alias_table(
+            [ua.weight for ua in self.user_agents]
+        )
+        self._random = random.Random(seed)
+        self._hosts: OrderedDict[str, OrderedDict[int, None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sample(self) -> int:
+        """Sorteia o índice de um User Agent conforme os pesos."""
+        position = self._random.random() * len(self._probability)
+        index = int(position)
+        if position - index < self._probability[index]:
+            return index
+        return self._alias[index]
+
+    def get_user_agent(self, host: str | None = None) -> UserAgent:
+        """
+        Retorna um User Agent aleatório.
+
+        Args:
+            host (str | None): Host da requisição. Se informado, os User Agents
+                usados recentemente nele são evitados.
+        """
+        with self._lock:
+            index = self._sample()
+            if host is None or not self.recent:
+                return self.user_agents[index]
+            used = self._hosts.get(host)
+            if used is None:
+                used = self._hosts[host] = OrderedDict()
+                if len(self._hosts) > self.max_hosts:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(host)
+                for _ in range(_ATTEMPTS):
+                    if index not in used:
+                        break
+                    index = self._sample()
+                else:
+                    # Todos os sorteios repetiram: usa o menos recente do host
+                    index = next(iter(used))
+            used.pop(index, None)
+            used[index] = None
+            if len(used) > self.recent:
+                used.popitem(last=False)
+        return self.user_agents[index]
 
-    def get_user_agent(self) -> UserAgent:
-        """Retorna um User Agent aleatório."""
-        self._update_weights()
-        weights = [
-            self._weights[ua.os] + self._weights[ua.browser] for ua in self.user_agents
-        ]
-        user_agent = random.choices(self.user_agents, weights=weights)[0]
-        user_agent.last_access = time.time()
-        return user_agent
 
-    def _update_weights(self):
-        """Atualiza os pesos dos User Agents."""
-        current_time = time.time()
-        for ua in self.user_agents:
-            time_diff = current_time - ua.last_access
-            ua_weight = self._weights.get(ua.os, 0.1)
-            self._weights[ua.os] = ua_weight + time_diff
-            self._weights[ua.browser] = ua_weight + time_diff
-        total_weight = sum(self._weights.values())
-        self._weights = {k: v / total_weight for k, v in self._weights.items()}
+# Gerenciador compartilhado pelas requisições do pacote
+user_agents = UserAgentManager()
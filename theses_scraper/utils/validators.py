@@ -0,0 +1,138 @@
+"""
+Módulo com o armazenamento dos validadores HTTP (ETag, Last-Modified e
+tamanho) usados em requisições condicionais.
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER,
+    path TEXT,
+    checked_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class Validators:
+    """Validadores de um recurso remoto."""
+
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    size: int | None = None
+    path: str | None = None
+    checked_at: float = 0.0
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Cabeçalhos `If-None-Match`/`If-Modified-Since` da requisição."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def if_range(self) -> str | None:
+        """Valor do cabeçalho `If-Range` para retomar downloads."""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+
+class ValidatorStore:
+    """
+    Armazena os validadores HTTP por URL em um banco SQLite.
+
+    Exemplo:
+        >>> session = HttpSession(validators=ValidatorStore("validadores.db"))
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Caminho do arquivo SQLite.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ValidatorStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._connection.close()
+
+    def get(self, url: str) -> Validators | None:
+        """Retorna os validadores armazenados para a URL."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, etag, last_modified, size, path, checked_at "
+                "FROM validators WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return Validators(*row) if row else None
+
+    def put(self, validators: Validators):
+        """Armazena os validadores de uma URL."""
+        validators.checked_at = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO validators "
+                "(url, etag, last_modified, size, path, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    validators.url,
+                    validators.etag,
+                    validators.last_modified,
+                    validators.size,
+                    validators.path,
+                    validators.checked_at,
+                ),
+            )
+            self._connection.commit()
+
+    def record(self, url: str, response: httpx.Response, path: str | None = None):
+        """
+        Armazena os validadores de uma resposta completa (status 200).
+
+        Args:
+            url (str): URL requisitada.
+            response (httpx.Response): Resposta recebida.
+            path (str | None): Arquivo local com o conteúdo da resposta.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        content_length = response.headers.get("Content-Length")
+        size = (
+            int(content_length) if content_length and content_length.isdigit() else None
+        )
+        if etag or last_modified:
+            self.put(Validators(url, etag, last_modified, size, path))
+
+    def touch(self, url: str):
+        """Atualiza a data da última verificação da URL."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE validators SET checked_at = ? WHERE url = ?",
+                (time.time(), url),
+            )
+            self._connection.commit()
@@ -0,0 +1,235 @@
+"""
+Módulo com a coleta distribuída entre vários processos.
+
+As URLs são divididas por host entre N processos, cada um com o seu próprio
+laço de eventos, sessão HTTP e pool de navegadores. Assim, a análise do HTML
+(BeautifulSoup, `PdfLinkExtractor`) deixa de competir pela única thread do
+laço e a vazão cresce com o número de núcleos. Como um host é atendido por
+um único processo, os limites por host do `HostScheduler` continuam valendo.
+Todos os processos registram os resultados no mesmo `CrawlJournal`.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import zlib
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Iterable
+
+from .journal import CrawlJournal
+from .utils.metrics import metrics
+from .utils.scheduler import HostScheduler
+
+# URLs enviadas a um processo em cada mensagem
+_BATCH_SIZE = 512
+
+# Lotes aguardando na fila de cada processo
+_QUEUE_BATCHES = 8
+
+# Lotes guardados no processo principal para cada processo com a fila cheia,
+# antes de a leitura da entrada ser pausada
+_PENDING_BATCHES = 256
+
+# Intervalo, em segundos, entre as tentativas de envio quando a leitura está pausada
+_POLL_INTERVAL = 0.05
+
+
+def shard_of(url: str, shards: int) -> int:
+    """
+    Retorna o índice do processo responsável pelo host da URL.
+
+    Examples:
+        >>> shard_of("https://repositorio.ufsc.br/handle/123456789/1", 4)
+        1
+    """
+    return zlib.crc32(HostScheduler.host_of(url).encode()) % shards
+
+
+async def _receive(inbox) -> AsyncIterator[str]:
+    """Percorre as URLs recebidas do processo principal."""
+    while (batch := await asyncio.to_thread(inbox.get)) is not None:
+        for url in batch:
+            yield url
+
+
+async def _crawl_shard(inbox, journal_path: str, options: dict) -> Counter:
+    """Processa as URLs de um processo, registrando os resultados no diário."""
+    # Carregados apenas nos processos da coleta, não no processo principal
+    # pylint: disable-next=import-outside-toplevel
+    from .batch import resolve_many, scrape_many
+
+    # pylint: disable-next=import-outside-toplevel
+    from .utils.session import HttpSession
+
+    statuses = Counter()
+    save_path = options.pop("save_path")
+    session_options = options.pop("session_options") or {}
+    async with HttpSession(**session_options) as session:
+        with CrawlJournal(journal_path) as journal:
+            if save_path is None:
+                results = resolve_many(
+                    _receive(inbox), session, journal=journal, **options
+                )
+            else:
+                results = scrape_many(
+                    _receive(inbox), save_path, session, journal=journal, **options
+                )
+            async for result in results:
+                statuses[result.status] += 1
+    if metrics.enabled:
+        print(metrics.summary(), file=sys.stderr, flush=True)
+    return statuses
+
+
+def _worker(inbox, outbox, journal_path: str, options: dict):
+    """Ponto de entrada de cada processo."""
+    try:
+        outbox.put(asyncio.run(_crawl_shard(inbox, journal_path, options)))
+    except BaseException as e:  # pylint: disable=broad-except
+        outbox.put(e)
+        raise
+
+
+class _Dispatcher:
+    """
+    Envia os lotes aos processos sem que um processo lento bloqueie os demais.
+
+    Os lotes de um processo com a fila cheia aguardam em um buffer próprio e
+    são enviados assim que houver espaço. A leitura da entrada só é pausada
+    quando o buffer de um processo passa de `max_pending` lotes.
+    """
+
+    def __init__(self, inboxes: list, workers: list, max_pending: int):
+        self.inboxes = inboxes
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = [deque() for _ in inboxes]
+
+    def send(self, index: int, item):
+        """Envia um lote (ou o fim da entrada, `None`) ao processo."""
+        self.pending[index].append(item)
+        self.flush()
+        while len(self.pending[index]) > self.max_pending:
+            time.sleep(_POLL_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """Envia os lotes guardados aos processos cuja fila tem espaço."""
+        for inbox, pending, worker in zip(self.inboxes, self.pending, self.workers):
+            while pending:
+                try:
+                    inbox.put_nowait(pending[0])
+                except queue.Full:
+                    if not worker.is_alive():
+                        raise RuntimeError(
+                            f"O processo {worker.name} terminou com código "
+                            f"{worker.exitcode}"
+                        ) from None
+                    break
+                pending.popleft()
+
+    def close(self):
+        """Aguarda o envio de todos os lotes guardados."""
+        self.flush()
+        while any(self.pending):
+            time.sleep(_POLL_INTERVAL)
+            self.flush()
+
+
+def _get(outbox, workers: list):
+    """Aguarda o resultado de um processo, desistindo se todos terminaram."""
+    while True:
+        try:
+            return outbox.get(timeout=1)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                raise RuntimeError("Os processos terminaram sem enviar o resultado")
+
+
+def crawl(
+    urls: Iterable[str],
+    journal_path: str,
+    save_path: str | None = None,
+    processes: int | None = None,
+    concurrency: int = 32,
+    session_options: dict | None = None,
+    **kwargs,
+) -> Counter:
+    """
+    Resolve (e opcionalmente baixa) as URLs em vários processos.
+
+    As URLs são lidas sob demanda e distribuídas por host entre os processos.
+    URLs já concluídas no diário são ignoradas, de modo que uma coleta
+    interrompida pode ser retomada com os mesmos argumentos.
+
+    Args:
+        urls (Iterable[str]): URLs dos trabalhos.
+        journal_path (str): Caminho do `CrawlJournal` compartilhado.
+        save_path (str | None): Diretório dos documentos. Se None, as URLs
+            são apenas resolvidas.
+        processes (int | None): Número de processos. Se None, o número de
+            núcleos da máquina.
+        concurrency (int): Número máximo de URLs simultâneas por processo.
+        session_options (dict | None): Args da `HttpSession` criada em cada
+            processo (ex.: `scheduler`, `retry`).
+        **kwargs: Args adicionais para `resolve_many`/`scrape_many` (ex.:
+            `lookahead`). Devem poder ser serializados com `pickle`.
+
+    Returns:
+        Counter: Número de URLs por status, somando todos os processos.
+
+    Exemplo:
+        >>> crawl(read_urls("bdtd.csv"), "coleta.db", "./data", processes=8)
+        Counter({'downloaded': 81234, 'not_found': 5120, 'error': 311})
+    """
+    processes = processes or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    outbox = context.Queue()
+    options = {
+        "save_path": save_path,
+        "concurrency": concurrency,
+        "session_options": session_options,
+        **kwargs,
+    }
+    inboxes, workers = [], []
+    for index in range(processes):
+        inbox = context.Queue(maxsize=_QUEUE_BATCHES)
+        worker = context.Process(
+            target=_worker,
+            args=(inbox, outbox, journal_path, options),
+            name=f"theses-scraper-{index}",
+            daemon=True,
+        )
+        worker.start()
+        inboxes.append(inbox)
+        workers.append(worker)
+
+    statuses = Counter()
+    try:
+        dispatcher = _Dispatcher(inboxes, workers, _PENDING_BATCHES)
+        batches = [[] for _ in range(processes)]
+        for url in urls:
+            index = shard_of(url, processes)
+            batches[index].append(url)
+            if len(batches[index]) >= _BATCH_SIZE:
+                dispatcher.send(index, batches[index])
+                batches[index] = []
+        for index, batch in enumerate(batches):
+            if batch:
+                dispatcher.send(index, batch)
+            dispatcher.send(index, None)
+        dispatcher.close()
+        for _ in workers:
+            result = _get(outbox, workers)
+            if isinstance(result, BaseException):
+                raise result
+            statuses.update(result)
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+    return statuses